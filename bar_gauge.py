@@ -0,0 +1,83 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  bar_gauge.py a segmented bar indicator (ie the battery gauge) drawn in one small bitmap
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the whole bar is one indexed Bitmap + Palette shown by one TileGrid, so it takes one slot in its
+# group however many segments it has.  each segment is a box with a one pixel border in the off color
+# (so neighbouring segments look separate), and changing a segment's color only rewrites the pixels
+# inside that one segment;  segments that keep their color are not touched at all.
+#
+"""
+import displayio
+import myconstants
+
+class Bar_Gauge:
+    # segment_colors is the color of each segment (left to right) when it is lit;  extra_colors are any
+    # other colors set_segment() will be asked for, so the palette has room for them
+    def __init__(self, x, y, segment_width, height, segment_colors, extra_colors=(), off_color=myconstants.BLACK):
+        self._segment_width = segment_width
+        self._height = height
+        self._segment_colors = list(segment_colors)
+        self._segments = len(self._segment_colors)
+
+        self._colors = [off_color]          # palette index -> color, 0 is "off"
+        for color in self._segment_colors + list(extra_colors):
+            if color not in self._colors:
+                self._colors.append(color)
+        self._palette = displayio.Palette(len(self._colors))
+        for i in range(len(self._colors)):
+            self._palette[i] = self._colors[i]
+        self._bitmap = displayio.Bitmap(segment_width * self._segments, height, len(self._colors))
+        self.tilegrid = displayio.TileGrid(self._bitmap, pixel_shader=self._palette, x=x, y=y)
+        self._shown = bytearray(self._segments)     # palette index now painted in each segment (all off)
+
+    def get_segment_count(self):
+        return self._segments
+
+    def set_segment(self, index, color):
+        value = self._colors.index(color)
+        if self._shown[index] == value:
+            return
+        self._shown[index] = value
+        left = index * self._segment_width
+        for x in range(left + 1, left + self._segment_width - 1):
+            for y in range(1, self._height - 1):
+                self._bitmap[x, y] = value
+
+    # lights the first level segments in their own colors and turns the rest off
+    def set_level(self, level):
+        for i in range(self._segments):
+            if i < level:
+                self.set_segment(i, self._segment_colors[i])
+            else:
+                self.set_segment(i, self._colors[0])
+
+    def fill(self, color):
+        for i in range(self._segments):
+            self.set_segment(i, color)
@@ -29,6 +29,8 @@
 # 
 """
 
+import time
+import array
 import board
 from digitalio import DigitalInOut, Direction, Pull
 from analogio import AnalogIn
@@ -65,13 +67,16 @@ analog_in_pin = AnalogIn(board.D4)
 # the software is set to use a 5v scaling multiplier when reading a/d.   If it returns > 1.5 volts we just assume we are on MicroUSB
 # 												
 
+def raw_to_volts(raw):
+    return raw * (5 / 65536)
+
 def get_voltage():
     avg = 0
     num_readings = 5
     for _ in range(num_readings):
         avg += analog_in_pin.value        
     avg /= num_readings
-    analog_volts = avg * (5 / 65536)       
+    analog_volts = raw_to_volts(avg)
     # analog_volts = analog_in_pin.reference_voltage  
     return analog_volts
 
@@ -80,9 +85,103 @@ def get_voltageXX():
 	return 1.0 * analog_in_pin.value / 65535 * 3.25
 
 
-def get_battery_pct():
-    raw_volts = get_voltage()
+def volts_to_pct(raw_volts):
     # we want 4.1v battery to indicate 100 % --> this yields 1.45 raw_volts read (2.05 - 0.6)
     # and we want 3.2v battery to indicate 0 % --> this yields 1.00 raw_volts read (1.6 - 0.6)
     batt_percent = 100 * (raw_volts - 1.00) / (1.45 - 1.00)
-    return batt_percent
\ No newline at end of file
+    return batt_percent
+
+def get_battery_pct():
+    return volts_to_pct(get_voltage())
+
+
+# the burst of reads above still swings a segment or two on the gauge from one minute to the next, so
+# the master loop instead hands Battery_Monitor.sample() one a/d read every couple of seconds.  readings
+# are smoothed with an exponential moving average;  one that is far off the average is a spike (ie the
+# beeper just switched) and is dropped, unless several in a row are, which means the level really moved
+# (ie USB power plugged in) and the average jumps to it.  once a minute the smoothed percentage goes into
+# a short history, and the drop across that history gives the discharge rate and so the time remaining.
+EMA_WEIGHT = 0.1          # weight of each new reading in the average (about the last 10 readings count)
+OUTLIER_VOLTS = 0.08      # a reading this far (at the a/d pin) from the average is dropped ...
+OUTLIER_LIMIT = 5         # ... unless this many in a row were, then the average jumps to it
+HISTORY_INTERVAL = 60     # seconds between points of the history
+HISTORY_POINTS = 16       # so the discharge rate is taken over the last 15 minutes
+MIN_HISTORY_POINTS = 4    # no estimate until the history covers this many points (3 minutes)
+MIN_DRAIN_RATE = 0.02     # percent per minute;  draining slower than this gives no estimate
+
+class Battery_Monitor:
+    def __init__(self, pin=None):
+        if pin is None:
+            pin = analog_in_pin
+        self._pin = pin
+        self._filtered = None           # smoothed volts at the a/d pin, None until the first reading
+        self._rejected = 0              # readings dropped in a row as spikes
+        self._history = array.array("f", [0.0] * HISTORY_POINTS)    # ring of smoothed percentages
+        self._history_next = 0
+        self._history_count = 0
+        self._next_point_time = 0
+        self._samples = 0
+        self._outliers = 0
+
+    # one a/d read;  called from the scheduler every few seconds
+    def sample(self):
+        volts = raw_to_volts(self._pin.value)
+        self._samples += 1
+        if self._filtered is None:
+            self._filtered = volts
+        elif abs(volts - self._filtered) > OUTLIER_VOLTS:
+            if self._rejected < OUTLIER_LIMIT:
+                self._rejected += 1
+                self._outliers += 1
+                return
+            # the level really changed, so the history (of the old level) says nothing about the new one
+            self._filtered = volts
+            self._history_count = 0
+        else:
+            self._filtered += (volts - self._filtered) * EMA_WEIGHT
+        self._rejected = 0
+
+        now = time.monotonic()
+        if now >= self._next_point_time:
+            self._next_point_time = now + HISTORY_INTERVAL
+            self._history[self._history_next] = volts_to_pct(self._filtered)
+            self._history_next = (self._history_next + 1) % HISTORY_POINTS
+            if self._history_count < HISTORY_POINTS:
+                self._history_count += 1
+
+    def has_reading(self):
+        return self._filtered is not None
+
+    def get_voltage(self):
+        return self._filtered
+
+    def get_percent(self):
+        if self._filtered is None:
+            return 0
+        return volts_to_pct(self._filtered)
+
+    # percent per minute the battery is going down by (over the history), or None if not known yet
+    def get_drain_rate(self):
+        if self._history_count < MIN_HISTORY_POINTS:
+            return None
+        newest = (self._history_next - 1) % HISTORY_POINTS
+        oldest = (self._history_next - self._history_count) % HISTORY_POINTS
+        minutes = (self._history_count - 1) * HISTORY_INTERVAL / 60
+        return (self._history[oldest] - self._history[newest]) / minutes
+
+    # whole minutes until the gauge reaches 0 % at the current discharge rate, or None when that is not
+    # known (not enough history, on USB power, or not draining)
+    def get_minutes_remaining(self):
+        percent = self.get_percent()
+        rate = self.get_drain_rate()
+        if rate is None or rate < MIN_DRAIN_RATE or percent > 100:
+            return None
+        if percent <= 0:
+            return 0
+        return int(percent / rate)
+
+    def get_samples(self):
+        return self._samples
+
+    def get_outliers(self):
+        return self._outliers
\ No newline at end of file
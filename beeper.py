@@ -27,33 +27,87 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 # 
+# patterns are played as on/off timelines from the master loop's scheduler, so nothing here ever sleeps;
+# with BEEP_USE_PWM set in myconstants the piezo is driven with a pwm tone instead of plain on/off
+# (for a passive piezo), falling back to the digital pin if the board has no pwm module.
+# the button press chirp is not a pattern:  it sounds on every press, over whatever pattern is playing
+# (as the old blocking chirp did), and the pattern carries on underneath it.  the master loop starts it
+# once the press's refresh is done, so the chirp never ends in the middle of a refresh
+#
 """
 import time
 import board
 from digitalio import DigitalInOut, Direction, Pull
 import myconstants
 
+try:
+    import pwmio
+except ImportError:
+    try:
+        import pulseio as pwmio      # CircuitPython before 6.0 kept PWMOut in pulseio
+    except ImportError:
+        pwmio = None
+
+# each pattern is how long (seconds) the beeper is on, off, on, off... starting with on
+BEEP_PATTERNS = {
+    "double-beep": (0.1, 0.1, 0.1),          # program end / window end / warmup final minute
+    "whistle": (0.2, 0.1) * 10,              # get the skater's attention
+    "warmup-over": (0.4, 0.2, 0.4, 0.2, 0.8),
+}
+PATTERN_GAP = 0.15        # silence between two queued patterns so they do not run together
+MAX_QUEUED = 3            # further requests are dropped while this many patterns are waiting
+PWM_ON = 0x8000           # 50% duty cycle
+CHIRP_TIME = 0.01         # button press acknowledgement (seconds)
+_NS_PER_SECOND = 1000000000
+
 class Beep_Manager:
     def __init__(self):
         # initialize beeper output bit on D3 connector
-        self._beep_device = DigitalInOut(board.D3)
-        self._beep_device.direction = Direction.OUTPUT
-        # this schedules beeper in cycle intervals (0=off, 1= 0.1s, 2= 0.2s, etc)
-        self._beepcounter = 0    
+        self._pwm = None
+        self._beep_device = None
+        if myconstants.BEEP_USE_PWM and pwmio is not None:
+            self._pwm = pwmio.PWMOut(board.D3, duty_cycle=0, frequency=myconstants.BEEP_TONE_HZ)
+        else:
+            self._beep_device = DigitalInOut(board.D3)
+            self._beep_device.direction = Direction.OUTPUT
+        self._pattern = None      # pattern now playing (None when quiet)
+        self._step = 0            # index into _pattern of the phase now playing (even = on)
+        self._edge_time = 0       # time.monotonic_ns() at which the current phase ends
+        self._queue = []          # patterns waiting for the current one to finish
+        self._chirp_end = None    # time.monotonic_ns() at which the chirp now sounding ends
+        self._chirp_pending = False   # a press asked for a chirp that start_chirp() has not sounded yet
+        self._pattern_on = False  # the pattern's phase is an "on" one (the output may be on for a chirp too)
         self._noisymode = True
 
+    def _set_output(self, on):
+        if self._pwm is not None:
+            if on:
+                self._pwm.duty_cycle = PWM_ON
+            else:
+                self._pwm.duty_cycle = 0
+        else:
+            self._beep_device.value = on
 
-    # note for beeps, num_of_loops is number of program main loops to sound beeper.  one loop = 0.1s
-    def set_beep_counter(self, num_of_loops):
-        self._beepcounter = num_of_loops
+    def _set_pattern_output(self, on):
+        self._pattern_on = on
+        self._set_output(on or self._chirp_end is not None)
 
-    def get_beep_counter(self):
-        return self._beepcounter
+    # starts the named pattern right away (or queues it behind the one playing); a pattern that is
+    # already playing or waiting is not queued again.  note these play even in quiet mode
+    def play(self, name):
+        pattern = BEEP_PATTERNS[name]
+        if pattern is self._pattern or pattern in self._queue:
+            return
+        if self._pattern is None:
+            self._pattern = pattern
+            self._step = 0
+            self._edge_time = time.monotonic_ns() + int(pattern[0] * _NS_PER_SECOND)
+            self._set_pattern_output(True)
+        elif len(self._queue) < MAX_QUEUED:
+            self._queue.append(pattern)
 
-    def decrement_beep_counter(self):
-        self._beepcounter = self._beepcounter - 1
-        if self._beepcounter < 0:
-            self._beepcounter = 0
+    def is_playing(self):
+        return self._pattern is not None
 
     def set_quiet_mode(self):
         self._noisymode = False
@@ -64,20 +118,51 @@ class Beep_Manager:
     def is_noisy_mode(self):
         return self._noisymode
 
+    # button press acknowledgement (not in quiet mode);  it sounds when start_chirp() is called, and
+    # process_beep ends it
     def quick_chirp(self):
         if self._noisymode:
-            self._beep_device.value = True
-            time.sleep(0.01)
-            self._beep_device.value = False
+            self._chirp_pending = True
 
+    # sounds the chirp quick_chirp() asked for;  returns True if it started one
+    def start_chirp(self):
+        if not self._chirp_pending:
+            return False
+        self._chirp_pending = False
+        self._chirp_end = time.monotonic_ns() + int(CHIRP_TIME * _NS_PER_SECOND)
+        self._set_output(True)
+        return True
+
+    # time.monotonic_ns() of the next on/off change, or None when nothing is sounding
+    def get_next_edge(self):
+        edge = self._chirp_end
+        if self._pattern is not None and (edge is None or self._edge_time < edge):
+            edge = self._edge_time
+        return edge
+
+    # ends the chirp and moves the pattern to its next phase once they are due;  returns the
+    # time.monotonic_ns() deadline of the next edge, or None when there is nothing left to play
     def process_beep(self):
-        if self.get_beep_counter() > 0:
-            # we want a beep, but make it chirpy...
-            if (self.get_beep_counter() % 3) > 0:
-                self._beep_device.value = True
-            else:
-                self._beep_device.value = False
-            self.decrement_beep_counter()
-        else:
-            self._beep_device.value = False
+        now = time.monotonic_ns()
+        if self._chirp_end is not None and now >= self._chirp_end:
+            self._chirp_end = None
+            self._set_output(self._pattern_on)
+        if self._pattern is not None and now >= self._edge_time:
+            self._next_phase(now)
+        return self.get_next_edge()
 
+    def _next_phase(self, now):
+        # phases are timed from when they actually start (not from the planned edge), so a late pass
+        # stretches the pattern a little rather than cutting a beep short
+        self._step = self._step + 1
+        if self._step < len(self._pattern):
+            self._set_pattern_output((self._step % 2) == 0)
+            self._edge_time = now + int(self._pattern[self._step] * _NS_PER_SECOND)
+        else:
+            self._set_pattern_output(False)
+            if not self._queue:
+                self._pattern = None
+                return
+            self._pattern = self._queue.pop(0)
+            self._step = -1           # the gap is an extra "off" phase before the pattern's first beep
+            self._edge_time = now + int(PATTERN_GAP * _NS_PER_SECOND)
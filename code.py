@@ -27,6 +27,21 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 # 
+# series 22 keeps time in integer time.monotonic_ns() nanoseconds throughout (timers, scheduler, beeper, time of day)
+# series 21 pauses program time during an interruption, takes lap splits (Split) and lists them on the notes pages
+# series 20 keeps all the timers in one bank (timer_bank.py);  tap the notes panel to page through them
+# series 19 builds the clock setting and diagnostics screens when first needed (or in idle time)
+# series 18 boots with a compressed splash, decoded a chunk of rows at a time
+# series 17 samples the battery a little at a time, smooths it, and shows the time remaining
+# series 16 turns off auto_refresh and refreshes the display once per loop pass (refresh_manager.py)
+# series 15 compiles the timers' color / warning / beep rules into sorted breakpoint tables
+# series 14 loads program durations and their timing rules from a catalog file (/durations.txt)
+# series 13 records competition events in a RAM ring, appended to /events.bin while the timer is stopped
+# series 12 collects garbage at idle points after redraws and keeps the notes panel from rebuilding strings
+# series 11 serves time of day from a monotonic anchor (rare I2C resyncs), refreshed on minute boundaries
+# series 10 plays beep patterns from the scheduler (no sleeping in quick_chirp), optional pwm tone
+# series 9 redraws the main timer on its exact second (or tenth) boundaries, optional m:ss.t display
+# series 8 replaces the fixed 0.1s sleep in the master loop with a deadline-driven scheduler
 # series 7 moves buttons into display_xxx modules
 # series 6 adds second screen (for tod set) using separate classes for each screen
 #          moved initialization for screen textboxes into display classes
@@ -41,6 +56,7 @@ from digitalio import DigitalInOut, Direction, Pull
 import displayio
 from adafruit_display_text.label import Label
 from adafruit_bitmap_font import bitmap_font
+import font_pack
 import terminalio   # added by dnk per https://learn.adafruit.com/circuitpython-display-support-using-displayio?view=all
 from adafruit_display_shapes.rect import Rect
 from adafruit_button import Button
@@ -48,24 +64,40 @@ import adafruit_touchscreen
 from analogio import AnalogIn
 
 from display_main import Display_Main
-from display_todset import Display_Todset
 from skating_info import Skating_Info
 from controller import Controller
 from beeper import Beep_Manager
 from real_time_clock import RealTimeClock
+from scheduler import Scheduler
+from loop_stats import Loop_Profiler
+from heap_monitor import Heap_Monitor
+from refresh_manager import Refresh_Manager
+import splash_image
+from event_log import Event_Log
+from duration_catalog import Duration_Catalog
+from glyph_widths import Glyph_Width_Table
 import myconstants
+import commands
+import time_format
 import battery_checker
 
 # initial splash screen just so it doesn't look dead for so long while it loads fonts 
 # cwd = ("/"+__file__).rsplit('/', 1)[0]      # the current working directory (where this file is)
 # startup_background = cwd+"/pyportal_splash.bmp"
+# the display is only refreshed when this code says so (see refresh_manager.py)
+refresh_manager = Refresh_Manager(board.DISPLAY)
 splash = displayio.Group()
 board.DISPLAY.show(splash)
-f = open("boot_splash_stopwatch.bmp", "rb")
-background = displayio.OnDiskBitmap(f)
-face = displayio.TileGrid(background, pixel_shader=displayio.ColorConverter(), x=0, y=0)
-splash.append(face)
-board.DISPLAY.wait_for_frame()
+try:
+    # the compressed splash (made by tools/make_splash.py) shows up a chunk of rows at a time as it is read
+    splash_image.load("/boot_splash_stopwatch.spl", splash, refresh_manager.refresh_now)
+except (OSError, ValueError, IndexError):
+    # no .spl on the board, or a damaged one:  the .bmp always works
+    f = open("boot_splash_stopwatch.bmp", "rb")
+    background = displayio.OnDiskBitmap(f)
+    face = displayio.TileGrid(background, pixel_shader=displayio.ColorConverter(), x=0, y=0)
+    splash.append(face)
+    refresh_manager.refresh_now()
 
 Coords = namedtuple("Point", "x y")
 
@@ -75,103 +107,256 @@ ts = adafruit_touchscreen.Touchscreen(board.TOUCH_XL, board.TOUCH_XR,
                                       size=(320, 240))
 
 # Load the font
-font = bitmap_font.load_font("/fonts/Arial-12.bdf")
-fontBig = bitmap_font.load_font("/fonts/Roboto-Bold-75.bdf")
-# fontBig = bitmap_font.load_font("/fonts/RobotoMono-Bold-78.bdf")
-# now preload the fonts so they display more quickly the first time
+# the precompiled glyph packs (made by tools/make_font_pack.py) load much faster than parsing the .bdf
+# files, so use them when they are on the board; otherwise fall back to the .bdf and preload its glyphs.
+# a character that is not in the pack is looked up in the .bdf (only opened if that ever happens)
 glyphs = b'0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-,.: '
-font.load_glyphs(glyphs)
-fontBig.load_glyphs(glyphs)
+# all the big font ever shows (the glyphs in its pack)
+glyphs_big = b'0123456789-:. '
+
+def load_font(name):
+    bdf_name = "/fonts/" + name + ".bdf"
+    try:
+        return font_pack.load_font("/fonts/" + name + ".fpk", fallback=lambda: bitmap_font.load_font(bdf_name))
+    except OSError:
+        bdf_font = bitmap_font.load_font(bdf_name)
+        # now preload the fonts so they display more quickly the first time
+        bdf_font.load_glyphs(glyphs)
+        return bdf_font
+
+font = load_font("Arial-12")
+fontBig = load_font("Roboto-Bold-75")
+# fontBig = load_font("RobotoMono-Bold-78")
+# and index the glyph advances once so labels can be right/center aligned without a layout pass
+# (the small font also shows a few punctuation marks in the notes panel, on buttons and on the diagnostics screen)
+font_widths = Glyph_Width_Table(font, glyphs + b'@()/+=')
+fontBig_widths = Glyph_Width_Table(fontBig, glyphs_big)
 
 # ======================== Make the main display context (watch) ========================
-# Make a background color fill
-color_bitmap = displayio.Bitmap(320, 240, 1)
-color_palette = displayio.Palette(1)
-color_palette[0] = myconstants.BLACK
-bg_sprite = displayio.TileGrid(color_bitmap, pixel_shader=color_palette, x=0, y=0)
+# no background fill:  displayio shows black wherever nothing is drawn, so a full screen black bitmap
+# behind each screen would only add a layer to every pixel of every refresh
 watch_group = displayio.Group(max_size=35)
-watch_group.append(bg_sprite)
 
-# ============ create secondary screen for TOD Clock Setting (not initially shown) ==============
-todset_group = displayio.Group(max_size=35)
-bg_sprite_tod = displayio.TileGrid(color_bitmap, pixel_shader=color_palette, x=0, y=0)
-todset_group.append(bg_sprite_tod)
+# ============ secondary screen for TOD Clock Setting (not initially shown) ==============
+# with LAZY_SCREENS on, this and the diagnostics screen (modules included) are only built when first
+# shown, or in idle time a little after boot (see job_build_screens)
+def build_display_todset():
+    from display_todset import Display_Todset
+    todset_group = displayio.Group(max_size=35)
+    return Display_Todset(todset_group, font, fontBig, font_widths, fontBig_widths)
+
+# ============ hidden diagnostics screen for loop timing stats (not initially shown) ==============
+def build_display_diag():
+    from display_diag import Display_Diag
+    diag_group = displayio.Group(max_size=35)
+    return Display_Diag(diag_group, font, fontBig, font_widths, fontBig_widths)
 
 # =========================== setup the classes for item management ========================
-display_main = Display_Main(watch_group, font, fontBig)
-display_todset = Display_Todset(todset_group, font, fontBig)
+display_main = Display_Main(watch_group, font, fontBig, font_widths, fontBig_widths)
 beep_manager = Beep_Manager()
 rtc_manager = RealTimeClock()
-skating_info = Skating_Info(display_main, beep_manager, rtc_manager)
-controller = Controller(display_main, display_todset, skating_info, beep_manager, rtc_manager)
+event_log = Event_Log("/events.bin", rtc_manager)
+catalog = Duration_Catalog()
+catalog.load("/durations.txt")
+skating_info = Skating_Info(display_main, beep_manager, rtc_manager, event_log, catalog)
+if myconstants.LAZY_SCREENS:
+    controller = Controller(display_main, None, skating_info, beep_manager, rtc_manager)
+    controller.defer_screen("todset", build_display_todset)
+else:
+    controller = Controller(display_main, build_display_todset(), skating_info, beep_manager, rtc_manager)
+
+# phases of the master loop that are timed when diagnostics are turned on (index into profiler)
+PHASE_LOOP = 0        # whole iteration, not counting the sleep at the end
+PHASE_TOUCH = 1       # reading the touchscreen
+PHASE_COMMAND = 2     # processing a button command
+PHASE_WATCH = 3       # skating_info.display_time()
+PHASE_NOTES = 4       # skating_info.display_notes_panel()
+PHASE_BATTERY = 5     # one battery a/d sample, or updating the gauge
+PHASE_BEEP = 6        # beep_manager.process_beep()
+PHASE_GC = 7          # garbage collection at an idle point (only counted when it collected)
+profiler = Loop_Profiler(["loop", "touch", "cmd", "watch", "notes", "batt", "beep", "gc"])
+GC_HEADROOM = 16384   # collect at an idle point once this many bytes have been used since the last one
+heap_monitor = Heap_Monitor(GC_HEADROOM)
+battery_monitor = battery_checker.Battery_Monitor()
+if myconstants.LAZY_SCREENS:
+    controller.enable_diagnostics(None, profiler, heap_monitor)
+    controller.defer_screen("diag", build_display_diag)
+else:
+    controller.enable_diagnostics(build_display_diag(), profiler, heap_monitor)
 
 controller.set_current_screen("watch")
 display_main.set_text_tod(rtc_manager.get_formatted_tod())
+refresh_manager.refresh_now()
+splash = None           # the splash bitmap is not needed again (it goes at the collection before the loop)
+
+# ======================== periodic jobs run from the master loop ========================
+# each job runs against time.monotonic_ns() deadlines so it does not drift by however long the
+# display/I2C work took, and the loop sleeps only until the next job (or touch poll) is due.  a job that
+# returns its next deadline returns integer nanoseconds (see scheduler.py)
+NS_PER_SECOND = 1000000000
+TOUCH_POLL_INTERVAL = 0.05    # seconds between touchscreen polls
+WATCH_REDRAW_PERIOD = 0.5     # redraw period while no timer is running (running timers redraw on their boundaries)
+TOD_REFRESH_PERIOD = 60       # fallback only;  the time of day job wakes itself on each minute boundary
+BATTERY_POLL_PERIOD = 60      # update the battery gauge every 1 minute for real (1 sec for testing)
+BATTERY_SAMPLE_PERIOD = 2     # one battery a/d reading this often, smoothed by battery_monitor
+SCREENSAVER_PERIOD = 1        # check for screen dimming once per second
+BEEP_PERIOD = 1               # idle re-check only;  a playing pattern sets the beep job's next edge itself
+DIAG_REFRESH_PERIOD = 1       # redraw the diagnostics screen (when it is showing) once per second
+EVENT_LOG_FLUSH_DELAY = 0.2   # write the event log this long after the press that made a flush due (after its chirp and redraw)
+EVENT_LOG_IDLE_PERIOD = 86400 # otherwise the event log job does nothing, so it is only run when woken
+BUILD_SCREENS_AFTER = 20      # seconds after boot before the deferred screens are built in idle time ...
+BUILD_SCREENS_PERIOD = 1      # ... one per this many seconds
+BUILD_SCREENS_DONE_PERIOD = 86400   # (the job has nothing left to do once they are all built)
+GC_CHECK_PERIOD = 5           # heap check when nothing is redrawing (otherwise it runs after each redraw's refresh)
+SCREENSAVER_DIM_AFTER = 590   # seconds without a touch before the screen dims
+SCREENSAVER_DARK_AFTER = 600  # seconds without a touch before the screen goes (almost) dark
+
+last_touch_time = time.monotonic()
+
+def job_watch_redraw():
+    if controller.get_current_screen() == "watch":
+        started = profiler.mark()
+        skating_info.display_time()         # only in watch mode
+        started = profiler.record(PHASE_WATCH, started)
+        skating_info.display_notes_panel()  # only in watch mode
+        profiler.record(PHASE_NOTES, started)
+        refresh_manager.request()
+        if beep_manager.is_playing():
+            scheduler.wake("beep")          # an alert may have just started a pattern
+        heap_monitor.request()              # the stretch after this redraw's refresh is the best time to collect
+        # come back exactly when the next shown second (or tenth) of a running timer ticks over
+        return skating_info.get_next_redraw_time()
+    # another screen is showing:  nothing to redraw, but the timers' beeps and colors still have to
+    # happen on time, so only come back when the next timing rule starts
+    skating_info.update_times()
+    if beep_manager.is_playing():
+        scheduler.wake("beep")
+    return skating_info.get_next_rule_time()
+
+def job_tod_refresh():
+    if controller.get_current_screen() == "watch":
+        display_main.set_text_tod(rtc_manager.get_formatted_tod())
+        refresh_manager.request()
+    return rtc_manager.get_next_minute_time()
+
+def job_screensaver():
+    idle_time = time.monotonic() - last_touch_time
+    if idle_time > SCREENSAVER_DARK_AFTER:
+        board.DISPLAY.brightness = 0.02
+    elif idle_time > SCREENSAVER_DIM_AFTER:
+        board.DISPLAY.brightness = 0.1
+    else:
+        board.DISPLAY.brightness = 1
+
+def job_battery_sample():
+    started = profiler.mark()
+    battery_monitor.sample()
+    profiler.record(PHASE_BATTERY, started)
 
-cur_button_label = ""         # will hold "label" (the display text) of most recently clicked button 
+def job_battery():
+    started = profiler.mark()
+    batt_percent = battery_monitor.get_percent()
+    # display_main.set_text_wnb3("Vbat:"+str(raw_volts)+" PCT:"+str(batt_percent))
+    display_main.show_battery_status(batt_percent)
+    display_main.show_battery_time(battery_monitor.get_minutes_remaining(), batt_percent > 100)
+    refresh_manager.request()
+    profiler.record(PHASE_BATTERY, started)
+
+def job_beep():
+    started = profiler.mark()
+    next_run = beep_manager.process_beep()
+    profiler.record(PHASE_BEEP, started)
+    return next_run
+
+def job_diag():
+    if controller.get_current_screen() == "diag":
+        controller.get_current_display().show_stats(profiler, scheduler, heap_monitor, display_main)
+        refresh_manager.request()
+
+def job_event_log():
+    if event_log.is_flush_due() and not skating_info.is_main_timer_running():
+        event_log.flush()
+
+# builds the deferred screens one per run, only while nothing is being timed, then goes quiet
+def job_build_screens():
+    if skating_info.is_main_timer_running() or controller.get_current_screen() != "watch":
+        return None
+    controller.build_deferred_screen()
+    if not controller.has_deferred_screens():
+        scheduler.set_period("screens", BUILD_SCREENS_DONE_PERIOD)
+        return time.monotonic_ns() + (BUILD_SCREENS_DONE_PERIOD * NS_PER_SECOND)
+
+def job_gc():
+    started = profiler.mark()
+    if heap_monitor.collect_if_needed():
+        profiler.record(PHASE_GC, started)
+
+scheduler = Scheduler()
+scheduler.add_job("watch", WATCH_REDRAW_PERIOD, job_watch_redraw)
+scheduler.add_job("tod", TOD_REFRESH_PERIOD, job_tod_refresh, rtc_manager.get_next_minute_time())
+scheduler.add_job("battsample", BATTERY_SAMPLE_PERIOD, job_battery_sample)
+# the first gauge update waits for a few samples to have gone into the average
+scheduler.add_job("battery", BATTERY_POLL_PERIOD, job_battery, time.monotonic_ns() + (5 * BATTERY_SAMPLE_PERIOD * NS_PER_SECOND))
+scheduler.add_job("screensaver", SCREENSAVER_PERIOD, job_screensaver)
+scheduler.add_job("beep", BEEP_PERIOD, job_beep)
+scheduler.add_job("diag", DIAG_REFRESH_PERIOD, job_diag)
+scheduler.add_job("eventlog", EVENT_LOG_IDLE_PERIOD, job_event_log)
+scheduler.add_job("gc", GC_CHECK_PERIOD, job_gc)
+if controller.has_deferred_screens():
+    scheduler.add_job("screens", BUILD_SCREENS_PERIOD, job_build_screens, time.monotonic_ns() + (BUILD_SCREENS_AFTER * NS_PER_SECOND))
+
+if myconstants.ALLOCATION_FREE:
+    time_format.prefill()
+
+# start the loop with everything left over from loading fonts and building screens cleaned up
+heap_monitor.collect()
+
+cur_button_command = commands.CMD_NONE     # will hold command id (see commands.py) of most recently clicked button
 cur_button_id = None          # will hold id of most recently clicked button
-screensaver_timer = 0         # counts how long before screen dims if no touches
-batt_counter = 0              # counts holw long between battery updates
-tod_timer = 0                 # update time of day display only every 60 sec
-watch_timer = 0               # update big (main) timer DISPLAY every 0.5 sec to reduce lagtime at startup
 while True:
+    loop_started = profiler.mark()
     point = ts.touch_point
+    profiler.record(PHASE_TOUCH, loop_started)
     # if the screen is currently being touched (probably a button being pressed)
     if point is not None:
-        screensaver_timer = 0      # register the touch for screensaver countdown
+        # register the touch for screensaver countdown (and undim right away if it was dimmed)
+        if time.monotonic() - last_touch_time > SCREENSAVER_DIM_AFTER:
+            scheduler.wake("screensaver")
+        last_touch_time = time.monotonic()
 
-        if controller.get_current_screen() == "watch":
-            cur_button_id = display_main.see_if_any_button_clicked(point)
-            if cur_button_id != None:
-                cur_button_label = display_main.get_button_label(cur_button_id)
-        elif controller.get_current_screen() == "todset":
-            cur_button_id = display_todset.see_if_any_button_clicked(point)
-            if cur_button_id != None:
-                cur_button_label = display_todset.get_button_label(cur_button_id)
+        current_display = controller.get_current_display()
+        cur_button_id = current_display.see_if_any_button_clicked(point)
+        if cur_button_id != None:
+            cur_button_command = current_display.get_button_command(cur_button_id)
+            refresh_manager.request()      # show the button pressed (inverted) right away
 
     # here, no button is pressed, so we check to see if a button was recently pressed/released
     # but has not been processed yet.  if an unprocessed command is pending, then deselect
     # the button and then process the command, then indicate that it has been processed
     elif cur_button_id != None:
         cur_button_id.selected = False
+        started = profiler.mark()
+        controller.process_command(cur_button_command)
+        profiler.record(PHASE_COMMAND, started)
 
-        if controller.get_current_screen() == "watch":
-            controller.process_command_watch(cur_button_label)
-        elif controller.get_current_screen() == "todset":
-            controller.process_command_todset(cur_button_label)
-
-        cur_button_label = ""
+        cur_button_command = commands.CMD_NONE
         cur_button_id = None
+        scheduler.wake("watch")     # a command may have started/stopped a timer, so re-plan the redraw
+        scheduler.wake("tod")       # ... or set the clock / come back to the watch screen
+        scheduler.wake("beep")
+        refresh_manager.request()
+        if event_log.is_flush_due():
+            scheduler.set_next_run("eventlog", time.monotonic_ns() + int(EVENT_LOG_FLUSH_DELAY * NS_PER_SECOND))
 
-    watch_timer += 1
-    if watch_timer >= 2:
-        if controller.get_current_screen() == "watch":
-            skating_info.display_time()         # only in watch mode
-            skating_info.display_notes_panel()  # onoy in watch mode
-            watch_timer = 0
-
-    tod_timer = tod_timer + 1
-    if tod_timer >= 600:
-        if controller.get_current_screen() == "watch":
-            display_main.set_text_tod(rtc_manager.get_formatted_tod())
-        tod_timer = 0
-
-    screensaver_timer = screensaver_timer + 1
-    if screensaver_timer > 6000:
-        board.DISPLAY.brightness = 0.02
-    elif screensaver_timer > 5900:
-        board.DISPLAY.brightness = 0.1
-    else:
-        board.DISPLAY.brightness = 1
-      
-    batt_counter = batt_counter + 1
-    # if batt_counter > 9:            # update battery voltage once per second for testing...
-    if batt_counter > 600:            # update battery voltage every 1 minute for real
-        batt_counter = 0
-        raw_volts = battery_checker.get_voltage()
-        batt_percent = battery_checker.get_battery_pct()
-        # display_main.set_text_wnb3("Vbat:"+str(raw_volts)+" PCT:"+str(batt_percent))
-        display_main.show_battery_status(batt_percent) 
-
-    beep_manager.process_beep()
-    time.sleep(0.1)
\ No newline at end of file
+    scheduler.run_pending()
+    # everything the commands and jobs of this pass changed goes to the screen in one refresh
+    refresh_manager.refresh()
+    # a press's chirp starts with its screen response, and the beep job (due at the chirp's end) stops
+    # it on a later pass, so the loop never waits for the beeper and a refresh never stretches the chirp
+    if beep_manager.start_chirp():
+        scheduler.set_next_run("beep", beep_manager.get_next_edge())
+    # a collection the redraw asked for waits until its refresh is on the screen
+    if heap_monitor.is_requested():
+        job_gc()
+    profiler.record(PHASE_LOOP, loop_started)
+    scheduler.sleep_until_next(TOUCH_POLL_INTERVAL)
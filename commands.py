@@ -0,0 +1,97 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  commands.py defines button command ids and the registry that maps them to handlers per screen
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# each button carries a command id (set together with its label), so what a press does no longer
+# depends on the text painted on the button.  several labels can share one command ("Start" and
+# "Start\\nNew" are both CMD_START) and a label with nothing to do (ie "..") carries CMD_NONE.
+#
+"""
+
+CMD_NONE = 0
+
+# watch (main) screen
+CMD_START = 1
+CMD_STOP = 2
+CMD_RESET = 3
+CMD_INTERRUPT = 4
+CMD_CONTINUE = 5
+CMD_WHISTLE = 6
+CMD_WARMUP = 7
+CMD_COMPETE = 8
+CMD_CALL_SKATER = 9
+CMD_CHANGE_DURATION = 10
+CMD_SILENT = 11
+CMD_NOISY = 12
+CMD_CLOCK_SET = 13
+CMD_DIAGNOSTICS_TAP = 14
+CMD_TOGGLE_TENTHS = 15
+CMD_NEXT_CATEGORY = 16
+CMD_NEXT_TIMER_PAGE = 17
+CMD_SPLIT = 18
+
+# todset (clock setting) screen
+CMD_TOD_SET = 20
+CMD_TOD_CANCEL = 21
+CMD_HOUR_UP = 22
+CMD_HOUR_DOWN = 23
+CMD_MINUTE_UP = 24
+CMD_MINUTE_DOWN = 25
+CMD_AMPM = 26
+
+# diag (loop statistics) screen
+CMD_DIAG_BACK = 30
+CMD_DIAG_RESET = 31
+CMD_DIAG_PAUSE = 32
+
+class Command_Registry:
+    def __init__(self):
+        self._tables = {}          # screen name -> {command id: handler}
+
+    # table is a dict of command id -> callable taking no arguments; a screen can be registered
+    # all at once with a table, or one command at a time with register()
+    def register_screen(self, screen, table=None):
+        if table is None:
+            table = {}
+        self._tables[screen] = table
+
+    def register(self, screen, command, handler):
+        if screen not in self._tables:
+            self._tables[screen] = {}
+        self._tables[screen][command] = handler
+
+    # runs the handler for command on screen; returns False if there was nothing registered for it
+    def dispatch(self, screen, command):
+        table = self._tables.get(screen)
+        if table is None:
+            return False
+        handler = table.get(command)
+        if handler is None:
+            return False
+        handler()
+        return True
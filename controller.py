@@ -32,170 +32,316 @@ import time
 import board
 from digitalio import DigitalInOut, Direction, Pull
 import myconstants
+import commands
+from commands import Command_Registry
 
 class Controller:
     def __init__(self, display_main, display_todset, skating_info, beep_manager, rtc_manager):        
         self._display_main = display_main  
-        self._display_todset = display_todset       
         self._skating_info = skating_info
         self._beep_manager = beep_manager
         self._rtc_manager = rtc_manager
         self._current_screen = "watch"              # "watch" (main), "todset", "talk" 
+        self._displays = {"watch": display_main}
+        self._builders = {}                         # screen -> builder() for screens not made yet (see defer_screen)
+        if display_todset is not None:
+            self._displays["todset"] = display_todset
+
+        # button presses are dispatched by the command id the button carries (see commands.py),
+        # looked up in the table for whichever screen is showing
+        self._commands = Command_Registry()
+        self._commands.register_screen("watch", {
+            commands.CMD_START: self._cmd_start,
+            commands.CMD_STOP: self._cmd_stop,
+            commands.CMD_RESET: self._cmd_reset,
+            commands.CMD_INTERRUPT: self._cmd_interrupt,
+            commands.CMD_CONTINUE: self._cmd_continue,
+            commands.CMD_WHISTLE: self._cmd_whistle,
+            commands.CMD_WARMUP: self._cmd_warmup,
+            commands.CMD_COMPETE: self._cmd_compete,
+            commands.CMD_CALL_SKATER: self._cmd_call_skater,
+            commands.CMD_CHANGE_DURATION: self._cmd_change_duration,
+            commands.CMD_SILENT: self._cmd_silent,
+            commands.CMD_NOISY: self._cmd_noisy,
+            commands.CMD_CLOCK_SET: self._cmd_clock_set,
+            commands.CMD_TOGGLE_TENTHS: self._cmd_toggle_tenths,
+            commands.CMD_NEXT_CATEGORY: self._cmd_next_category,
+            commands.CMD_NEXT_TIMER_PAGE: self._cmd_next_timer_page,
+            commands.CMD_SPLIT: self._cmd_split,
+        })
+        self._commands.register_screen("todset", {
+            commands.CMD_TOD_SET: self._cmd_tod_set,
+            commands.CMD_TOD_CANCEL: self._cmd_tod_cancel,
+            commands.CMD_HOUR_UP: self._cmd_hour_up,
+            commands.CMD_HOUR_DOWN: self._cmd_hour_down,
+            commands.CMD_MINUTE_UP: self._cmd_minute_up,
+            commands.CMD_MINUTE_DOWN: self._cmd_minute_down,
+            commands.CMD_AMPM: self._cmd_ampm,
+        })
+
+    # lets a new screen plug in: display is its Display_xxx object (None if it was given to defer_screen),
+    # table maps command id -> handler
+    def register_screen(self, screen, display, table):
+        if display is not None:
+            self._displays[screen] = display
+        self._commands.register_screen(screen, table)
+
+    # a rarely used screen need not be built before the master loop starts:  builder() makes and returns its
+    # Display_xxx object the first time the screen is shown, or earlier through build_deferred_screen()
+    def defer_screen(self, screen, builder):
+        self._builders[screen] = builder
+
+    def get_display(self, screen):
+        if screen not in self._displays:
+            builder = self._builders.pop(screen, None)
+            if builder is None:
+                return None
+            self._displays[screen] = builder()
+        return self._displays[screen]
+
+    def has_deferred_screens(self):
+        return len(self._builders) > 0
+
+    # builds one of the deferred screens (call in idle time);  returns False when there were none left
+    def build_deferred_screen(self):
+        for screen in self._builders:
+            self.get_display(screen)
+            return True
+        return False
+
+    # the diagnostics screen is optional; once enabled, tapping the time of day 3 times opens it
+    # (display_diag may be None if the screen is deferred, see defer_screen)
+    def enable_diagnostics(self, display_diag, profiler, heap_monitor=None):
+        self._profiler = profiler
+        self._heap_monitor = heap_monitor
+        self._diag_taps = 0
+        self._diag_first_tap_time = 0
+        self.register_screen("diag", display_diag, {
+            commands.CMD_DIAG_BACK: self._cmd_diag_back,
+            commands.CMD_DIAG_RESET: self._cmd_diag_reset,
+            commands.CMD_DIAG_PAUSE: self._cmd_diag_pause,
+        })
+        self._commands.register("watch", commands.CMD_DIAGNOSTICS_TAP, self._cmd_diagnostics_tap)
 
     def get_current_screen(self):
         return self._current_screen
 
+    def get_current_display(self):
+        return self._displays[self._current_screen]
+
     def set_current_screen(self, new_screen):
         if new_screen == "watch":
             self._current_screen = new_screen
             self._display_main.show_this_screen()
         elif new_screen == "todset":
+            display_todset = self.get_display("todset")
             self._rtc_manager.read_clock()
-            self._display_todset.set_desired_all(self._rtc_manager.get_hour(),self._rtc_manager.get_min(), self._rtc_manager.get_ampm())
+            display_todset.set_desired_all(self._rtc_manager.get_hour(),self._rtc_manager.get_min(), self._rtc_manager.get_ampm())
             self._current_screen = new_screen
-            self._display_todset.show_this_screen()
+            display_todset.show_this_screen()
+        elif self.get_display(new_screen) is not None:
+            self._current_screen = new_screen
+            self._displays[new_screen].show_this_screen()
         else:
             pass
 
-    def process_command_watch(self, input_key):
-        if input_key == "Start" or input_key == "Start\nNew":
-            self._display_main.set_btnSS("Stop")
-            self._skating_info.show_program_phase("InProgram")
-            self._skating_info.reset_main_time()
-            self._skating_info.start_main_timer()
-            self._skating_info.reset_interrupt_timer()
-            self._skating_info.stop_call_timer()
-            self._skating_info.stop_separation_timer()
-
-            if self._skating_info.is_mode_program():  
-                self._display_main.set_btnD("Interrupt")
-            self._beep_manager.quick_chirp()
+    def process_command(self, command):
+        self._commands.dispatch(self._current_screen, command)
 
-        elif input_key == "Stop":
-            self._display_main._watch_display_box.color = myconstants.BLUE
-            self._display_main.set_btnSS("Start\nNew")
-            self._skating_info.show_program_phase("Between")
-            self._skating_info.stop_main_timer()
-            self._skating_info.stop_interrupt_timer()
-            self._skating_info.start_separation_timer();
-            if self._skating_info.is_mode_program():
-                self._display_main.set_btnD("Call.Sk")
-            self._beep_manager.quick_chirp()
+    # ======================== watch (main) screen commands ========================
+    def _cmd_start(self):
+        self._display_main.set_btnSS("Stop", commands.CMD_STOP)
+        self._skating_info.show_program_phase("InProgram")
+        self._skating_info.reset_main_time()
+        self._skating_info.start_main_timer()
+        self._skating_info.reset_interrupt_timer()
+        self._skating_info.stop_call_timer()
+        self._skating_info.stop_separation_timer()
 
-        elif input_key == "Reset":
-            self._display_main.set_btnSS("Start")
-            self._skating_info.reset_main_time()
-            self._beep_manager.quick_chirp()
+        if self._skating_info.is_mode_program():  
+            self._display_main.set_btnC("Split", commands.CMD_SPLIT)
+            self._display_main.set_btnD("Interrupt", commands.CMD_INTERRUPT)
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "Interrupt":
-            self._display_main.set_btnD("Continue")  
-            self._display_main.set_btnC("Talk")         
-            self._skating_info.start_interrupt_timer()
-            self._beep_manager.quick_chirp()
-
-        elif input_key == "Continue":
-            # self._btnD_button.selected = False  
-            self._display_main.set_btnD("Interrupt") 
-            self._display_main.set_btnC("..")          
-            self._skating_info.stop_interrupt_timer()
-            self._beep_manager.quick_chirp()
-
-        elif input_key == "Whistle":
-            self._beep_manager.set_beep_counter(30)
-
-        elif input_key == "Warmup":
-            self._display_main.set_btnA("Compete")
-            self._display_main.set_btnSS("Start")
-            if self._beep_manager.is_noisy_mode():
-                self._display_main.set_btnC("Silent")
-            else:
-                self._display_main.set_btnC("Noisy")
-            self._display_main.set_btnD("Clk.Set")
-            self._skating_info.set_mode_warmup()
-            self._skating_info.reset_main_time()
+    def _cmd_stop(self):
+        self._display_main.set_color_tdb(myconstants.BLUE)
+        self._display_main.set_btnSS("Start\nNew", commands.CMD_START)
+        self._skating_info.show_program_phase("Between")
+        self._skating_info.stop_main_timer()
+        self._skating_info.stop_interrupt_timer()
+        self._skating_info.start_separation_timer();
+        if self._skating_info.is_mode_program():
+            self._display_main.set_btnC("Next.Cat", commands.CMD_NEXT_CATEGORY)
+            self._display_main.set_btnD("Call.Sk", commands.CMD_CALL_SKATER)
             self._skating_info.display_dur_info()
-            self._skating_info.display_notes_panel()
-            self._beep_manager.quick_chirp()
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "Compete":
-            self._display_main.set_btnA("Warmup")
-            self._display_main.set_btnSS("Start")
-            self._display_main.set_btnC("..")
-            self._display_main.set_btnD("Call.Sk")
-            self._skating_info.set_mode_program()
-            self._skating_info.reset_main_time()
-            self._skating_info.reset_call_timer()
-            self._skating_info.reset_separation_timer()
-            self._skating_info.display_dur_info()
-            self._skating_info.display_notes_panel(True)
-            self._beep_manager.quick_chirp()
+    def _cmd_reset(self):
+        self._display_main.set_btnSS("Start", commands.CMD_START)
+        self._skating_info.reset_main_time()
+        self._skating_info.show_category()
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "Call.Sk":
-            self._display_main.set_btnSS("Start")
-            self._skating_info.show_program_phase("Called")
-            self._skating_info.start_call_timer()
-            self._skating_info.reset_main_time()
-            self._beep_manager.quick_chirp()
+    def _cmd_interrupt(self):
+        self._display_main.set_btnD("Continue", commands.CMD_CONTINUE)  
+        self._display_main.set_btnC("Talk", commands.CMD_NONE)         
+        self._skating_info.show_program_phase("Paused")
+        self._skating_info.start_interrupt_timer()
+        self._skating_info.display_time()
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "Chg.Dur":
-            self._skating_info.cycle_to_next_available_duration()
-            self._skating_info.display_dur_info()
-            self._skating_info.display_time()
-            self._skating_info.display_notes_panel()
-            self._beep_manager.quick_chirp()            
-
-        elif input_key == "Silent":
-            self._beep_manager.set_quiet_mode()
-            self._display_main.set_btnC("Noisy")
-            self._skating_info.display_notes_panel()
-            self._beep_manager.quick_chirp()                       
-
-        elif input_key == "Noisy":
-            self._beep_manager.set_noisy_mode()
-            self._display_main.set_btnC("Silent")
-            self._skating_info.display_notes_panel()
-            self._beep_manager.quick_chirp()     
-
-        elif input_key == "Clk.Set":
-            self.set_current_screen("todset")
-            self._beep_manager.quick_chirp()
+    def _cmd_continue(self):
+        self._display_main.set_btnD("Interrupt", commands.CMD_INTERRUPT) 
+        self._display_main.set_btnC("Split", commands.CMD_SPLIT)
+        self._skating_info.show_program_phase("InProgram")
+        self._skating_info.stop_interrupt_timer()
+        self._beep_manager.quick_chirp()
 
+    def _cmd_whistle(self):
+        self._beep_manager.play("whistle")
+
+    def _cmd_warmup(self):
+        self._display_main.set_btnA("Compete", commands.CMD_COMPETE)
+        self._display_main.set_btnSS("Start", commands.CMD_START)
+        if self._beep_manager.is_noisy_mode():
+            self._display_main.set_btnC("Silent", commands.CMD_SILENT)
         else:
-            pass
+            self._display_main.set_btnC("Noisy", commands.CMD_NOISY)
+        self._display_main.set_btnD("Clk.Set", commands.CMD_CLOCK_SET)
+        self._skating_info.set_mode_warmup()
+        self._skating_info.reset_main_time()
+        self._skating_info.display_dur_info()
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()
 
+    def _cmd_compete(self):
+        self._display_main.set_btnA("Warmup", commands.CMD_WARMUP)
+        self._display_main.set_btnSS("Start", commands.CMD_START)
+        self._display_main.set_btnC("Next.Cat", commands.CMD_NEXT_CATEGORY)
+        self._display_main.set_btnD("Call.Sk", commands.CMD_CALL_SKATER)
+        self._skating_info.set_mode_program()
+        self._skating_info.reset_main_time()
+        self._skating_info.reset_call_timer()
+        self._skating_info.reset_separation_timer()
+        self._skating_info.display_dur_info()
+        self._skating_info.show_category()
+        self._skating_info.display_notes_panel(True)
+        self._beep_manager.quick_chirp()
 
-    def process_command_todset(self, input_key):
-        if input_key == "Set":
-            # actually write the displayed time to the TOD CLOCK board here
-            self._rtc_manager.set_clock(self._display_todset.get_desired_hours(), 
-                                        self._display_todset.get_desired_minutes(), 
-                                        self._display_todset.get_desired_ampm())
-            self.set_current_screen("watch")
-            self._beep_manager.quick_chirp()          
+    def _cmd_call_skater(self):
+        self._display_main.set_btnSS("Start", commands.CMD_START)
+        self._skating_info.show_program_phase("Called")
+        self._skating_info.start_call_timer()
+        self._skating_info.reset_main_time()
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "Cancel":
-            self.set_current_screen("watch")
-            self._beep_manager.quick_chirp()         
+    def _cmd_change_duration(self):
+        self._skating_info.cycle_to_next_available_duration()
+        self._skating_info.display_dur_info()
+        self._skating_info.show_category()
+        self._skating_info.display_time()
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()            
 
-        elif input_key == "+ H":
-            self._display_todset.increment_desired_hours()
-            self._beep_manager.quick_chirp()       
+    def _cmd_next_category(self):
+        self._skating_info.jump_to_next_category()
+        self._skating_info.display_dur_info()
+        self._skating_info.show_category()
+        self._skating_info.display_time()
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "- H":
-            self._display_todset.decrement_desired_hours()
-            self._beep_manager.quick_chirp()        
+    def _cmd_silent(self):
+        self._beep_manager.set_quiet_mode()
+        self._display_main.set_btnC("Noisy", commands.CMD_NOISY)
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()                       
 
-        elif input_key == "+ M":
-            self._display_todset.increment_desired_minutes()
-            self._beep_manager.quick_chirp()       
+    def _cmd_noisy(self):
+        self._beep_manager.set_noisy_mode()
+        self._display_main.set_btnC("Silent", commands.CMD_SILENT)
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()     
 
-        elif input_key == "- M":
-            self._display_todset.decrement_desired_minutes()
-            self._beep_manager.quick_chirp()     
+    def _cmd_clock_set(self):
+        self.set_current_screen("todset")
+        self._beep_manager.quick_chirp()
 
-        elif input_key == "AM/PM":
-            self._display_todset.toggle_desired_ampm()
+    def _cmd_toggle_tenths(self):
+        self._skating_info.toggle_tenths()
+        self._skating_info.display_time()
+        self._beep_manager.quick_chirp()
+
+    def _cmd_split(self):
+        self._skating_info.split_main_timer()
+        self._skating_info.display_notes_panel()
+        self._beep_manager.quick_chirp()
+
+    def _cmd_next_timer_page(self):
+        self._skating_info.show_next_timer_page()
+        self._beep_manager.quick_chirp()
+
+    def _cmd_diagnostics_tap(self):
+        now = time.monotonic()
+        if now - self._diag_first_tap_time > 2:
+            self._diag_taps = 0
+            self._diag_first_tap_time = now
+        self._diag_taps = self._diag_taps + 1
+        if self._diag_taps >= 3:
+            self._diag_taps = 0
+            self._profiler.set_enabled(True)
+            self.set_current_screen("diag")
+            self.get_display("diag").set_paused(False)
             self._beep_manager.quick_chirp()
 
-        else:
-            pass
\ No newline at end of file
+    # ======================== todset (clock setting) screen commands ========================
+    def _cmd_tod_set(self):
+        # actually write the displayed time to the TOD CLOCK board here
+        display_todset = self.get_display("todset")
+        self._rtc_manager.set_clock(display_todset.get_desired_hours(), 
+                                    display_todset.get_desired_minutes(), 
+                                    display_todset.get_desired_ampm())
+        self.set_current_screen("watch")
+        self._beep_manager.quick_chirp()          
+
+    def _cmd_tod_cancel(self):
+        self.set_current_screen("watch")
+        self._beep_manager.quick_chirp()         
+
+    def _cmd_hour_up(self):
+        self.get_display("todset").increment_desired_hours()
+        self._beep_manager.quick_chirp()       
+
+    def _cmd_hour_down(self):
+        self.get_display("todset").decrement_desired_hours()
+        self._beep_manager.quick_chirp()        
+
+    def _cmd_minute_up(self):
+        self.get_display("todset").increment_desired_minutes()
+        self._beep_manager.quick_chirp()       
+
+    def _cmd_minute_down(self):
+        self.get_display("todset").decrement_desired_minutes()
+        self._beep_manager.quick_chirp()     
+
+    def _cmd_ampm(self):
+        self.get_display("todset").toggle_desired_ampm()
+        self._beep_manager.quick_chirp()
+
+    # ======================== diag (loop statistics) screen commands ========================
+    # note leaving the screen does not stop the profiler, so it keeps collecting during real use
+    def _cmd_diag_back(self):
+        self.set_current_screen("watch")
+        self._beep_manager.quick_chirp()
+
+    def _cmd_diag_reset(self):
+        self._profiler.reset()
+        self._display_main.reset_render_stats()
+        if self._heap_monitor is not None:
+            self._heap_monitor.reset()
+        self._beep_manager.quick_chirp()
+
+    def _cmd_diag_pause(self):
+        enabled = self._profiler.toggle()
+        self.get_display("diag").set_paused(not enabled)
+        self._beep_manager.quick_chirp()
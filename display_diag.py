@@ -0,0 +1,181 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  display_diag.py class manages low level details of the (hidden) loop diagnostics screen
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+# 
+# MIT License
+# 
+# Copyright (c) 2019 Don Korte
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# 
+#
+"""
+import time
+import board
+from adafruit_display_text.label import Label
+from collections import namedtuple
+from adafruit_button import Button
+from hit_grid import Hit_Grid
+import commands
+import myconstants
+
+Coords = namedtuple("Point", "x y")
+
+# Settings
+BUTTON_WIDTH = 72
+BUTTON_HEIGHT = 52
+BUTTON_MARGIN = 8
+NUM_LINES = 11
+LINE_SPACING = 19
+LINE_GLYPHS = 40
+
+# nanoseconds -> "12.3" (milliseconds, one decimal) without float math
+def _ms_text(ns):
+    tenths = ns // 100000
+    return str(tenths // 10) + "." + str(tenths % 10)
+
+# bytes -> "12.3" (kilobytes, one decimal)
+def _kb_text(nbytes):
+    tenths = (nbytes * 10) // 1024
+    return str(tenths // 10) + "." + str(tenths % 10)
+
+class Display_Diag:
+    def __init__(self, this_group, font, fontbig, font_widths=None, fontbig_widths=None):
+        self._this_group = this_group
+        self._font = font
+        self._fontbig = fontbig
+        self._font_widths = font_widths          # Glyph_Width_Table for font (None = measure labels)
+        self._fontbig_widths = fontbig_widths    # Glyph_Width_Table for fontbig
+
+        self.headertext = Label(self._font, text="Loop ms: min/avg/max/p99", color=myconstants.WHITE, max_glyphs=28)
+        self.headertext.x = 8
+        self.headertext.y = 12
+        self._this_group.append(self.headertext)
+
+        self._lines = []
+        for i in range(NUM_LINES):
+            line = Label(self._font, text="", color=myconstants.YELLOW, max_glyphs=LINE_GLYPHS)
+            line.x = 8
+            line.y = 34 + (i * LINE_SPACING)
+            self._this_group.append(line)
+            self._lines.append(line)
+
+        self._buttons = []
+        self._hit_grid = Hit_Grid()     # touch point -> button lookup, filled in as buttons are added
+        self._button_commands = {}      # id(button) -> command id it carries (see commands.py)
+        self._add_button(3, 1, "Back", 1, 1, myconstants.SMOKY_GREEN, myconstants.WHITE, commands.CMD_DIAG_BACK)
+        self._add_button(3, 2, "Reset", 1, 1, myconstants.RED, myconstants.WHITE, commands.CMD_DIAG_RESET)
+        self._btn_pause = self._add_button(3, 3, "Pause", 1, 1, myconstants.BLUE, myconstants.WHITE, commands.CMD_DIAG_PAUSE)
+
+        for b in self._buttons:
+            self._this_group.append(b.group)
+
+
+    def show_this_screen(self):
+        board.DISPLAY.show(self._this_group)
+
+
+    def _button_grid(self, row, col):
+        return Coords(BUTTON_MARGIN * (row + 1) + BUTTON_WIDTH * row - (4),
+                      BUTTON_MARGIN * (col + 1) + BUTTON_HEIGHT * col - (4))
+
+    def _add_button(self, row, col, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK, command=commands.CMD_NONE):
+        pos = self._button_grid(row, col)
+        pixel_width = BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1)
+        pixel_height = BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1)
+        new_button = Button(x=pos.x, y=pos.y,
+                            width=pixel_width,
+                            height=pixel_height,
+                            label=label, label_font=self._font,
+                            label_color=text_color, fill_color=color, style=Button.ROUNDRECT)
+        self._buttons.append(new_button)
+        self._hit_grid.add(new_button, pos.x, pos.y, pixel_width, pixel_height)
+        self._button_commands[id(new_button)] = command
+        return new_button
+
+    def get_button_label(self, button_id):
+        return button_id.label
+
+    def get_button_command(self, button_id):
+        return self._button_commands[id(button_id)]
+
+    # called with the point coordinates of a screen touch event; if this is a button, return its id, else return None
+    # if a button is clicked, it sets it so "selected" state so its color is inverse
+    def see_if_any_button_clicked(self, point):  
+        btn_clicked = self._hit_grid.find(point)
+        if btn_clicked != None:
+            btn_clicked.selected = True
+        return btn_clicked
+
+    def set_paused(self, paused):
+        if paused:
+            self._btn_pause.label = "Run"
+        else:
+            self._btn_pause.label = "Pause"
+
+    def _set_line(self, index, text):
+        if index < NUM_LINES and self._lines[index].text != text:
+            self._lines[index].text = text
+
+    # one line per loop phase, one line listing scheduler jobs that have overrun, then (given a
+    # heap_monitor) a line for the heap:  free / low watermark kB, collections (automatic ones), max pause ms,
+    # and (given display_main) a line for the watch screen's label writes:  made, skipped as unchanged
+    def show_stats(self, profiler, scheduler, heap_monitor=None, display_main=None):
+        index = 0
+        for phase in profiler.get_phases():
+            summary = phase.summary()
+            if summary is None:
+                text = phase.name + ": --"
+            else:
+                text = phase.name + ": " + "/".join([_ms_text(ns) for ns in summary])
+            self._set_line(index, text)
+            index += 1
+
+        text = "overruns:"
+        for name in scheduler.get_job_names():
+            overruns = scheduler.get_overruns(name)
+            if overruns > 0:
+                item = " " + name + "=" + str(overruns)
+                if len(text) + len(item) > LINE_GLYPHS - 2:
+                    text = text + " +"          # more jobs overran than fit on the line
+                    break
+                text = text + item
+        self._set_line(index, text)
+        index += 1
+
+        if heap_monitor is not None:
+            text = "heap: " + _kb_text(heap_monitor.get_free()) + "/" + _kb_text(heap_monitor.get_low_watermark())
+            text = text + "k gc " + str(heap_monitor.get_collections()) + " (" + str(heap_monitor.get_auto_collections())
+            text = text + ") " + _ms_text(heap_monitor.get_max_pause_ns()) + "ms"
+            self._set_line(index, text)
+            index += 1
+
+        if display_main is not None:
+            applied, skipped = display_main.get_render_stats()
+            text = "labels: " + str(applied) + " set " + str(skipped) + " same"
+            self._set_line(index, text)
+            index += 1
+
+        while index < NUM_LINES:
+            self._set_line(index, "")
+            index += 1
@@ -35,7 +35,12 @@ from adafruit_display_shapes.rect import Rect
 from adafruit_display_text.label import Label
 from collections import namedtuple
 from adafruit_button import Button
+from glyph_widths import label_width
+from hit_grid import Hit_Grid, Hotspot
+import commands
 import myconstants
+from time_format import two_digits
+from bar_gauge import Bar_Gauge
 
 Coords = namedtuple("Point", "x y")
 
@@ -44,11 +49,34 @@ BUTTON_WIDTH = 72
 BUTTON_HEIGHT = 52
 BUTTON_MARGIN = 8
 
+# battery gauge segments, left to right:  lit above this percentage, in this color
+_BATTERY_STEPS = (5, 10, 20, 30, 40, 50, 60, 70, 80, 90)
+_BATTERY_COLORS = (myconstants.RED, myconstants.RED, myconstants.ORANGE, myconstants.ORANGE, myconstants.YELLOW,
+                   myconstants.YELLOW, myconstants.GREEN, myconstants.GREEN, myconstants.GREEN, myconstants.GREEN)
+
+# Label sits every line on "M":  its baseline is half the height of the font's M below label.y
+def _m_height(font):
+    return font.get_glyph(ord("M")).height
+
+# how far the pen moves drawing text
+def _text_advance(font, text):
+    advance = 0
+    for character in text:
+        glyph = font.get_glyph(ord(character))
+        if glyph:
+            advance += glyph.shift_x
+    return advance
+
 class Display_Main:
-    def __init__(self, this_group, font, fontbig):
+    def __init__(self, this_group, font, fontbig, font_widths=None, fontbig_widths=None):
         self._this_group = this_group
         self._font = font
         self._fontbig = fontbig
+        self._font_widths = font_widths          # Glyph_Width_Table for font (None = measure labels)
+        self._fontbig_widths = fontbig_widths    # Glyph_Width_Table for fontbig
+        self._committed = {}          # id(label) -> [text, color, x] as last written to the Label
+        self._render_applied = 0      # label writes that actually changed something
+        self._render_skipped = 0      # label writes skipped because nothing changed
 
         self._watch_notes_background = Rect(4, 116, 232, 60, fill=myconstants.DARKGRAY, outline=myconstants.BLACK, stroke=2)
         self._watch_notes1_box = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=38)
@@ -58,175 +86,290 @@ class Display_Main:
         self._watch_notes3_box = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=38)
         self._watch_notes3_box.y = 164
         self._watch_notes_center = 120
+        # each notes line can end in a value (ie an m:ss from the time_format table) drawn by a second
+        # label, so a changing value never means building a new string for the whole line
+        self._watch_notes1_value = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=8)
+        self._watch_notes1_value.y = 128
+        self._watch_notes2_value = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=8)
+        self._watch_notes2_value.y = 146
+        self._watch_notes3_value = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=8)
+        self._watch_notes3_value.y = 164
         self._this_group.append(self._watch_notes_background)
-        self._this_group.append(self._watch_notes1_box)
-        self._this_group.append(self._watch_notes2_box)
-        self._this_group.append(self._watch_notes3_box)
+        for label in (self._watch_notes1_box, self._watch_notes1_value, self._watch_notes2_box,
+                      self._watch_notes2_value, self._watch_notes3_box, self._watch_notes3_value):
+            self._this_group.append(label)
+            self._remember_label(label, myconstants.WHITE)
+        self._notes_text_advance = {}     # id(value label) -> where it starts after its line's text
+        for label in (self._watch_notes1_value, self._watch_notes2_value, self._watch_notes3_value):
+            self._notes_text_advance[id(label)] = 0
 
         self._watch_display_box = Label(self._fontbig, text="", color=myconstants.BLUE, max_glyphs=8)
         self._watch_display_text_rightedge = 230
         self._watch_display_box.y = 58    # was 66
         self._this_group.append(self._watch_display_box)
+        self._remember_label(self._watch_display_box, myconstants.BLUE)
+
+        # in m:ss.t mode the tenth is drawn in the small font just right of m:ss, sitting on the same
+        # baseline;  a whole m:ss.t in the big font would reach left over the duration column
+        self._watch_tenths_box = Label(self._font, text="", color=myconstants.BLUE, max_glyphs=2)
+        self._watch_tenths_slot = _text_advance(self._font, ".0") + 2
+        self._watch_tenths_box.x = self._watch_display_text_rightedge - self._watch_tenths_slot + 2
+        self._watch_tenths_box.y = self._watch_display_box.y + (_m_height(self._fontbig) // 2) - (_m_height(self._font) // 2)
+        self._watch_display_rightedge_shown = self._watch_display_text_rightedge
+        self._this_group.append(self._watch_tenths_box)
+        self._remember_label(self._watch_tenths_box, myconstants.BLUE)
 
         self._mode_display_box = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=20)
         self._mode_display_text_rightedge = 230
         self._mode_display_box.y = 8
         self._this_group.append(self._mode_display_box)
+        self._remember_label(self._mode_display_box, myconstants.WHITE)
 
         self._dur1_textbox = Label(self._font, text="", color=myconstants.YELLOW, max_glyphs=4)
         self._dur1_textbox.y = 38
         self._dur1_textbox.x = 8
         self._this_group.append(self._dur1_textbox)
+        self._remember_label(self._dur1_textbox, myconstants.YELLOW)
 
         self._dur2_textbox = Label(self._font, text="", color=myconstants.YELLOW, max_glyphs=4)
         self._dur2_textbox.y = 58
         self._dur2_textbox.x = 8
         self._this_group.append(self._dur2_textbox)
+        self._remember_label(self._dur2_textbox, myconstants.YELLOW)
 
         self._dur3_textbox = Label(self._font, text="", color=myconstants.YELLOW, max_glyphs=6)
         self._dur3_textbox.y = 78
         self._dur3_textbox.x = 8
         self._this_group.append(self._dur3_textbox)
+        self._remember_label(self._dur3_textbox, myconstants.YELLOW)
 
         self._half2_textbox = Label(self._font, text="", color=myconstants.GREEN, max_glyphs=8)
         self._half2_textbox.y = 98
         self._half2_textbox.x = 8
         self._this_group.append(self._half2_textbox)
+        self._remember_label(self._half2_textbox, myconstants.GREEN)
 
         self._timewarn_textbox = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=24)
         self._timewarn_text_rightedge = 230
         self._timewarn_textbox.y = 98
         self._this_group.append(self._timewarn_textbox)
+        self._remember_label(self._timewarn_textbox, myconstants.WHITE)
 
         self._tod_textbox = Label(self._font, text="", color=myconstants.GREEN, max_glyphs=8)
         self._tod_textbox.y = 8
         self._tod_textbox.x = 8
         self._this_group.append(self._tod_textbox)
+        self._remember_label(self._tod_textbox, myconstants.GREEN)
+
+        self._batt_time_textbox = Label(self._font, text="", color=myconstants.WHITE, max_glyphs=5)
+        self._batt_time_textbox.y = 8
+        self._batt_time_textbox.x = 72
+        self._this_group.append(self._batt_time_textbox)
+        self._remember_label(self._batt_time_textbox, myconstants.WHITE)
 
         # self._battbox1 = Rect(6, 109, 228, 4, fill=myconstants.GREEN, outline=myconstants.BLACK)
-        self._battbox0 = Rect(6, 109, 22, 4, fill=myconstants.RED, outline=myconstants.BLACK)
-        self._battbox1 = Rect(28, 109, 22, 4, fill=myconstants.RED, outline=myconstants.BLACK)
-        self._battbox2 = Rect(50, 109, 22, 4, fill=myconstants.ORANGE, outline=myconstants.BLACK)
-        self._battbox3 = Rect(72, 109, 22, 4, fill=myconstants.ORANGE, outline=myconstants.BLACK)
-        self._battbox4 = Rect(94, 109, 22, 4, fill=myconstants.YELLOW, outline=myconstants.BLACK)
-        self._battbox5 = Rect(116, 109, 22, 4, fill=myconstants.YELLOW, outline=myconstants.BLACK)
-        self._battbox6 = Rect(138, 109, 22, 4, fill=myconstants.GREEN, outline=myconstants.BLACK)
-        self._battbox7 = Rect(160, 109, 22, 4, fill=myconstants.GREEN, outline=myconstants.BLACK)
-        self._battbox8 = Rect(182, 109, 22, 4, fill=myconstants.GREEN, outline=myconstants.BLACK)
-        self._battbox9 = Rect(204, 109, 22, 4, fill=myconstants.GREEN, outline=myconstants.BLACK)
-        self._this_group.append(self._battbox0)  
-        self._this_group.append(self._battbox1)  
-        self._this_group.append(self._battbox2)  
-        self._this_group.append(self._battbox3)  
-        self._this_group.append(self._battbox4)  
-        self._this_group.append(self._battbox5)  
-        self._this_group.append(self._battbox6)  
-        self._this_group.append(self._battbox7)  
-        self._this_group.append(self._battbox8)  
-        self._this_group.append(self._battbox9)  
+        self._battery_gauge = Bar_Gauge(6, 109, 22, 4, _BATTERY_COLORS, (myconstants.PURPLE, myconstants.BLUE))
+        self._this_group.append(self._battery_gauge.tilegrid)
         
         self._buttons = []
-        self._add_button(3, 0, "Whistle", 1, 1, myconstants.RED, myconstants.WHITE)
-        self._btnSS = self._add_button(3, 1, "Start", 1, 2, myconstants.DARKORANGE, myconstants.BLACK)
-        self._btnA = self._add_button(0, 3, "Warmup", 1, 1, myconstants.LIGHTBLUE, myconstants.WHITE)
-        self._btnB = self._add_button(1, 3, "Chg.Dur", 1, 1, myconstants.DEEP_PURPLE, myconstants.WHITE)
-        self._btnC = self._add_button(2, 3, "..", 1, 1, myconstants.PURPLE, myconstants.WHITE)
-        self._btnD = self._add_button(3, 3, "Call.Sk", 1, 1, myconstants.SMOKY_GREEN, myconstants.WHITE)
+        self._hit_grid = Hit_Grid()     # touch point -> button lookup, filled in as buttons are added
+        self._button_commands = {}      # id(button) -> command id it currently carries (see commands.py)
+        self._add_button(3, 0, "Whistle", 1, 1, myconstants.RED, myconstants.WHITE, commands.CMD_WHISTLE)
+        self._btnSS = self._add_button(3, 1, "Start", 1, 2, myconstants.DARKORANGE, myconstants.BLACK, commands.CMD_START)
+        self._btnA = self._add_button(0, 3, "Warmup", 1, 1, myconstants.LIGHTBLUE, myconstants.WHITE, commands.CMD_WARMUP)
+        self._btnB = self._add_button(1, 3, "Chg.Dur", 1, 1, myconstants.DEEP_PURPLE, myconstants.WHITE, commands.CMD_CHANGE_DURATION)
+        self._btnC = self._add_button(2, 3, "Next.Cat", 1, 1, myconstants.PURPLE, myconstants.WHITE, commands.CMD_NEXT_CATEGORY)
+        self._btnD = self._add_button(3, 3, "Call.Sk", 1, 1, myconstants.SMOKY_GREEN, myconstants.WHITE, commands.CMD_CALL_SKATER)
         
         for b in self._buttons:
             self._this_group.append(b.group)
 
+        # hidden: tapping the time of day (3 times quickly) opens the diagnostics screen
+        self._add_hotspot(0, 0, 72, 22, commands.CMD_DIAGNOSTICS_TAP)
+        # tapping the big main timer switches it between m:ss and m:ss.t
+        self._add_hotspot(76, 22, 160, 72, commands.CMD_TOGGLE_TENTHS)
+        # tapping the notes panel pages through all the timers (see Skating_Info.show_next_timer_page)
+        self._add_hotspot(4, 116, 232, 60, commands.CMD_NEXT_TIMER_PAGE)
+
 
     def show_this_screen(self):
         board.DISPLAY.show(self._this_group)
 
-    def set_text_wnb1(self, text):
-        self._watch_notes1_box.text = text
-        _, _, textwidth, _ = self._watch_notes1_box.bounding_box
-        self._watch_notes1_box.x = self._watch_notes_center - int(textwidth/2)
-
-    def set_text_wnb2(self, text):
-        self._watch_notes2_box.text = text
-        _, _, textwidth, _ = self._watch_notes2_box.bounding_box
-        self._watch_notes2_box.x = self._watch_notes_center - int(textwidth/2)
-
-    def set_text_wnb3(self, text):
-        self._watch_notes3_box.text = text
-        _, _, textwidth, _ = self._watch_notes3_box.bounding_box
-        self._watch_notes3_box.x = self._watch_notes_center - int(textwidth/2)
-
-    def set_text_tdb(self, text):
-        self._watch_display_box.text = text
-        _, _, textwidth, _ = self._watch_display_box.bounding_box
-        self._watch_display_box.x = self._watch_display_text_rightedge - textwidth
+    # ---------------- cached render state ----------------
+    # every label write goes through here so we only pay for Label.text (which rebuilds the glyph
+    # tile grid) and the re-alignment when the text, color or position actually changed
+    def _remember_label(self, label, color):
+        self._committed[id(label)] = [label.text, color, label.x]
+
+    def _commit_text(self, label, text):
+        state = self._committed[id(label)]
+        if state[0] == text:
+            self._render_skipped += 1
+            return False
+        label.text = text
+        state[0] = text
+        self._render_applied += 1
+        return True
+
+    def _commit_x(self, label, x):
+        state = self._committed[id(label)]
+        if state[2] != x:
+            label.x = x
+            state[2] = x
+
+    def _commit_color(self, label, color):
+        state = self._committed[id(label)]
+        if state[1] == color:
+            self._render_skipped += 1
+            return
+        label.color = color
+        state[1] = color
+        self._render_applied += 1
+
+    def _commit_text_centered(self, label, text, center, widths):
+        if self._commit_text(label, text):
+            textwidth = label_width(label, text, widths)
+            self._commit_x(label, center - int(textwidth/2))
+
+    def _commit_text_right(self, label, text, rightedge, widths):
+        if self._commit_text(label, text):
+            textwidth = label_width(label, text, widths)
+            self._commit_x(label, rightedge - textwidth)
+
+    # (label writes made, label writes skipped as unchanged) since boot or the diagnostics screen's Reset
+    def get_render_stats(self):
+        return (self._render_applied, self._render_skipped)
+
+    def reset_render_stats(self):
+        self._render_applied = 0
+        self._render_skipped = 0
+
+    # the line is text followed by value, centered together
+    def _commit_notes_line(self, label, value_label, text, value):
+        text_changed = self._commit_text(label, text)
+        if not (self._commit_text(value_label, value) or text_changed):
+            return
+        if text_changed:
+            self._notes_text_advance[id(value_label)] = _text_advance(self._font, text)
+        if value:
+            left = self._notes_text_advance[id(value_label)]
+            textwidth = left + label_width(value_label, value, self._font_widths)
+        else:
+            left = 0
+            textwidth = label_width(label, text, self._font_widths)
+        x = self._watch_notes_center - int(textwidth/2)
+        self._commit_x(label, x)
+        self._commit_x(value_label, x + left)
+
+    def set_text_wnb1(self, text, value=""):
+        self._commit_notes_line(self._watch_notes1_box, self._watch_notes1_value, text, value)
+
+    def set_text_wnb2(self, text, value=""):
+        self._commit_notes_line(self._watch_notes2_box, self._watch_notes2_value, text, value)
+
+    def set_text_wnb3(self, text, value=""):
+        self._commit_notes_line(self._watch_notes3_box, self._watch_notes3_value, text, value)
+
+    # text is m:ss for the big font, tenths the ".t" to show after it ("" when not showing tenths)
+    def set_text_tdb(self, text, tenths=""):
+        self._commit_text(self._watch_tenths_box, tenths)
+        rightedge = self._watch_display_text_rightedge
+        if tenths:
+            rightedge -= self._watch_tenths_slot
+        label = self._watch_display_box
+        if self._commit_text(label, text) or rightedge != self._watch_display_rightedge_shown:
+            self._watch_display_rightedge_shown = rightedge
+            self._commit_x(label, rightedge - label_width(label, text, self._fontbig_widths))
 
     def set_text_mdb(self, text):
-        self._mode_display_box.text = text
-        _, _, textwidth, _ = self._mode_display_box.bounding_box
-        self._mode_display_box.x = self._mode_display_text_rightedge - textwidth
+        self._commit_text_right(self._mode_display_box, text, self._mode_display_text_rightedge, self._font_widths)
 
     def set_text_timewarn(self, text):
-        self._timewarn_textbox.text = text
-        _, _, textwidth, _ = self._timewarn_textbox.bounding_box
-        self._timewarn_textbox.x = self._timewarn_text_rightedge - textwidth
+        self._commit_text_right(self._timewarn_textbox, text, self._timewarn_text_rightedge, self._font_widths)
 
     def set_text_tod(self, text):
-        self._tod_textbox.text = text
+        self._commit_text(self._tod_textbox, text)
 
     def set_text_dur1(self, text):
-        self._dur1_textbox.text = text
+        self._commit_text(self._dur1_textbox, text)
     def set_text_dur2(self, text):
-        self._dur2_textbox.text = text
+        self._commit_text(self._dur2_textbox, text)
     def set_text_dur3(self, text):
-        self._dur3_textbox.text = text
+        self._commit_text(self._dur3_textbox, text)
 
     def _set_half2_textbox(self, text):
-        self._half2_textbox.text = text
+        self._commit_text(self._half2_textbox, text)
+
+    def set_color_tdb(self, color):
+        self._commit_color(self._watch_display_box, color)
+        self._commit_color(self._watch_tenths_box, color)
+
+    def set_color_wnb1(self, color):
+        self._commit_color(self._watch_notes1_box, color)
+        self._commit_color(self._watch_notes1_value, color)
+
+    def set_color_wnb3(self, color):
+        self._commit_color(self._watch_notes3_box, color)
+        self._commit_color(self._watch_notes3_value, color)
 
 
     def _button_grid(self, row, col):
         return Coords(BUTTON_MARGIN * (row + 1) + BUTTON_WIDTH * row - (4),
                       BUTTON_MARGIN * (col + 1) + BUTTON_HEIGHT * col - (4))
 
-    def _add_button(self, row, col, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK):
+    def _add_button(self, row, col, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK, command=commands.CMD_NONE):
         pos = self._button_grid(row, col)
+        pixel_width = BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1)
+        pixel_height = BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1)
         new_button = Button(x=pos.x, y=pos.y,
-                            width=BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1),
-                            height=BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1),
+                            width=pixel_width,
+                            height=pixel_height,
                             label=label, label_font=self._font,
                             label_color=text_color, fill_color=color, style=Button.ROUNDRECT)
         self._buttons.append(new_button)
+        self._hit_grid.add(new_button, pos.x, pos.y, pixel_width, pixel_height)
+        self._button_commands[id(new_button)] = command
         return new_button
 
+    def _add_hotspot(self, x, y, width, height, command):
+        hotspot = Hotspot(x, y, width, height)
+        self._hit_grid.add(hotspot, x, y, width, height)
+        self._button_commands[id(hotspot)] = command
+        return hotspot
+
     def get_button_label(self, button_id):
         return button_id.label
 
+    def get_button_command(self, button_id):
+        return self._button_commands[id(button_id)]
+
+    def _set_button(self, button, label, command):
+        button.label = label
+        self._button_commands[id(button)] = command
+
 
     # called with the point coordinates of a screen touch event; if this is a button, return its id, else return None
     # if a button is clicked, it sets it so "selected" state so its color is inverse
     def see_if_any_button_clicked(self, point):  
-        btn_clicked = None  
-        for _, b in enumerate(self._buttons):
-            # cycling through all buttons, this one contains the point touched
-            if b.contains(point):
-                b.selected = True
-                btn_clicked = b
+        btn_clicked = self._hit_grid.find(point)
+        if btn_clicked != None:
+            btn_clicked.selected = True
         return btn_clicked
 
-    def set_btnA(self, label):
-        self._btnA.label = label
+    def set_btnA(self, label, command):
+        self._set_button(self._btnA, label, command)
 
-    def set_btnB(self, label):
-        self._btnB.label = label
+    def set_btnB(self, label, command):
+        self._set_button(self._btnB, label, command)
 
-    def set_btnC(self, label):
-        self._btnC.label = label
+    def set_btnC(self, label, command):
+        self._set_button(self._btnC, label, command)
 
-    def set_btnD(self, label):
-        self._btnD.label = label
+    def set_btnD(self, label, command):
+        self._set_button(self._btnD, label, command)
 
-    def set_btnSS(self, label):
-        self._btnSS.label = label
+    def set_btnSS(self, label, command):
+        self._set_button(self._btnSS, label, command)
 
     def unselect_this_button(self, input_key):
         if self._find_button(input_key) != None:
@@ -234,66 +377,31 @@ class Display_Main:
             # self._btnC_button.selected = False   
 
     def show_battery_status(self, charge_percent):
-        # note charge percentage should be integer 0-100
-        if charge_percent > 5:
-            self._battbox0.fill = myconstants.RED
-        else:
-            self._battbox0.fill = myconstants.PURPLE
-
-        if charge_percent > 10:
-            self._battbox1.fill = myconstants.RED
-        else:
-            self._battbox1.fill = myconstants.BLACK
-
-        if charge_percent > 20:
-            self._battbox2.fill = myconstants.ORANGE
-        else:
-            self._battbox2.fill = myconstants.BLACK
-
-        if charge_percent > 30:
-            self._battbox3.fill = myconstants.ORANGE
-        else:
-            self._battbox3.fill = myconstants.BLACK
-
-        if charge_percent > 40:
-            self._battbox4.fill = myconstants.YELLOW
-        else:
-            self._battbox4.fill = myconstants.BLACK
-
-        if charge_percent > 50:
-            self._battbox5.fill = myconstants.YELLOW
-        else:
-            self._battbox5.fill = myconstants.BLACK
-
-        if charge_percent > 60:
-            self._battbox6.fill = myconstants.GREEN
-        else:
-            self._battbox6.fill = myconstants.BLACK
-
-        if charge_percent > 70:
-            self._battbox7.fill = myconstants.GREEN
-        else:
-            self._battbox7.fill = myconstants.BLACK
-
-        if charge_percent > 80:
-            self._battbox8.fill = myconstants.GREEN
-        else:
-            self._battbox8.fill = myconstants.BLACK
-
-        if charge_percent > 90:
-            self._battbox9.fill = myconstants.GREEN
+        # note charge percentage should be integer 0-100;  segment i is lit above _BATTERY_STEPS[i] percent,
+        # the first one turns purple below that, and all are blue when running on USB (percentage > 100)
+        for i in range(len(_BATTERY_STEPS)):
+            if charge_percent > 100:
+                color = myconstants.BLUE
+            elif charge_percent > _BATTERY_STEPS[i]:
+                color = _BATTERY_COLORS[i]
+            elif i == 0:
+                color = myconstants.PURPLE
+            else:
+                color = myconstants.BLACK
+            self._battery_gauge.set_segment(i, color)
+
+    # battery time remaining next to the time of day:  "45m" or "2h05", "USB" when on USB power,
+    # blank while it is not known
+    def show_battery_time(self, minutes_remaining, on_usb=False):
+        if on_usb:
+            text = "USB"
+        elif minutes_remaining is None:
+            text = ""
+        elif minutes_remaining < 60:
+            text = str(minutes_remaining) + "m"
         else:
-            self._battbox9.fill = myconstants.BLACK
-
-        # note if running on USB cable then percentage will be > 100
-        if charge_percent > 100:
-            self._battbox9.fill = myconstants.BLUE
-            self._battbox8.fill = myconstants.BLUE
-            self._battbox7.fill = myconstants.BLUE
-            self._battbox6.fill = myconstants.BLUE
-            self._battbox5.fill = myconstants.BLUE
-            self._battbox4.fill = myconstants.BLUE
-            self._battbox3.fill = myconstants.BLUE
-            self._battbox2.fill = myconstants.BLUE
-            self._battbox1.fill = myconstants.BLUE
-            self._battbox0.fill = myconstants.BLUE
\ No newline at end of file
+            hours = minutes_remaining // 60
+            if hours > 99:
+                hours = 99
+            text = str(hours) + "h" + two_digits(minutes_remaining % 60)
+        self._commit_text(self._batt_time_textbox, text)
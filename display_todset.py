@@ -36,6 +36,10 @@ from adafruit_display_text.label import Label
 from collections import namedtuple
 from adafruit_button import Button
 from adafruit_bitmap_font import bitmap_font
+from glyph_widths import label_width
+from hit_grid import Hit_Grid
+from time_format import two_digits
+import commands
 import myconstants
 
 Coords = namedtuple("Point", "x y")
@@ -46,17 +50,19 @@ BUTTON_HEIGHT = 52
 BUTTON_MARGIN = 8
 
 class Display_Todset:
-    def __init__(self, this_group, font, fontbig):
+    def __init__(self, this_group, font, fontbig, font_widths=None, fontbig_widths=None):
         self._this_group = this_group
         self._font = font
         self._fontbig = fontbig
+        self._font_widths = font_widths          # Glyph_Width_Table for font (None = measure labels)
+        self._fontbig_widths = fontbig_widths    # Glyph_Width_Table for fontbig
 
         self._desired_hours = 12
         self._desired_minutes = 15
         self._desired_ampm = "am"
 
         self.headertext = Label(self._font, text="Set the Clock", color=myconstants.WHITE, max_glyphs=14)
-        _, _, textwidth, _ = self.headertext.bounding_box
+        textwidth = label_width(self.headertext, "Set the Clock", self._font_widths)
         self.headertext.x = 312 - textwidth
         self.headertext.y = 12
         self._this_group.append(self.headertext)
@@ -82,13 +88,15 @@ class Display_Todset:
         self._this_group.append(self._ampm_box)
 
         self._buttons = []
-        self._add_button(3, 1, "Set", 1, 1, myconstants.SMOKY_GREEN, myconstants.WHITE)
-        self._add_button(3, 2, "Cancel", 1, 1, myconstants.RED, myconstants.WHITE)
-        self._add_button(3, 3, "AM/PM", 1, 1, myconstants.BLUE, myconstants.WHITE)
-        self._add_button_by_pixels(28, 124, "+ H", 1, 1, myconstants.BROWN, myconstants.WHITE)
-        self._add_button_by_pixels(28, 184, "- H", 1, 1, myconstants.PURPLE, myconstants.WHITE)
-        self._add_button_by_pixels(142, 124, "+ M", 1, 1, myconstants.BROWN, myconstants.WHITE)
-        self._add_button_by_pixels(142, 184, "- M", 1, 1, myconstants.PURPLE, myconstants.WHITE)
+        self._hit_grid = Hit_Grid()     # touch point -> button lookup, filled in as buttons are added
+        self._button_commands = {}      # id(button) -> command id it carries (see commands.py)
+        self._add_button(3, 1, "Set", 1, 1, myconstants.SMOKY_GREEN, myconstants.WHITE, commands.CMD_TOD_SET)
+        self._add_button(3, 2, "Cancel", 1, 1, myconstants.RED, myconstants.WHITE, commands.CMD_TOD_CANCEL)
+        self._add_button(3, 3, "AM/PM", 1, 1, myconstants.BLUE, myconstants.WHITE, commands.CMD_AMPM)
+        self._add_button_by_pixels(28, 124, "+ H", 1, 1, myconstants.BROWN, myconstants.WHITE, commands.CMD_HOUR_UP)
+        self._add_button_by_pixels(28, 184, "- H", 1, 1, myconstants.PURPLE, myconstants.WHITE, commands.CMD_HOUR_DOWN)
+        self._add_button_by_pixels(142, 124, "+ M", 1, 1, myconstants.BROWN, myconstants.WHITE, commands.CMD_MINUTE_UP)
+        self._add_button_by_pixels(142, 184, "- M", 1, 1, myconstants.PURPLE, myconstants.WHITE, commands.CMD_MINUTE_DOWN)
         
         for b in self._buttons:
             self._this_group.append(b.group)
@@ -106,37 +114,35 @@ class Display_Todset:
         return Coords(BUTTON_MARGIN * (row + 1) + BUTTON_WIDTH * row - (4),
                       BUTTON_MARGIN * (col + 1) + BUTTON_HEIGHT * col - (4))
 
-    def _add_button(self, row, col, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK):
+    def _add_button(self, row, col, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK, command=commands.CMD_NONE):
         pos = self._button_grid(row, col)
-        new_button = Button(x=pos.x, y=pos.y,
-                            width=BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1),
-                            height=BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1),
-                            label=label, label_font=self._font,
-                            label_color=text_color, fill_color=color, style=Button.ROUNDRECT)
-        self._buttons.append(new_button)
-        return new_button
+        return self._add_button_by_pixels(pos.x, pos.y, label, width, height, color, text_color, command)
 
-    def _add_button_by_pixels(self, x, y, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK):
+    def _add_button_by_pixels(self, x, y, label, width=1, height=1, color=myconstants.WHITE, text_color=myconstants.BLACK, command=commands.CMD_NONE):
+        pixel_width = BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1)
+        pixel_height = BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1)
         new_button = Button(x=x, y=y,
-                            width=BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1),
-                            height=BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1),
+                            width=pixel_width,
+                            height=pixel_height,
                             label=label, label_font=self._font,
                             label_color=text_color, fill_color=color, style=Button.ROUNDRECT)
         self._buttons.append(new_button)
+        self._hit_grid.add(new_button, x, y, pixel_width, pixel_height)
+        self._button_commands[id(new_button)] = command
         return new_button
 
     def get_button_label(self, button_id):
         return button_id.label
 
+    def get_button_command(self, button_id):
+        return self._button_commands[id(button_id)]
+
     # called with the point coordinates of a screen touch event; if this is a button, return its id, else return None
     # if a button is clicked, it sets it so "selected" state so its color is inverse
     def see_if_any_button_clicked(self, point):  
-        btn_clicked = None  
-        for _, b in enumerate(self._buttons):
-            # cycling through all buttons, this one contains the point touched
-            if b.contains(point):
-                b.selected = True
-                btn_clicked = b
+        btn_clicked = self._hit_grid.find(point)
+        if btn_clicked != None:
+            btn_clicked.selected = True
         return btn_clicked
 
 
@@ -150,17 +156,13 @@ class Display_Todset:
 
     def _show_text_hours(self):
         hours_as_int = self._desired_hours
-        self._hours_display_box.text = str(hours_as_int)
-        _, _, textwidth, _ = self._hours_display_box.bounding_box
+        text = str(hours_as_int)
+        self._hours_display_box.text = text
+        textwidth = label_width(self._hours_display_box, text, self._fontbig_widths)
         self._hours_display_box.x = self._hours_display_text_rightedge - textwidth
 
     def _show_text_minutes(self):
-        minutes_as_int = self._desired_minutes
-        leading_zero = ""
-        if minutes_as_int < 10:
-            leading_zero = "0"
-        text = leading_zero + str(minutes_as_int)
-        self._minutes_display_box.text = text
+        self._minutes_display_box.text = two_digits(self._desired_minutes)
 
     def set_desired_all(self, hours, minutes, ampm):
         self._desired_hours = hours
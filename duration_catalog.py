@@ -0,0 +1,197 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  duration_catalog.py holds the program durations (and their timing rules) the stopwatch can select
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the catalog is read from /durations.txt at boot (DEFAULT_CATALOG below when there is no such file,
+# or it has no usable lines) and kept as a few flat arrays, one slot per duration.  durations are
+# grouped into categories so the duration can jump a whole category at a time.
+#
+# file format, one duration per line, "#" starts a comment, columns separated by spaces:
+#   category  seconds  rule  [warmup  near  window  short]
+# category   name shown when it is selected (no spaces, up to 24 characters)
+# rule       M = MAX (the program must end by seconds), W = +/- window (seconds, plus or minus window)
+# warmup     warmup length (seconds) that goes with this event, 0 to leave the warmup alone
+# near       seconds before the limit the "end is near" warning starts              (default 5)
+# window     seconds either side of the duration a +/- program may end              (default 10)
+# short      a +/- program shorter than seconds - short is not scored              (default 30)
+#
+# seconds and warmup go up to MAX_DURATION (9:59, as wide as the duration box is), near, window and
+# short up to MAX_MARGIN;  a line with a value outside those, or one that is not a whole number, is
+# skipped on its own and the rest of the file is still used (get_skipped() counts them)
+#
+"""
+import array
+
+RULE_MAX = 0
+RULE_WINDOW = 1
+
+DEFAULT_NEAR = 5
+DEFAULT_WINDOW = 10
+DEFAULT_SHORT = 30
+MAX_CATEGORY_NAME = 24
+MAX_DURATION = 599
+MAX_MARGIN = 255
+
+DEFAULT_CATALOG = """
++/-.Short   90  W
++/-.Short  120  W
++/-.Short  140  W
++/-.Short  150  W
++/-.Free   160  W
++/-.Free   180  W
++/-.Free   210  W
++/-.Free   240  W
+MAX.Short   60  M
+MAX.Short   70  M
+MAX.Short   75  M
+MAX.Short   90  M
+MAX.Short  100  M
+MAX.Short  110  M
+MAX.Free   130  M
+MAX.Free   150  M
+MAX.Free   160  M
+MAX.Free   190  M
+MAX.Free   220  M
+"""
+
+class Duration_Catalog:
+    def __init__(self):
+        self._clear()
+
+    def _clear(self):
+        self._seconds = array.array("H")
+        self._warmup = array.array("H")
+        self._rule = bytearray()
+        self._near = bytearray()
+        self._window = bytearray()
+        self._short = bytearray()
+        self._category = bytearray()       # index into _category_names
+        self._category_names = []
+        self._skipped = 0                  # lines with the wrong number or kind of values
+
+    # loads filename, falling back to DEFAULT_CATALOG if it cannot be read or has no usable lines;
+    # returns the number of durations loaded from the file (0 when the defaults are in use)
+    def load(self, filename):
+        self._clear()
+        try:
+            with open(filename, "r") as f:
+                for line in f:
+                    self._add_line(line)
+        except (OSError, ValueError):
+            self._clear()
+        if len(self._seconds) > 0:
+            return len(self._seconds)
+        self.load_text(DEFAULT_CATALOG)
+        return 0
+
+    def load_text(self, text):
+        self._clear()
+        for line in text.split("\n"):
+            self._add_line(line)
+
+    def _add_line(self, line):
+        hash_at = line.find("#")
+        if hash_at >= 0:
+            line = line[:hash_at]
+        fields = line.split()
+        if len(fields) < 3:
+            if fields:
+                self._skipped += 1
+            return
+        numbers = [0, DEFAULT_NEAR, DEFAULT_WINDOW, DEFAULT_SHORT]
+        try:
+            for i in range(3, len(fields)):
+                if i - 3 < len(numbers):
+                    numbers[i - 3] = int(fields[i])
+            seconds = int(fields[1])
+        except ValueError:
+            self._skipped += 1
+            return
+        if seconds < 1 or seconds > MAX_DURATION or numbers[0] < 0 or numbers[0] > MAX_DURATION:
+            self._skipped += 1
+            return
+        for number in numbers[1:]:
+            if number < 0 or number > MAX_MARGIN:
+                self._skipped += 1
+                return
+        name = fields[0][:MAX_CATEGORY_NAME]
+        if not self._category_names or self._category_names[-1] != name:
+            self._category_names.append(name)
+        if fields[2].upper() == "M":
+            self._rule.append(RULE_MAX)
+        else:
+            self._rule.append(RULE_WINDOW)
+        self._seconds.append(seconds)
+        self._warmup.append(numbers[0])
+        self._near.append(numbers[1])
+        self._window.append(numbers[2])
+        self._short.append(numbers[3])
+        self._category.append(len(self._category_names) - 1)
+
+    def get_count(self):
+        return len(self._seconds)
+
+    # lines of the last load that were skipped
+    def get_skipped(self):
+        return self._skipped
+
+    def get_seconds(self, index):
+        return self._seconds[index]
+
+    def is_max(self, index):
+        return self._rule[index] == RULE_MAX
+
+    def get_warmup(self, index):
+        return self._warmup[index]
+
+    def get_near(self, index):
+        return self._near[index]
+
+    def get_window(self, index):
+        return self._window[index]
+
+    def get_short(self, index):
+        return self._short[index]
+
+    def get_category_name(self, index):
+        return self._category_names[self._category[index]]
+
+    def next_index(self, index):
+        index += 1
+        if index >= len(self._seconds):
+            index = 0
+        return index
+
+    # first duration of the category after the one index is in (wrapping round to the first)
+    def next_category_index(self, index):
+        category = self._category[index]
+        while True:
+            index = self.next_index(index)
+            if self._category[index] != category or index == 0:
+                return index
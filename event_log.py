@@ -0,0 +1,156 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  event_log.py records competition events (calls, starts, interruptions, stops) to CIRCUITPY
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# events are packed into fixed size records in a RAM ring buffer as they happen, and only written to
+# the log file (appended, in one block) when the master loop calls flush() with the timer stopped, so
+# a slow flash write can never land in the middle of a program.  a flush is due once a run has been
+# stopped (its records are complete) or the ring is FLUSH_THRESHOLD full, so otherwise nothing is
+# written at all, and never just before a Start.  tools/decode_event_log.py turns the
+# file into a CSV with one row per skater.
+#
+# CircuitPython can only write to CIRCUITPY when boot.py has remounted it writable for the board
+# (storage.remount("/", False)), which makes it read-only for the computer.  without that the writes
+# fail and the log just keeps dropping what it cannot store;  the stopwatch works the same either way.
+#
+# record layout (little endian, RECORD_SIZE bytes):
+#   event (B), mode (B, 0 = program, 1 = warmup), skater number (H),
+#   time of day (I, seconds since midnight from the RTC), value (i, meaning depends on event)
+#
+"""
+import struct
+
+RECORD_FORMAT = "<BBHIi"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+LOG_VERSION = 1
+
+# events (and what their value holds)
+EVENT_BOOT = 0             # LOG_VERSION;  a new power-up starts the skater numbers over
+EVENT_CALL = 1             # 0
+EVENT_START = 2            # tenths of a second since the skater was called, -1 if not called
+EVENT_DURATION = 3         # program (or warmup) duration in seconds; negative for a MAX program
+EVENT_INTERRUPT = 4        # main timer (tenths) when the interruption started
+EVENT_CONTINUE = 5         # length of the interruption (tenths)
+EVENT_STOP = 6             # main timer (tenths) when stopped, ie the program length (interruptions not counted)
+EVENT_SPLIT = 7            # main timer (tenths) at a lap split
+
+MODE_PROGRAM = 0
+MODE_WARMUP = 1
+
+RING_RECORDS = 64           # a skater's run makes a handful of records;  this covers several runs
+FLUSH_THRESHOLD = 32        # pending records that make a flush due without waiting for a stop
+MAX_LOG_BYTES = 512 * 1024  # stop appending once the file is this big
+
+class Event_Log:
+    def __init__(self, filename, rtc_manager, ring_records=RING_RECORDS):
+        self._filename = filename
+        self._rtc_manager = rtc_manager
+        self._ring = bytearray(ring_records * RECORD_SIZE)
+        self._ring_records = ring_records
+        self._head = 0                # next record slot to write
+        self._pending = 0             # records in the ring not yet written to the file
+        self._dropped = 0             # records lost (ring full, or the file could not be written)
+        self._written = 0             # records written to the file since power-up
+        self._file_size = None        # unknown until the first flush
+        self._skater = 0
+        self._flush_due = False
+        self.record(EVENT_BOOT, MODE_PROGRAM, LOG_VERSION)
+
+    # call when a new skater's run begins; returns their number
+    def next_skater(self):
+        self._skater += 1
+        return self._skater
+
+    def get_skater(self):
+        return self._skater
+
+    def record(self, event, mode, value):
+        if self._pending >= self._ring_records:
+            self._dropped += 1
+            return
+        struct.pack_into(RECORD_FORMAT, self._ring, self._head * RECORD_SIZE,
+                         event, mode, self._skater, self._rtc_manager.get_seconds_of_day(), value)
+        self._head += 1
+        if self._head >= self._ring_records:
+            self._head = 0
+        self._pending += 1
+        if event == EVENT_STOP or self._pending >= FLUSH_THRESHOLD:
+            self._flush_due = True
+
+    # True once a run has been stopped or the ring is filling up (see FLUSH_THRESHOLD)
+    def is_flush_due(self):
+        return self._flush_due
+
+    def get_pending(self):
+        return self._pending
+
+    def get_dropped(self):
+        return self._dropped
+
+    def get_written(self):
+        return self._written
+
+    # appends everything pending to the file;  only call with the timer stopped.  returns records written
+    def flush(self):
+        self._flush_due = False
+        if self._pending == 0:
+            return 0
+        count = self._pending
+        first = self._head - count
+        if first < 0:
+            first += self._ring_records
+        try:
+            if self._file_size is None:
+                self._file_size = self._get_file_size()
+            if self._file_size + (count * RECORD_SIZE) > MAX_LOG_BYTES:
+                raise OSError("event log full")
+            ring = memoryview(self._ring)
+            with open(self._filename, "ab") as f:
+                if first + count <= self._ring_records:
+                    f.write(ring[first * RECORD_SIZE:(first + count) * RECORD_SIZE])
+                else:
+                    # the pending records wrap around the end of the ring
+                    f.write(ring[first * RECORD_SIZE:])
+                    f.write(ring[:(first + count - self._ring_records) * RECORD_SIZE])
+            self._file_size += count * RECORD_SIZE
+            self._written += count
+        except OSError:
+            # read-only filesystem, flash full, ... the records are lost but the stopwatch carries on
+            self._dropped += count
+            count = 0
+        self._pending = 0
+        return count
+
+    def _get_file_size(self):
+        try:
+            with open(self._filename, "rb") as f:
+                f.seek(0, 2)
+                return f.tell()
+        except OSError:
+            return 0
@@ -0,0 +1,116 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  font_pack.py loads the precompiled glyph packs made by tools/make_font_pack.py
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# parsing the .bdf fonts at boot means reading through ~1MB of hex text to find the 66 glyphs we use.
+# a glyph pack holds only those glyphs, already rasterized to 1 bit per pixel, so loading it is one
+# small file read plus setting the "on" pixels of each glyph bitmap.
+#
+# a pack only has the glyphs it was made with;  a character outside it (a category name typed into
+# durations.txt, say) is looked up in the fallback font, normally the .bdf the pack was made from,
+# which is only opened the first time that happens.
+#
+# pack layout (all little endian):
+#   header:  b"FPK1", glyph count (H), font bounding box width, height, dx, dy (4 x h)
+#   index:   one record per glyph: codepoint (H), width (B), height (B), dx, dy, shift_x, shift_y (4 x b),
+#            offset of the glyph's rows in the data area (I)
+#   data:    each glyph's rows, top to bottom, (width + 7) // 8 bytes per row, msb = leftmost pixel
+#
+"""
+import struct
+
+try:
+    from fontio import Glyph
+except ImportError:
+    from collections import namedtuple
+    Glyph = namedtuple("Glyph", ["bitmap", "tile_index", "width", "height", "dx", "dy", "shift_x", "shift_y"])
+
+PACK_MAGIC = b"FPK1"
+HEADER_FORMAT = "<4sHhhhh"
+RECORD_FORMAT = "<HBBbbbbI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+class Font_Pack:
+    # behaves like the font objects from adafruit_bitmap_font so Label can use it unchanged
+    # fallback, if given, is called (once, on the first glyph the pack does not have) to get a font to look
+    # missing glyphs up in
+    def __init__(self, data, bitmap_class, fallback=None):
+        magic, count, bb_w, bb_h, bb_dx, bb_dy = struct.unpack_from(HEADER_FORMAT, data, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError("not a font pack")
+        self._bounding_box = (bb_w, bb_h, bb_dx, bb_dy)
+        self._glyphs = {}
+        self._fallback = fallback
+        self._fallback_font = None
+        data_start = HEADER_SIZE + (count * RECORD_SIZE)
+        for i in range(count):
+            codepoint, width, height, dx, dy, shift_x, shift_y, offset = struct.unpack_from(RECORD_FORMAT, data, HEADER_SIZE + (i * RECORD_SIZE))
+            bitmap = bitmap_class(width, height, 2)
+            row_bytes = (width + 7) // 8
+            pos = data_start + offset
+            for y in range(height):
+                for byte_index in range(row_bytes):
+                    bits = data[pos + byte_index]
+                    if bits == 0:
+                        continue
+                    x = byte_index * 8
+                    while bits:
+                        if bits & 0x80 and x < width:
+                            bitmap[x, y] = 1
+                        bits = (bits << 1) & 0xFF
+                        x += 1
+                pos += row_bytes
+            self._glyphs[codepoint] = Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def get_glyph(self, codepoint):
+        if codepoint in self._glyphs:
+            return self._glyphs[codepoint]
+        glyph = None
+        if self._fallback is not None:
+            if self._fallback_font is None:
+                self._fallback_font = self._fallback()
+            glyph = self._fallback_font.get_glyph(codepoint)
+        # remembered even when missing, so an unknown character only costs one lookup
+        self._glyphs[codepoint] = glyph
+        return glyph
+
+    # everything in the pack is already loaded; kept so callers can treat this like a bdf font
+    def load_glyphs(self, code_points):
+        pass
+
+def load_font(filename, bitmap=None, fallback=None):
+    if bitmap is None:
+        import displayio
+        bitmap = displayio.Bitmap
+    with open(filename, "rb") as f:
+        data = f.read()
+    return Font_Pack(data, bitmap, fallback)
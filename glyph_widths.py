@@ -0,0 +1,67 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  glyph_widths.py holds per-font glyph advance tables used to align text without a layout pass
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""
+
+class Glyph_Width_Table:
+    # glyphs is the same bytes string that was handed to font.load_glyphs() at startup
+    def __init__(self, font, glyphs):
+        self._advance = {}     # codepoint -> glyph.shift_x (how far the pen moves after this glyph)
+        self._extent = {}      # codepoint -> glyph.width (how far this glyph's ink reaches past the pen)
+        for codepoint in glyphs:
+            glyph = font.get_glyph(codepoint)
+            if glyph:
+                self._advance[codepoint] = glyph.shift_x
+                self._extent[codepoint] = glyph.width
+
+    # returns the same width that Label.bounding_box would report for this (single line) text,
+    # or None if the text has a character that is not in the table (caller should measure instead)
+    def text_width(self, text):
+        pen_x = 0
+        right = 0
+        for character in text:
+            codepoint = ord(character)
+            advance = self._advance.get(codepoint)
+            if advance is None:
+                return None
+            ink_right = pen_x + self._extent[codepoint]
+            if ink_right > right:
+                right = ink_right
+            pen_x += advance
+        return right
+
+# width of text as shown in label; comes from the table when it can, otherwise falls back to
+# measuring the label (so label.text must already have been set to text before calling this)
+def label_width(label, text, widths):
+    textwidth = None
+    if widths is not None:
+        textwidth = widths.text_width(text)
+    if textwidth is None:
+        _, _, textwidth, _ = label.bounding_box
+    return textwidth
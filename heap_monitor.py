@@ -0,0 +1,124 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  heap_monitor.py watches gc.mem_free() and runs garbage collection at idle points of the master loop
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# CircuitPython only frees memory when the garbage collector runs, and left alone it runs whenever an
+# allocation finds the heap full, which can be in the middle of a redraw right on a second boundary.
+# the redraw job instead request()s a check, the master loop runs it once that redraw's refresh is
+# done (the start of the longest idle stretch before the next boundary), and it collects once the heap
+# has shrunk by more than headroom bytes since the last collection, so the
+# automatic collections should not happen at all.  sample() notices when one did anyway (free memory
+# went up without us collecting) and counts it.
+#
+"""
+import time
+import gc
+
+class Heap_Monitor:
+    def __init__(self, headroom):
+        self._headroom = headroom           # bytes the heap may shrink by before collect_if_needed collects
+        self._last_free = gc.mem_free()
+        self._free_after_collect = self._last_free
+        self._low_watermark = self._last_free
+        self._collections = 0               # collections we asked for
+        self._auto_collections = 0          # collections seen happening on their own
+        self._last_pause_ns = 0
+        self._max_pause_ns = 0
+        self._total_pause_ns = 0
+        self._requested = False             # a check is wanted after the next display refresh
+
+    # reads gc.mem_free(), keeps the low watermark, and returns the free bytes
+    def sample(self):
+        free = gc.mem_free()
+        if free > self._last_free:
+            self._auto_collections += 1
+            self._free_after_collect = free
+        if free < self._low_watermark:
+            self._low_watermark = free
+        self._last_free = free
+        return free
+
+    def collect(self):
+        started = time.monotonic_ns()
+        gc.collect()
+        pause = time.monotonic_ns() - started
+        self._collections += 1
+        self._last_pause_ns = pause
+        self._total_pause_ns += pause
+        if pause > self._max_pause_ns:
+            self._max_pause_ns = pause
+        self._last_free = gc.mem_free()
+        self._free_after_collect = self._last_free
+
+    # ask for collect_if_needed to be run once the pending display refresh is done
+    def request(self):
+        self._requested = True
+
+    def is_requested(self):
+        return self._requested
+
+    # call at an idle point;  returns True if it collected
+    def collect_if_needed(self):
+        self._requested = False
+        free = self.sample()
+        if self._free_after_collect - free < self._headroom:
+            return False
+        self.collect()
+        return True
+
+    def get_free(self):
+        return self._last_free
+
+    def get_low_watermark(self):
+        return self._low_watermark
+
+    def get_collections(self):
+        return self._collections
+
+    def get_auto_collections(self):
+        return self._auto_collections
+
+    def get_last_pause_ns(self):
+        return self._last_pause_ns
+
+    def get_max_pause_ns(self):
+        return self._max_pause_ns
+
+    def get_mean_pause_ns(self):
+        if self._collections == 0:
+            return 0
+        return self._total_pause_ns // self._collections
+
+    def reset(self):
+        self._low_watermark = self._last_free
+        self._collections = 0
+        self._auto_collections = 0
+        self._last_pause_ns = 0
+        self._max_pause_ns = 0
+        self._total_pause_ns = 0
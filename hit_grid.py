@@ -0,0 +1,100 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  hit_grid.py is a grid-cell lookup table that resolves a screen touch to a button
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the screen is divided into CELL_SIZE x CELL_SIZE pixel cells, and each cell remembers which
+# button (if any) covers it.  the button layout leaves 8 pixel gaps between buttons, so with 8 pixel
+# cells no cell is ever shared by two buttons and a touch resolves with one table lookup and one
+# contains() check.  if two targets ever do share a cell, that cell falls back to checking each one.
+#
+"""
+
+SCREEN_WIDTH = 320
+SCREEN_HEIGHT = 240
+CELL_SIZE = 8
+
+_EMPTY = 0
+_SHARED = 255
+
+class Hit_Grid:
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, cell_size=CELL_SIZE):
+        self._cell_size = cell_size
+        self._columns = (width + cell_size - 1) // cell_size
+        self._rows = (height + cell_size - 1) // cell_size
+        # one byte per cell: 0 = nothing there, 255 = more than one target, else index + 1 into _targets
+        self._cells = bytearray(self._columns * self._rows)
+        self._targets = []
+
+    # target is anything with a contains(point) method (ie a Button); x, y, width, height is its area on screen
+    # (like Button.contains, the right and bottom edges count as inside)
+    def add(self, target, x, y, width, height):
+        self._targets.append(target)
+        code = len(self._targets)
+        first_col = max(0, x // self._cell_size)
+        last_col = min(self._columns - 1, (x + width) // self._cell_size)
+        first_row = max(0, y // self._cell_size)
+        last_row = min(self._rows - 1, (y + height) // self._cell_size)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = row * self._columns + col
+                if self._cells[cell] == _EMPTY:
+                    self._cells[cell] = code
+                else:
+                    self._cells[cell] = _SHARED
+
+    # returns the target that contains point, or None
+    def find(self, point):
+        col = point[0] // self._cell_size
+        row = point[1] // self._cell_size
+        if col < 0 or col >= self._columns or row < 0 or row >= self._rows:
+            return None
+        code = self._cells[row * self._columns + col]
+        if code == _EMPTY:
+            return None
+        if code != _SHARED:
+            target = self._targets[code - 1]
+            if target.contains(point):
+                return target
+            return None
+        for target in self._targets:
+            if target.contains(point):
+                return target
+        return None
+
+class Hotspot:
+    # an invisible touch target (no button drawn) that can be added to a Hit_Grid like a Button
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.selected = False
+        self.label = ""
+
+    def contains(self, point):
+        return (self.x <= point[0] <= self.x + self.width) and (self.y <= point[1] <= self.y + self.height)
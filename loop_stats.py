@@ -0,0 +1,117 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  loop_stats.py keeps per-phase timing of the master loop for the diagnostics screen
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# each phase of a loop iteration (touch polling, display_time, notes panel, battery read, beeper, ...)
+# keeps a ring buffer of its last RING_SIZE durations in integer nanoseconds.  recording is a couple of
+# integer operations and never allocates; min/mean/max/p99 are only worked out when the diagnostics
+# screen asks for them.  when the profiler is disabled, mark() and record() return right away.
+#
+"""
+import time
+import array
+
+RING_SIZE = 128
+_MAX_NS = 0xFFFFFFFF              # durations are stored as unsigned 32 bit (up to ~4.29 s)
+
+class Phase_Stats:
+    def __init__(self, name, size=RING_SIZE):
+        self.name = name
+        self._samples = array.array("L", [0] * size)
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def add(self, duration_ns):
+        if duration_ns > _MAX_NS:
+            duration_ns = _MAX_NS
+        self._samples[self._next] = duration_ns
+        self._next += 1
+        if self._next >= self._size:
+            self._next = 0
+        if self._count < self._size:
+            self._count += 1
+
+    def reset(self):
+        self._next = 0
+        self._count = 0
+
+    def get_count(self):
+        return self._count
+
+    # returns (min, mean, max, p99) in nanoseconds over the samples in the ring, or None if empty
+    def summary(self):
+        if self._count == 0:
+            return None
+        ordered = sorted(self._samples[i] for i in range(self._count))
+        total = 0
+        for value in ordered:
+            total += value
+        p99_index = (self._count * 99) // 100
+        if p99_index >= self._count:
+            p99_index = self._count - 1
+        return (ordered[0], total // self._count, ordered[-1], ordered[p99_index])
+
+class Loop_Profiler:
+    # phase_names is a list of short names; record() takes the phase's index in that list
+    def __init__(self, phase_names, size=RING_SIZE):
+        self._phases = [Phase_Stats(name, size) for name in phase_names]
+        self._enabled = False
+
+    def is_enabled(self):
+        return self._enabled
+
+    def set_enabled(self, enabled):
+        self._enabled = enabled
+
+    def toggle(self):
+        self._enabled = not self._enabled
+        return self._enabled
+
+    # start of a timed stretch; hand the result to record()
+    def mark(self):
+        if not self._enabled:
+            return 0
+        return time.monotonic_ns()
+
+    # records the time since started_ns against phase, and returns now so phases can be chained
+    def record(self, phase, started_ns):
+        if not self._enabled or started_ns == 0:
+            return 0
+        now = time.monotonic_ns()
+        self._phases[phase].add(now - started_ns)
+        return now
+
+    def get_phases(self):
+        return self._phases
+
+    def reset(self):
+        for phase in self._phases:
+            phase.reset()
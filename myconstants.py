@@ -16,3 +16,24 @@ YELLOW = 0xF4ED06
 # RED = 0xC80A24
 RED = 0xDE0A07
 BROWN = 0x9B3E25
+
+# main timer shows m:ss.t (tenths) at power-up instead of m:ss;  tapping the big time toggles it
+SHOW_TENTHS = False
+
+# set BEEP_USE_PWM for a passive piezo on D3 (driven with a BEEP_TONE_HZ square wave);  leave it off
+# for a self-oscillating buzzer, which just needs the pin switched on and off
+BEEP_USE_PWM = False
+BEEP_TONE_HZ = 2700
+
+# seconds between I2C reads of the time of day clock (in between, it is worked out from time.monotonic())
+RTC_RESYNC_INTERVAL = 3600
+
+# build the clock setting and diagnostics screens when first shown (or in idle time after boot) instead of
+# before the master loop starts, so the watch screen takes touches sooner
+LAZY_SCREENS = True
+
+# build every m:ss string the screens can show (-10:00 .. 15:00) at boot, so that once the master loop is
+# running, redrawing the timers and notes builds no new strings at all (see tools/measure_heap.py).  it
+# costs the heap of all 1501 strings up front (roughly 48 KB on the board);  left off, each one is built
+# the first time it is shown and kept, so only the first pass through a given time allocates
+ALLOCATION_FREE = False
@@ -31,65 +31,114 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 #
+# the PCF8523 is read once and its time of day anchored to time.monotonic_ns();  after that the time of
+# day is worked out from the anchor, and the clock is only read again over I2C every
+# myconstants.RTC_RESYNC_INTERVAL seconds (to follow any drift between the two) or re-anchored when
+# it is set.  note the PCF8523 only counts whole seconds, so the anchor can be up to 1s behind.
+# the anchor is integer nanoseconds, so minute boundaries stay exact however long the board has been up
+#
 """
 import time
 import board
 import busio
 import adafruit_pcf8523
+import myconstants
+from time_format import two_digits
+
+_NS_PER_SECOND = 1000000000
 
 class RealTimeClock:
-    def __init__(self):
-        # initialize beeper output bit on D3 connector
+    def __init__(self, resync_interval=None):
         self._myI2C = busio.I2C(board.SCL, board.SDA)
         self._rtc = adafruit_pcf8523.PCF8523(self._myI2C)
         self._current_hour = 0
         self._current_min = 0
         self._ampm = "am"
+        if resync_interval is None:
+            resync_interval = myconstants.RTC_RESYNC_INTERVAL
+        self._resync_interval = resync_interval
+        self._anchor_seconds = 0        # time of day (seconds since midnight) at the anchor
+        self._anchor_ns = 0             # time.monotonic_ns() at the anchor
+        self._tod_text = ""             # last get_formatted_tod() text ...
+        self._tod_text_minute = -1      # ... and the minute it was made for
+        self._sync()
+
+    # read the clock over I2C and anchor it to time.monotonic_ns()
+    def _sync(self):
         self._current_time_from_clock = self._rtc.datetime
+        self._anchor(self._current_time_from_clock.tm_hour, self._current_time_from_clock.tm_min,
+                     self._current_time_from_clock.tm_sec)
+
+    def _anchor(self, hour, minute, second):
+        self._anchor_seconds = (hour * 3600) + (minute * 60) + second
+        self._anchor_ns = time.monotonic_ns()
+
+    # whole seconds since the anchor
+    def _seconds_since_anchor(self):
+        elapsed = (time.monotonic_ns() - self._anchor_ns) // _NS_PER_SECOND
+        if elapsed >= self._resync_interval:
+            self._sync()
+            elapsed = (time.monotonic_ns() - self._anchor_ns) // _NS_PER_SECOND
+        return elapsed
+
+    # time of day in whole seconds since midnight
+    def get_seconds_of_day(self):
+        return (self._anchor_seconds + self._seconds_since_anchor()) % 86400
+
+    # absolute time.monotonic_ns() at which the time of day next reaches a whole minute
+    def get_next_minute_time(self):
+        elapsed = self._seconds_since_anchor()
+        since_minute = (self._anchor_seconds + elapsed) % 60
+        return self._anchor_ns + ((elapsed + 60 - since_minute) * _NS_PER_SECOND)
 
     def _first_ever_set_clock(self):
         t = time.struct_time((2019, 8, 23, 12, 55, 0, 6, -1, -1))
         self._rtc.datetime = t
 
     def set_clock(self, desired_hour, desired_min, desired_ampm):
-    	useHour = desired_hour
-    	if desired_hour == 12 and desired_ampm == "am":
-    		useHour = 0
-    	elif desired_hour == 12 and desired_ampm == "pm":
-    		useHour = 12
-    	elif desired_hour < 12 and desired_ampm == "pm":
-    		useHour = desired_hour + 12
+        useHour = desired_hour
+        if desired_hour == 12 and desired_ampm == "am":
+            useHour = 0
+        elif desired_hour == 12 and desired_ampm == "pm":
+            useHour = 12
+        elif desired_hour < 12 and desired_ampm == "pm":
+            useHour = desired_hour + 12
         t = time.struct_time((2019, 8, 23, useHour, desired_min, 0, 6, -1, -1))
         self._rtc.datetime = t
+        # the clock starts counting from exactly what was written, so no need to read it back
+        self._anchor(useHour, desired_min, 0)
 
+    # works out hour/minute/ampm from the anchor (only touches I2C when a resync is due)
     def read_clock(self):
-    	self._current_time_from_clock = self._rtc.datetime
-    	self._current_hour = self._current_time_from_clock.tm_hour
-    	self._current_min = self._current_time_from_clock.tm_min
-        self._current_ampm = "am"
+        seconds = self.get_seconds_of_day()
+        self._current_hour = seconds // 3600
+        self._current_min = (seconds // 60) % 60
+        self._ampm = "am"
         if self._current_hour == 0:
-        	self._current_hour = 12
+            self._current_hour = 12
         elif self._current_hour > 12:
-        	self._current_hour = self._current_hour - 12
-        	self._ampm = "pm"
+            self._current_hour = self._current_hour - 12
+            self._ampm = "pm"
         elif self._current_hour == 12:
-        	self._ampm = "pm"
+            self._ampm = "pm"
 
 
     def get_hour(self):
-    	return self._current_hour
+        return self._current_hour
 
     def get_min(self):
-    	return self._current_min
+        return self._current_min
 
     def get_ampm(self):
-    	return self._ampm
+        return self._ampm
 
+    # the text only changes once a minute, so it is kept and handed back until then
     def get_formatted_tod(self):
-    	self.read_clock()
-        minutes_as_int = self._current_min
-        leading_zero = ""
-        if minutes_as_int < 10:
-            leading_zero = "0"
-        text = leading_zero + str(minutes_as_int)
-        return str(self._current_hour) + ":" + text + " " + self._ampm
+        self.read_clock()
+        minute_of_day = (self._current_hour * 60) + self._current_min
+        if self._ampm == "pm":
+            minute_of_day += 720
+        if minute_of_day != self._tod_text_minute:
+            self._tod_text_minute = minute_of_day
+            self._tod_text = str(self._current_hour) + ":" + two_digits(self._current_min) + " " + self._ampm
+        return self._tod_text
@@ -0,0 +1,81 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  refresh_manager.py decides when the display is refreshed (auto_refresh is turned off)
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# with auto_refresh on, displayio pushes changes to the screen in the background whenever it gets a
+# chance, so one redraw can reach the screen in pieces (the big digits in one refresh and their new color
+# in the next) and every piece is a separate trip over SPI.  instead the master loop asks for a refresh
+# whenever something on screen may have changed, and makes a single refresh at the end of the loop
+# iteration, after the scheduler's jobs have run;  a redraw job that runs on a second boundary is thus
+# on screen right after that boundary, all in one piece.
+#
+"""
+
+class Refresh_Manager:
+    def __init__(self, display):
+        self._display = display
+        self._display.auto_refresh = False
+        self._requested = False
+        self._target_fps = None       # None = refresh right away (see _refresh_display)
+        self._refreshes = 0
+
+    # something on the screen may have changed;  it is shown at the next refresh()
+    def request(self):
+        self._requested = True
+
+    def is_requested(self):
+        return self._requested
+
+    # called once per loop iteration:  refreshes the display if a refresh was requested since the last one
+    def refresh(self):
+        if not self._requested:
+            return False
+        self._requested = False
+        self._refresh_display()
+        self._refreshes += 1
+        return True
+
+    def refresh_now(self):
+        self._requested = True
+        return self.refresh()
+
+    def _refresh_display(self):
+        if self._target_fps is None:
+            try:
+                self._display.refresh(target_frames_per_second=None, minimum_frames_per_second=0)
+                return
+            except TypeError:
+                # older CircuitPython needs a frame rate (it cannot refresh "right away")
+                self._target_fps = 60
+        # ... and skips a refresh that comes too long after the previous call, so ask again if it did
+        if not self._display.refresh(target_frames_per_second=self._target_fps, minimum_frames_per_second=0):
+            self._display.refresh(target_frames_per_second=self._target_fps, minimum_frames_per_second=0)
+
+    def get_refreshes(self):
+        return self._refreshes
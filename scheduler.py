@@ -0,0 +1,125 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  scheduler.py is a small cooperative scheduler that runs periodic jobs from the master loop
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""
+import time
+
+_NS_PER_SECOND = 1000000000
+
+# each job is kept as a small list so its fields can be updated in place without allocating
+_NAME = 0
+_PERIOD = 1
+_CALLBACK = 2
+_DEADLINE = 3
+_RUNS = 4
+_OVERRUNS = 5
+_WORST_LATENESS = 6
+
+class Scheduler:
+    def __init__(self):
+        self._jobs = []
+        self._jobs_by_name = {}
+
+    # period is in seconds.  the callback is called with no arguments; if it returns a number, that number
+    # is used as the absolute time.monotonic_ns() deadline for its next run (lets a job wake exactly on a
+    # boundary).  deadlines are integer nanoseconds so they stay exact however long the board has been up
+    def add_job(self, name, period, callback, first_run=None):
+        period = int(period * _NS_PER_SECOND)
+        if first_run is None:
+            first_run = time.monotonic_ns() + period
+        job = [name, period, callback, first_run, 0, 0, 0]
+        self._jobs.append(job)
+        self._jobs_by_name[name] = job
+        return job
+
+    def set_period(self, name, period):
+        self._jobs_by_name[name][_PERIOD] = int(period * _NS_PER_SECOND)
+
+    def set_next_run(self, name, deadline):
+        self._jobs_by_name[name][_DEADLINE] = deadline
+
+    # ask for a job to be run on the next pass through run_pending (ie after a button press)
+    def wake(self, name):
+        self._jobs_by_name[name][_DEADLINE] = time.monotonic_ns()
+
+    def run_pending(self):
+        for job in self._jobs:
+            now = time.monotonic_ns()
+            if now < job[_DEADLINE]:
+                continue
+            lateness = now - job[_DEADLINE]
+            if lateness > job[_WORST_LATENESS]:
+                job[_WORST_LATENESS] = lateness
+            next_deadline = job[_CALLBACK]()
+            job[_RUNS] += 1
+            if next_deadline is not None:
+                job[_DEADLINE] = next_deadline
+            else:
+                # advance from the deadline (not from now) so the job does not drift by however long
+                # this pass took; if we fell a whole period behind, count an overrun and resync to now
+                job[_DEADLINE] += job[_PERIOD]
+                if job[_DEADLINE] <= now:
+                    job[_OVERRUNS] += 1
+                    job[_DEADLINE] = now + job[_PERIOD]
+
+    # seconds until the earliest job is due (0 if something is already due), never more than max_wait
+    def time_until_next(self, max_wait):
+        now = time.monotonic_ns()
+        wait = int(max_wait * _NS_PER_SECOND)
+        for job in self._jobs:
+            remaining = job[_DEADLINE] - now
+            if remaining < wait:
+                wait = remaining
+        if wait < 0:
+            wait = 0
+        return wait / _NS_PER_SECOND
+
+    def sleep_until_next(self, max_wait):
+        wait = self.time_until_next(max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def get_job_names(self):
+        return [job[_NAME] for job in self._jobs]
+
+    def get_runs(self, name):
+        return self._jobs_by_name[name][_RUNS]
+
+    def get_overruns(self, name):
+        return self._jobs_by_name[name][_OVERRUNS]
+
+    # seconds
+    def get_worst_lateness(self, name):
+        return self._jobs_by_name[name][_WORST_LATENESS] / _NS_PER_SECOND
+
+    def reset_counters(self):
+        for job in self._jobs:
+            job[_RUNS] = 0
+            job[_OVERRUNS] = 0
+            job[_WORST_LATENESS] = 0
@@ -0,0 +1,202 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/render_frame.py draws what the simulated display is showing into a .png
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the simulated display only records label texts;  this draws the groups it is showing (labels from
+# their glyph bitmaps, laid out like the 2019 adafruit_display_text, rectangles, buttons and bitmap
+# tile grids) so a screen layout can be looked at, and reports labels whose drawn pixels overlap.
+#
+#   import sim, render_frame
+#   result = sim.run_firmware(seconds=30, presses=[(5, "Start")])
+#   render_frame.save_png(result.display, "watch.png")
+#   print(render_frame.find_overlaps(result.display))
+#
+# (run_firmware.py does both with --png FILE)
+#
+"""
+import struct
+import zlib
+
+
+BACKGROUND = 0x000000
+
+class _Canvas:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = [BACKGROUND] * (width * height)
+
+    def put(self, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y * self.width + x] = color
+
+    def fill(self, x, y, width, height, color):
+        for row in range(max(0, y), min(self.height, y + height)):
+            for col in range(max(0, x), min(self.width, x + width)):
+                self.pixels[row * self.width + col] = color
+
+    def outline(self, x, y, width, height, color, stroke=1):
+        self.fill(x, y, width, stroke, color)
+        self.fill(x, y + height - stroke, width, stroke, color)
+        self.fill(x, y, stroke, height, color)
+        self.fill(x + width - stroke, y, stroke, height, color)
+
+# (x, y, glyph) for each drawn glyph of a label, relative to the label's origin
+def _glyph_positions(label):
+    font = label.font
+    m_glyph = font.get_glyph(ord("M"))
+    y_offset = m_glyph.height // 2 if m_glyph else 0
+    x = 0
+    y = 0
+    line_height = font.get_bounding_box()[1]
+    for character in label.text:
+        if character == "\n":
+            y += int(line_height * 1.25)
+            x = 0
+            continue
+        glyph = font.get_glyph(ord(character))
+        if not glyph:
+            continue
+        yield (x + glyph.dx, y - glyph.height - glyph.dy + y_offset, glyph)
+        x += glyph.shift_x
+
+# screen rectangle (x0, y0, x1, y1) of a label's drawn glyphs, None if it draws nothing
+def label_extent(label, origin_x, origin_y):
+    extent = None
+    for gx, gy, glyph in _glyph_positions(label):
+        x0 = origin_x + gx
+        y0 = origin_y + gy
+        box = (x0, y0, x0 + glyph.width, y0 + glyph.height)
+        if glyph.width == 0 or glyph.height == 0:
+            continue
+        if extent is None:
+            extent = box
+        else:
+            extent = (min(extent[0], box[0]), min(extent[1], box[1]), max(extent[2], box[2]), max(extent[3], box[3]))
+    return extent
+
+def _draw_label(canvas, label, origin_x, origin_y):
+    for gx, gy, glyph in _glyph_positions(label):
+        bitmap = glyph.bitmap
+        if bitmap is None:
+            continue
+        for row in range(glyph.height):
+            for col in range(glyph.width):
+                if bitmap[col, row]:
+                    canvas.put(origin_x + gx + col, origin_y + gy + row, label.color)
+
+def _button_label_origin(button, label):
+    left, top, width, height = label.bounding_box
+    return (button.x + (button.width - width) // 2, button.y + button.height // 2)
+
+# sim.run_firmware() reloads the stub modules for every run, so items are told apart by what they
+# have rather than by isinstance() against this module's imports
+def _is_label(item):
+    return hasattr(item, "font") and hasattr(item, "text")
+
+# yields (item, screen x, screen y) for everything showing, in drawing order;  buttons are yielded
+# whole (as the Button) rather than as their parts
+def _visible(group, x=0, y=0):
+    if getattr(group, "hidden", False):
+        return
+    button = getattr(group, "_sim_button", None)
+    if button is not None:
+        yield (button, 0, 0)
+        return
+    x += group.x
+    y += group.y
+    for item in getattr(group, "_items", ()):
+        if hasattr(item, "_items") and not _is_label(item):
+            for sub in _visible(item, x, y):
+                yield sub
+        elif not getattr(item, "hidden", False):
+            yield (item, x + item.x, y + item.y)
+
+def render(display):
+    canvas = _Canvas(display.width, display.height)
+    if display.root_group is None:
+        return canvas
+    for item, x, y in _visible(display.root_group):
+        if _is_label(item):
+            _draw_label(canvas, item, x, y)
+        elif hasattr(item, "fill_color"):
+            canvas.fill(item.x, item.y, item.width, item.height, item.fill_color)
+            canvas.outline(item.x, item.y, item.width, item.height, 0x000000)
+            if item._label is not None:
+                label_x, label_y = _button_label_origin(item, item._label)
+                _draw_label(canvas, item._label, label_x, label_y)
+        elif hasattr(item, "_fill") and hasattr(item, "_outline"):
+            # adafruit_display_shapes Rect
+            if item._fill is not None:
+                canvas.fill(x, y, item.width, item.height, item._fill)
+            if item._outline is not None:
+                canvas.outline(x, y, item.width, item.height, item._outline)
+        elif hasattr(getattr(item, "bitmap", None), "_pixels") and hasattr(item.pixel_shader, "_colors"):
+            bitmap = item.bitmap
+            palette = item.pixel_shader
+            for row in range(bitmap.height):
+                for col in range(bitmap.width):
+                    value = bitmap[col, row]
+                    if value not in palette._transparent:
+                        canvas.put(x + col, y + row, palette[value])
+    return canvas
+
+def png_bytes(canvas):
+    raw = bytearray()
+    for row in range(canvas.height):
+        raw.append(0)
+        for color in canvas.pixels[row * canvas.width:(row + 1) * canvas.width]:
+            raw += bytes(((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF))
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+    header = struct.pack(">IIBBBBB", canvas.width, canvas.height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(bytes(raw))) + chunk(b"IEND", b"")
+
+def save_png(display, filename):
+    with open(filename, "wb") as f:
+        f.write(png_bytes(render(display)))
+
+# [(text, text)] for each pair of labels (outside buttons) whose drawn glyphs overlap
+def find_overlaps(display):
+    extents = []
+    if display.root_group is not None:
+        for item, x, y in _visible(display.root_group):
+            if _is_label(item) and item.text:
+                extent = label_extent(item, x, y)
+                if extent is not None:
+                    extents.append((item.text, extent))
+    overlaps = []
+    for i in range(len(extents)):
+        for j in range(i + 1, len(extents)):
+            a = extents[i][1]
+            b = extents[j][1]
+            if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                overlaps.append((extents[i][0], extents[j][0]))
+    return overlaps
@@ -0,0 +1,107 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/run_firmware.py is the command line front end for simulator/sim.py
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:
+#   python simulator/run_firmware.py --seconds 240 --press 5:Call.Sk --press 20:Start --press 200:Stop
+#   python simulator/run_firmware.py --seconds 30 --no-costs
+#   python simulator/run_firmware.py --seconds 30 --press 5:Start --press 8:160,50 --png watch.png
+#
+# a press is TIME:LABEL (button label on the screen showing at that time) or TIME:X,Y
+# a stall is TIME:SECONDS, the master loop hangs that long at that time (to check nothing is missed)
+# --png draws the screen as it is at the end of the run (see render_frame.py) and lists overlapping labels
+#
+"""
+import argparse
+import sys
+
+import render_frame
+import sim
+
+def parse_press(text):
+    when, _, target = text.partition(":")
+    if "," in target and target.replace(",", "").isdigit():
+        x, y = target.split(",")
+        return (float(when), (int(x), int(y)))
+    return (float(when), target.replace("\\n", "\n"))
+
+def parse_stall(text):
+    when, _, seconds = text.partition(":")
+    return (float(when), float(seconds))
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="run the stopwatch firmware against simulated hardware")
+    parser.add_argument("--seconds", type=float, default=60.0, help="virtual seconds to run after power-up")
+    parser.add_argument("--press", action="append", default=[], help="TIME:LABEL or TIME:X,Y (repeatable)")
+    parser.add_argument("--stall", action="append", default=[], help="TIME:SECONDS the loop hangs (repeatable)")
+    parser.add_argument("--uptime", type=float, default=1.0, help="virtual uptime (s) when code.py starts")
+    parser.add_argument("--no-costs", action="store_true", help="do not charge virtual time for hardware work")
+    parser.add_argument("--png", help="draw the screen at the end of the run into this .png file")
+    args = parser.parse_args(argv)
+
+    costs = sim.NO_COSTS if args.no_costs else sim.Cost_Model()
+    result = sim.run_firmware(seconds=args.seconds, presses=[parse_press(p) for p in args.press],
+                              costs=costs, start_uptime=args.uptime,
+                              stalls=[parse_stall(s) for s in args.stall])
+    hw = result.hw
+    if result.error is not None:
+        print("firmware raised: %r" % (result.error,))
+    boot = result.boot_to_interactive()
+    if boot is not None:
+        print("boot to interactive:   %.3f s" % (boot - args.uptime))
+    print("display refreshes:     %d (%.3f s busy)" % (result.display.refreshes, result.display.refresh_busy_ns / 1e9))
+    print("idle (sleeping):       %.1f %%" % (100 * result.idle_fraction()))
+    print("touch polls:           %d" % hw.touch_polls)
+    print("i2c transactions:      %d" % hw.i2c_transactions)
+    print("adc reads:             %d" % hw.adc_reads)
+    print("flash bytes read:      %d" % hw.flash_bytes_read)
+    piezo = result.pin_events("D3")
+    print("piezo transitions:     %d" % len(piezo))
+    starts = [when_ns / 1e9 for when_ns, value in piezo if value]
+    if starts:
+        print("piezo on at:           %s" % " ".join("%.2f" % t for t in starts[:40]))
+    for when, target, point in hw.touches.resolved:
+        print("pressed %-12r at %7.2f s -> %s" % (target, when, point))
+    scheduler = result.globals.get("scheduler")
+    if scheduler is not None:
+        for name in scheduler.get_job_names():
+            print("job %-12s runs %6d  overruns %4d  worst late %.3f s" % (
+                name, scheduler.get_runs(name), scheduler.get_overruns(name), scheduler.get_worst_lateness(name)))
+    if result.display.frames:
+        print("last frame:            %r" % (result.display.frames[-1][2],))
+    if args.png:
+        render_frame.save_png(result.display, args.png)
+        print("screen drawn to:       %s" % args.png)
+        for first, second in render_frame.find_overlaps(result.display):
+            print("labels overlap:        %r and %r" % (first, second))
+    return 1 if result.error is not None else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
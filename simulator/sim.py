@@ -0,0 +1,219 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/sim.py runs the unmodified firmware (code.py and friends) on the desktop
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# typical use from another script:
+#
+#   import sim
+#   result = sim.run_firmware(seconds=120, presses=[(5, "Call.Sk"), (20, "Start"), (80, "Stop")])
+#   print(result.boot_to_interactive(), len(result.display.frames))
+#
+# the firmware's own globals (skating_info, scheduler, ...) are in result.globals afterwards.
+#
+"""
+import builtins
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STUBS = os.path.join(HERE, "stubs")
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+
+if STUBS not in sys.path:
+    sys.path.insert(0, STUBS)
+if ROOT not in sys.path:
+    sys.path.insert(1, ROOT)
+
+import sim_hardware
+from sim_hardware import HW, Cost_Model, NO_COSTS, Virtual_Clock, Touch_Script, Simulation_Done
+
+DEFAULT_HOLD = 0.15          # seconds a scripted finger stays on a button
+
+class Run_Result:
+    def __init__(self, hw, namespace, error):
+        self.hw = hw
+        self.globals = namespace
+        self.error = error              # exception (other than the normal end of run) raised by the firmware
+        self.display = hw.display
+        self.clock = hw.clock
+        self.flash_dir = None           # host directory holding whatever the firmware wrote to CIRCUITPY
+
+    def boot_to_interactive(self):
+        # seconds from power-up until the master loop first polled the touchscreen
+        if self.hw.first_touch_poll_ns is None:
+            return None
+        return self.hw.first_touch_poll_ns / 1000000000
+
+    def idle_fraction(self, since_ns=None):
+        if since_ns is None:
+            since_ns = self.hw.first_touch_poll_ns or 0
+        total = self.clock.monotonic_ns() - since_ns
+        if total <= 0:
+            return 0.0
+        return min(1.0, self.clock.slept_ns / total)
+
+    def pin_events(self, pin="D3"):
+        return self.hw.pin_log.get(pin, [])
+
+_other_roots = []       # firmware trees other than ROOT that have been run (ie an older version to compare with)
+
+def _firmware_modules():
+    names = []
+    for name, module in sys.modules.items():
+        path = getattr(module, "__file__", None) or ""
+        if name == "sim_hardware":
+            continue
+        if path.startswith(STUBS) or (path.startswith(ROOT) and not path.startswith(HERE)):
+            names.append(name)
+        else:
+            for root in _other_roots:
+                if path.startswith(root):
+                    names.append(name)
+    return names
+
+def _make_open(root, real_open, flash_dir, flash_writable):
+    # CircuitPython code opens files by absolute path on CIRCUITPY ("/fonts/..."); map those into root.
+    # files the firmware writes go to flash_dir instead (so a run never changes the source tree), and
+    # with flash_writable off they fail like CIRCUITPY does when boot.py has not remounted it
+    writing = ("w", "a", "+", "x")
+    def sim_open(file, mode="r", *args, **kwargs):
+        if isinstance(file, str) and file.startswith("/") and not file.startswith(root) and not file.startswith(flash_dir):
+            written = os.path.join(flash_dir, file.lstrip("/"))
+            if any(m in mode for m in writing):
+                if not flash_writable:
+                    raise OSError(30, "Read-only filesystem")
+                file = written
+            elif os.path.exists(written):
+                file = written
+            else:
+                mapped = os.path.join(root, file.lstrip("/"))
+                if os.path.exists(mapped) or os.path.isdir(os.path.dirname(mapped)):
+                    file = mapped
+        f = real_open(file, mode, *args, **kwargs)
+        if "b" in mode:
+            return _Counting_File(f)
+        return f
+    return sim_open
+
+class _Counting_File:
+    # charges flash time for binary reads and writes (text reads are charged by the stub that parses them)
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, *args):
+        data = self._f.read(*args)
+        HW.charge_flash_read(len(data))
+        return data
+
+    def readinto(self, buffer):
+        n = self._f.readinto(buffer)
+        HW.charge_flash_read(n or 0)
+        return n
+
+    def write(self, data):
+        n = self._f.write(data)
+        HW.charge_flash_write(n or 0)
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+        return False
+
+def run_firmware(seconds=60.0, presses=(), costs=None, start_uptime=1.0, precision="circuitpython",
+                 battery_volts=None, script="code.py", root=ROOT, before_start=None, stalls=(), trace_heap=False,
+                 flash_dir=None, flash_writable=True):
+    """runs script for seconds of virtual time after power-up; presses is a list of (time, target)
+    or (time, target, hold) where target is a button label or an (x, y) point; stalls is a list of
+    (time, seconds) spells where the master loop hangs; trace_heap backs gc.mem_free() with tracemalloc
+    (slower) instead of reporting an empty heap; files the firmware writes go to flash_dir (a new
+    temporary directory if None, see Run_Result.flash_dir); root is the firmware tree to run (ie an
+    older checkout of this repository, to compare with)"""
+    touch_list = []
+    for press in presses:
+        hold = press[2] if len(press) > 2 else DEFAULT_HOLD
+        touch_list.append((press[0], hold, press[1]))
+
+    clock = Virtual_Clock(start_uptime=start_uptime, end_uptime=start_uptime + seconds, precision=precision)
+    HW.reset(clock=clock, costs=costs if costs is not None else Cost_Model(), touches=Touch_Script(touch_list),
+             battery_volts=battery_volts)
+    HW.root = root
+    for at, stall_seconds in stalls:
+        HW.add_stall(at, stall_seconds)
+
+    # another tree's modules are imported ahead of this one's (the stubs still come first)
+    root = os.path.abspath(root)
+    if root != ROOT:
+        if root not in _other_roots:
+            _other_roots.append(root)
+        sys.path.insert(sys.path.index(STUBS) + 1, root)
+    for name in _firmware_modules():
+        del sys.modules[name]
+
+    saved = (time.monotonic, time.monotonic_ns, time.sleep, builtins.open)
+    saved_gc = sim_hardware.install_gc_shim(trace_heap)
+    time.monotonic = clock.monotonic
+    time.monotonic_ns = clock.monotonic_ns
+    time.sleep = clock.sleep
+    if flash_dir is None:
+        flash_dir = tempfile.mkdtemp(prefix="circuitpy_")
+    builtins.open = _make_open(root, saved[3], flash_dir, flash_writable)
+    saved_cwd = os.getcwd()
+    os.chdir(root)
+
+    namespace = {"__name__": "__main__", "__file__": os.path.join(root, script)}
+    HW.firmware_globals = namespace         # so hooks can look at the firmware while it runs
+    error = None
+    try:
+        if before_start is not None:
+            before_start(HW)
+        with saved[3](os.path.join(root, script)) as f:
+            source = f.read()
+        exec(compile(source, os.path.join(root, script), "exec"), namespace)
+    except Simulation_Done:
+        pass
+    except Exception as e:          # report firmware crashes to the caller instead of dying
+        error = e
+    finally:
+        time.monotonic, time.monotonic_ns, time.sleep, builtins.open = saved
+        sim_hardware.remove_gc_shim(saved_gc)
+        os.chdir(saved_cwd)
+        if root != ROOT:
+            sys.path.remove(root)
+    result = Run_Result(HW, namespace, error)
+    result.flash_dir = flash_dir
+    return result
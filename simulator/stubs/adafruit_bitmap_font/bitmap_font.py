@@ -0,0 +1,109 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_bitmap_font/bitmap_font.py stands in for adafruit_bitmap_font
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+from fontio import Glyph
+from sim_hardware import HW
+
+class BDF:
+    # like the library, glyphs are found by reading through the .bdf text; the simulator charges
+    # the flash read and python line parsing for every pass through the file
+    def __init__(self, f, bitmap):
+        self._file = f
+        self._bitmap_class = bitmap
+        self._glyphs = {}
+        self._bounding_box = None
+        self._file.seek(0)
+        for line in self._file:
+            if line.startswith("FONTBOUNDINGBOX "):
+                _, w, h, dx, dy = line.split()
+                self._bounding_box = (int(w), int(h), int(dx), int(dy))
+                break
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def get_glyph(self, codepoint):
+        if codepoint not in self._glyphs:
+            self.load_glyphs((codepoint,))
+        return self._glyphs.get(codepoint)
+
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+        wanted = set(code_points) - set(self._glyphs)
+        if not wanted:
+            return
+        self._file.seek(0)
+        data = self._file.read()
+        HW.charge_flash_read(len(data))
+        HW.clock.charge(HW.costs.text_parse_per_kb * len(data) / 1024)
+        codepoint = None
+        rows = None
+        for line in data.splitlines():
+            if line.startswith("ENCODING "):
+                codepoint = int(line.split()[1])
+            elif line.startswith("DWIDTH "):
+                _, sx, sy = line.split()
+                shift = (int(sx), int(sy))
+            elif line.startswith("BBX "):
+                _, w, h, dx, dy = line.split()
+                bbx = (int(w), int(h), int(dx), int(dy))
+            elif line.startswith("BITMAP"):
+                rows = [] if codepoint in wanted else None
+            elif line.startswith("ENDCHAR"):
+                if rows is not None:
+                    width, height, dx, dy = bbx
+                    bitmap = self._bitmap_class(width, height, 2)
+                    for y, row in enumerate(rows):
+                        value = int(row, 16)
+                        bits = len(row) * 4
+                        for x in range(width):
+                            if value & (1 << (bits - 1 - x)):
+                                bitmap[x, y] = 1
+                    self._glyphs[codepoint] = Glyph(bitmap, 0, width, height, dx, dy, shift[0], shift[1])
+                    wanted.discard(codepoint)
+                rows = None
+                if not wanted:
+                    break
+            elif rows is not None:
+                rows.append(line.strip())
+        for codepoint in wanted:
+            self._glyphs[codepoint] = None
+
+def load_font(filename, bitmap=None):
+    if bitmap is None:
+        import displayio
+        bitmap = displayio.Bitmap
+    f = open(filename, "r", encoding="latin-1")
+    return BDF(f, bitmap)
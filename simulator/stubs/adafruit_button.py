@@ -0,0 +1,87 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_button.py stands in for adafruit_button
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+import displayio
+from adafruit_display_text.label import Label
+
+class Button:
+    RECT = 0
+    ROUNDRECT = 1
+    SHADOWRECT = 2
+    SHADOWROUNDRECT = 3
+
+    def __init__(self, *, x, y, width, height, name=None, style=RECT, fill_color=0xFFFFFF, outline_color=0x0,
+                 label=None, label_font=None, label_color=0x0, selected_fill=None, selected_outline=None,
+                 selected_label=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.name = name
+        self._font = label_font
+        self._selected = False
+        self.group = displayio.Group(x=x, y=y)
+        self.group._sim_button = self          # so the simulator can find buttons on the screen by label
+        self.body = displayio.TileGrid(displayio.Bitmap(1, 1, 1), pixel_shader=displayio.Palette(1))
+        self.group.append(self.body)
+        self._label = None
+        self.fill_color = fill_color
+        self.label = label
+
+    @property
+    def label(self):
+        if self._label is None:
+            return None
+        return self._label.text
+
+    @label.setter
+    def label(self, newtext):
+        if self._label is not None:
+            self.group.remove(self._label)
+            self._label = None
+        if not newtext:
+            return
+        self._label = Label(self._font, text=newtext)
+        self.group.append(self._label)
+
+    @property
+    def selected(self):
+        return self._selected
+
+    @selected.setter
+    def selected(self, value):
+        if value != self._selected:
+            self._selected = value
+            self.body._changed()
+
+    def contains(self, point):
+        return (self.x <= point[0] <= self.x + self.width) and (self.y <= point[1] <= self.y + self.height)
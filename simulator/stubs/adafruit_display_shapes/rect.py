@@ -0,0 +1,63 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_display_shapes/rect.py stands in for adafruit_display_shapes.rect
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+import displayio
+
+class Rect(displayio.TileGrid):
+    def __init__(self, x, y, width, height, *, fill=None, outline=None, stroke=1):
+        self._bitmap = displayio.Bitmap(width, height, 2)
+        self._palette = displayio.Palette(2)
+        super().__init__(self._bitmap, pixel_shader=self._palette, x=x, y=y)
+        self.width = width
+        self.height = height
+        self._fill = fill
+        self._outline = outline
+
+    @property
+    def fill(self):
+        return self._fill
+
+    @fill.setter
+    def fill(self, color):
+        if color != self._fill:
+            self._fill = color
+            self._changed()
+
+    @property
+    def outline(self):
+        return self._outline
+
+    @outline.setter
+    def outline(self, color):
+        if color != self._outline:
+            self._outline = color
+            self._changed()
@@ -0,0 +1,104 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_display_text/label.py stands in for adafruit_display_text.label
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+import displayio
+from sim_hardware import HW
+
+class Label(displayio.Group):
+    # lays text out from the font's glyph metrics the same way the 2019 library does, so bounding_box
+    # (and anything aligned with it) comes out the same as on the board
+    _is_sim_label = True
+
+    def __init__(self, font, *, text=None, max_glyphs=None, color=0xFFFFFF, background_color=None, line_spacing=1.25, **kwargs):
+        if not max_glyphs and not text:
+            raise RuntimeError("Please provide a max size, or initial text")
+        if not max_glyphs:
+            max_glyphs = len(text)
+        super().__init__(max_size=max_glyphs, **kwargs)
+        self.font = font
+        self._max_glyphs = max_glyphs
+        self._color = color
+        self._text = ""
+        self._boundingbox = (0, 0, 0, 0)
+        self.glyph_writes = 0
+        if text is not None:
+            self._update_text(str(text))
+
+    def _update_text(self, new_text):
+        if len(new_text.replace("\n", "")) > self._max_glyphs:
+            raise RuntimeError("Text length exceeds max_glyphs")
+        x = 0
+        y = 0
+        left = right = top = bottom = 0
+        line_height = self.font.get_bounding_box()[1]
+        for character in new_text:
+            if character == "\n":
+                y += int(line_height * 1.25)
+                x = 0
+                continue
+            glyph = self.font.get_glyph(ord(character))
+            if not glyph:
+                continue
+            right = max(right, x + glyph.width)
+            if y == 0:
+                top = min(top, -glyph.height - glyph.dy)
+            bottom = max(bottom, y - glyph.dy)
+            x += glyph.shift_x
+        changed = sum(1 for a, b in zip(new_text, self._text) if a != b) + abs(len(new_text) - len(self._text))
+        self.glyph_writes += changed
+        HW.clock.charge(HW.costs.label_glyph * len(new_text))
+        self._text = new_text
+        self._boundingbox = (left, top, right - left, bottom - top)
+        self._changed()
+
+    @property
+    def bounding_box(self):
+        HW.clock.charge(HW.costs.label_measure)
+        return self._boundingbox
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, new_color):
+        if new_color != self._color:
+            self._color = new_color
+            self._changed()
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, new_text):
+        self._update_text(new_text)
@@ -0,0 +1,65 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_pcf8523.py stands in for the PCF8523 real time clock board
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+import time
+from sim_hardware import HW
+
+class PCF8523:
+    # keeps whole-second wall clock time that ticks with the virtual clock; every read or write of
+    # datetime counts (and costs) one I2C transaction, like the real register block transfer
+    def __init__(self, i2c_bus):
+        self._i2c = i2c_bus
+        year, month, day, hour, minute, second = HW.rtc_start
+        self._set_seconds = (hour * 3600) + (minute * 60) + second
+        self._set_date = (year, month, day)
+        self._set_at_ns = HW.clock.monotonic_ns()
+        self.lost_power = False
+        self.battery_low = False
+
+    def _transaction(self):
+        HW.i2c_transactions += 1
+        HW.clock.charge(HW.costs.i2c_transaction)
+
+    @property
+    def datetime(self):
+        self._transaction()
+        elapsed = (HW.clock.monotonic_ns() - self._set_at_ns) // 1000000000
+        seconds = (self._set_seconds + elapsed) % 86400
+        year, month, day = self._set_date
+        return time.struct_time((year, month, day, seconds // 3600, (seconds // 60) % 60, seconds % 60, 0, -1, -1))
+
+    @datetime.setter
+    def datetime(self, value):
+        self._transaction()
+        self._set_seconds = (value.tm_hour * 3600) + (value.tm_min * 60) + value.tm_sec
+        self._set_date = (value.tm_year, value.tm_mon, value.tm_mday)
+        self._set_at_ns = HW.clock.monotonic_ns()
@@ -0,0 +1,54 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/adafruit_touchscreen.py stands in for the resistive touchscreen
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+from sim_hardware import HW
+
+class Touchscreen:
+    # touch_point follows the run's HW.touches script instead of the analog touch pins
+    def __init__(self, x1_pin, x2_pin, y1_pin, y2_pin, *, x_resistance=None, samples=4, z_threshold=10000,
+                 calibration=None, size=None):
+        self._size = size
+
+    @property
+    def touch_point(self):
+        clock = HW.clock
+        if HW.first_touch_poll_ns is None:
+            HW.first_touch_poll_ns = clock.monotonic_ns()
+        HW.touch_polls += 1
+        HW.stall_if_due()
+        # always let a little time pass so a firmware loop that never sleeps still reaches the end of the run
+        clock.charge(max(HW.costs.touch_poll, 0.00001))
+        clock.check_end()
+        point = HW.touches.point_at(clock.monotonic_ns() / 1000000000)
+        if point is None:
+            return None
+        return (point[0], point[1], 30000)
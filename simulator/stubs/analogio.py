@@ -0,0 +1,51 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/analogio.py stands in for CircuitPython's analogio on the desktop
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+from sim_hardware import HW
+
+class AnalogIn:
+    # value follows HW.battery_volts(uptime), scaled the way battery_checker.py expects (5v full scale
+    # when running from the PowerBoost), so the simulated battery drains however the run sets it up
+    def __init__(self, pin):
+        self._pin = pin
+        self.reference_voltage = 3.3
+
+    @property
+    def value(self):
+        HW.adc_reads += 1
+        HW.clock.charge(HW.costs.adc_read)
+        volts = HW.battery_volts(HW.clock.monotonic_ns() / 1000000000)
+        raw = int(volts * 65536 / 5)
+        return max(0, min(65535, raw))
+
+    def deinit(self):
+        pass
@@ -0,0 +1,58 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/bitmaptools.py stands in for CircuitPython's bitmaptools (7.0 and later)
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+from sim_hardware import HW
+
+def arrayblit(bitmap, data, x1=0, y1=0, x2=-1, y2=-1, skip_index=None):
+    if x2 == -1:
+        x2 = bitmap.width
+    if y2 == -1:
+        y2 = bitmap.height
+    if x1 < 0 or y1 < 0 or x2 > bitmap.width or y2 > bitmap.height or len(data) < (x2 - x1) * (y2 - y1):
+        raise ValueError("out of range of target")
+    HW.clock.charge(HW.costs.native_call + HW.costs.native_pixel_write * (x2 - x1) * (y2 - y1))
+    changed = False
+    i = 0
+    for y in range(y1, y2):
+        for x in range(x1, x2):
+            value = data[i]
+            i += 1
+            if value == skip_index:
+                continue
+            if value >= bitmap._value_count:
+                raise ValueError("pixel value requires too many bits")
+            index = y * bitmap.width + x
+            if bitmap._pixels[index] != value:
+                bitmap._pixels[index] = value
+                changed = True
+    if changed and bitmap._owner is not None:
+        bitmap._owner._changed()
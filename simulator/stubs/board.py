@@ -0,0 +1,140 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/board.py stands in for the PyPortal's board module on the desktop
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+"""
+from sim_hardware import HW, walk
+
+class Pin:
+    def __init__(self, name):
+        self._name = name
+
+    def __repr__(self):
+        return "board." + self._name
+
+    def __str__(self):
+        return self._name
+
+D3 = Pin("D3")
+D4 = Pin("D4")
+A1 = Pin("A1")
+A3 = Pin("A3")
+SCL = Pin("SCL")
+SDA = Pin("SDA")
+TOUCH_XL = Pin("TOUCH_XL")
+TOUCH_XR = Pin("TOUCH_XR")
+TOUCH_YD = Pin("TOUCH_YD")
+TOUCH_YU = Pin("TOUCH_YU")
+LIGHT = Pin("LIGHT")
+SPEAKER = Pin("SPEAKER")
+SPEAKER_ENABLE = Pin("SPEAKER_ENABLE")
+
+class Sim_Display:
+    # records a "frame" each time it refreshes with something changed on screen; a frame is
+    # (time_ns, number of changed elements, texts of the visible labels in drawing order)
+    def __init__(self):
+        self.width = 320
+        self.height = 240
+        self.root_group = None
+        self.auto_refresh = True
+        self._brightness = 1.0
+        self.brightness_changes = 0
+        self.frames = []
+        self.max_frames = 20000
+        self.refreshes = 0
+        self.refresh_busy_ns = 0
+        self._pending = set()
+        self._full = False
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        if value != self._brightness:
+            self._brightness = value
+            self.brightness_changes += 1
+
+    def show(self, group):
+        self.root_group = group
+        self._full = True
+
+    def _is_showing(self, element):
+        while element is not None:
+            if element is self.root_group:
+                return True
+            element = element._parent
+        return False
+
+    def note_change(self, element):
+        if self._is_showing(element):
+            self._pending.add(id(element))
+
+    def has_changes(self):
+        return self._full or bool(self._pending)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        if not self.has_changes():
+            return True
+        changed = len(self._pending)
+        if self._full:
+            changed = max(changed, 1) + 20
+        cost = HW.costs.refresh_fixed + (HW.costs.refresh_per_change * changed)
+        start = HW.clock.monotonic_ns()
+        HW.clock.charge(cost)
+        self.refresh_busy_ns += HW.clock.monotonic_ns() - start
+        self.refreshes += 1
+        if len(self.frames) < self.max_frames:
+            self.frames.append((start, changed, self.visible_texts()))
+        self._pending = set()
+        self._full = False
+        return True
+
+    def wait_for_frame(self):
+        if self.auto_refresh:
+            self.refresh()
+
+    def auto_refresh_tick(self):
+        if self.auto_refresh and self.has_changes():
+            self.refresh()
+
+    def visible_texts(self):
+        texts = []
+        if self.root_group is None:
+            return tuple(texts)
+        for item in walk(self.root_group):
+            if getattr(item, "_is_sim_label", False) and item.text:
+                texts.append(item.text)
+        return tuple(texts)
+
+DISPLAY = Sim_Display()
+HW.display = DISPLAY
+HW.clock.on_advance.append(DISPLAY.auto_refresh_tick)
@@ -0,0 +1,200 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/displayio.py stands in for CircuitPython's displayio on the desktop
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# only the parts of displayio the stopwatch uses.  every change to something on the screen is reported
+# to the simulated display, which "refreshes" (records a frame and charges virtual time) either on its
+# own when auto_refresh is on, or when the firmware calls refresh().
+#
+"""
+from sim_hardware import HW
+
+class _Element:
+    _parent = None
+    _x = 0
+    _y = 0
+
+    def _changed(self):
+        if HW.display is not None:
+            HW.display.note_change(self)
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        if value != self._x:
+            self._x = value
+            self._changed()
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if value != self._y:
+            self._y = value
+            self._changed()
+
+class Group(_Element):
+    def __init__(self, *, max_size=None, scale=1, x=0, y=0):
+        self._items = []
+        self._max_size = max_size
+        self.scale = scale
+        self._x = x
+        self._y = y
+        self.hidden = False
+
+    def append(self, item):
+        self.insert(len(self._items), item)
+
+    def insert(self, index, item):
+        if self._max_size is not None and len(self._items) >= self._max_size:
+            raise RuntimeError("Group full")
+        if item._parent is not None:
+            raise ValueError("Layer already in a group.")
+        self._items.insert(index, item)
+        item._parent = self
+        self._changed()
+
+    def remove(self, item):
+        self._items.remove(item)
+        item._parent = None
+        self._changed()
+
+    def pop(self, index=-1):
+        item = self._items.pop(index)
+        item._parent = None
+        self._changed()
+        return item
+
+    def index(self, item):
+        return self._items.index(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, item):
+        old = self._items[index]
+        old._parent = None
+        self._items[index] = item
+        item._parent = self
+        self._changed()
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self._value_count = value_count
+        self._pixels = bytearray(width * height)
+        self._owner = None                 # TileGrid showing this bitmap (for change reporting)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            x, y = index
+            index = y * self.width + x
+        if value >= self._value_count:
+            raise ValueError("pixel value requires too many bits")
+        HW.clock.charge(HW.costs.pixel_write)
+        if self._pixels[index] != value:
+            self._pixels[index] = value
+            if self._owner is not None:
+                self._owner._changed()
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            index = y * self.width + x
+        return self._pixels[index]
+
+    def fill(self, value):
+        self._pixels[:] = bytes([value]) * len(self._pixels)
+        if self._owner is not None:
+            self._owner._changed()
+
+class Palette:
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = set()
+        self._owner = None
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __setitem__(self, index, color):
+        if self._colors[index] != color:
+            self._colors[index] = color
+            if self._owner is not None:
+                self._owner._changed()
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def make_transparent(self, index):
+        self._transparent.add(index)
+
+    def make_opaque(self, index):
+        self._transparent.discard(index)
+
+class ColorConverter:
+    def __init__(self):
+        pass
+
+class OnDiskBitmap:
+    # the real thing reads pixels off flash as the display draws them; the first frame of a full-screen
+    # image reads the whole file, so the simulator reads it up front (the simulator's file charges for it)
+    def __init__(self, file):
+        data = file.read()
+        self.width = int.from_bytes(data[18:22], "little")
+        self.height = int.from_bytes(data[22:26], "little")
+        self._owner = None
+
+class TileGrid(_Element):
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1, tile_width=None, tile_height=None, default_tile=0, x=0, y=0):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self._x = x
+        self._y = y
+        self.hidden = False
+        if hasattr(bitmap, "_owner"):
+            bitmap._owner = self
+        if hasattr(pixel_shader, "_owner"):
+            pixel_shader._owner = self
+
+def release_displays():
+    pass
@@ -0,0 +1,257 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  simulator/stubs/sim_hardware.py holds the shared state of the simulated PyPortal
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the stub modules next to this one (board, displayio, digitalio, ...) all keep their state here,
+# so the simulator (simulator/sim.py) can set up a run, script the touchscreen, and read back what
+# the firmware did.  everything is timed by a virtual clock: time.sleep() advances it instantly,
+# and the simulated hardware charges it for the work a real PyPortal would spend (see Cost_Model).
+#
+"""
+import gc as _gc
+import struct
+import time as _host_time
+import tracemalloc as _tracemalloc
+
+class Simulation_Done(Exception):
+    # raised out of time.sleep() / touch polling once the virtual clock reaches the end of the run
+    pass
+
+class Cost_Model:
+    # rough virtual-time costs (seconds) of work the PyPortal does in hardware or in C; the numbers are
+    # estimates for a SAMD51 PyPortal, meant for comparing two ways of doing something, not absolute truth
+    def __init__(self, scale=1.0):
+        self.label_glyph = 0.0004 * scale          # rebuilding one glyph tile when Label.text changes
+        self.label_measure = 0.0003 * scale        # Label.bounding_box layout pass
+        self.refresh_fixed = 0.002 * scale         # starting a display refresh
+        self.refresh_per_change = 0.004 * scale    # pushing one changed element's area over SPI
+        self.i2c_transaction = 0.0006 * scale      # one short I2C register read/write (ie the RTC)
+        self.adc_read = 0.00006 * scale            # one AnalogIn.value
+        self.flash_read_per_kb = 0.0008 * scale    # reading a file off CIRCUITPY
+        self.flash_write_per_kb = 0.004 * scale    # writing a file on CIRCUITPY
+        self.text_parse_per_kb = 0.01 * scale      # line-by-line python parsing of a text (bdf) file
+        self.pixel_write = 0.000002 * scale        # one Bitmap[x, y] = value from python
+        self.native_call = 0.00002 * scale         # calling a C helper such as bitmaptools.arrayblit
+        self.native_pixel_write = 0.00000005 * scale   # one pixel written by that helper
+        self.touch_poll = 0.002 * scale            # adafruit_touchscreen sampling the resistive panel
+        self.gc_collect = 0.005 * scale            # one gc.collect() of a mostly full heap
+
+NO_COSTS = Cost_Model(0.0)
+
+# nominal heap size behind the gc.mem_free() shim.  the byte counts are CPython's (its objects are
+# several times bigger than CircuitPython's), so only the difference between two readings means anything
+SIM_HEAP_SIZE = 16 * 1024 * 1024
+
+def _mem_alloc():
+    if not _tracemalloc.is_tracing():
+        return 0
+    return _tracemalloc.get_traced_memory()[0]
+
+def _mem_free():
+    return SIM_HEAP_SIZE - _mem_alloc()
+
+_host_collect = _gc.collect
+
+def _collect(*args):
+    # a collection also costs the board its pause
+    HW.clock.charge(HW.costs.gc_collect)
+    return _host_collect(*args)
+
+def install_gc_shim(trace=True):
+    # gives the host's gc module CircuitPython's mem_free() / mem_alloc(), backed by tracemalloc when
+    # trace is set (otherwise they report an empty heap), and makes gc.collect() charge the virtual
+    # clock;  returns what remove_gc_shim() needs
+    saved = (getattr(_gc, "mem_free", None), getattr(_gc, "mem_alloc", None), _tracemalloc.is_tracing())
+    _gc.mem_free = _mem_free
+    _gc.mem_alloc = _mem_alloc
+    _gc.collect = _collect
+    if trace and not saved[2]:
+        _tracemalloc.start()
+    return saved
+
+def remove_gc_shim(saved):
+    mem_free, mem_alloc, was_tracing = saved
+    if not was_tracing and _tracemalloc.is_tracing():
+        _tracemalloc.stop()
+    _gc.collect = _host_collect
+    for name, value in (("mem_free", mem_free), ("mem_alloc", mem_alloc)):
+        if value is None:
+            delattr(_gc, name)
+        else:
+            setattr(_gc, name, value)
+
+def _round_monotonic(value, precision):
+    # CircuitPython floats are single precision with the two lowest mantissa bits used as object tags,
+    # so time.monotonic() gets coarser the longer the board has been up
+    if precision == "double":
+        return value
+    value = struct.unpack("<f", struct.pack("<f", value))[0]
+    if precision == "circuitpython":
+        raw = struct.unpack("<I", struct.pack("<f", value))[0] & 0xFFFFFFFC
+        value = struct.unpack("<f", struct.pack("<I", raw))[0]
+    return value
+
+class Virtual_Clock:
+    def __init__(self, start_uptime=1.0, end_uptime=None, precision="circuitpython"):
+        self._now_ns = int(start_uptime * 1000000000)
+        self.end_ns = None if end_uptime is None else int(end_uptime * 1000000000)
+        self.precision = precision
+        self.slept_ns = 0                          # total time spent in time.sleep (ie idle)
+        self.sleep_calls = 0
+        self.on_advance = []                       # callables run whenever time moves (display auto refresh)
+
+    def monotonic_ns(self):
+        return self._now_ns
+
+    def monotonic(self):
+        return _round_monotonic(self._now_ns / 1000000000, self.precision)
+
+    def advance(self, seconds):
+        if seconds <= 0:
+            return
+        self._now_ns += int(seconds * 1000000000)
+
+    def charge(self, seconds):
+        # time spent busy doing simulated hardware work
+        self.advance(seconds)
+
+    def sleep(self, seconds):
+        # like CircuitPython, sleeping is done in whole milliseconds (and never less than one)
+        self.sleep_calls += 1
+        sleep_ns = max(1000000, int(seconds * 1000) * 1000000)
+        self.slept_ns += sleep_ns
+        self._now_ns += sleep_ns
+        for callback in self.on_advance:
+            callback()
+        self.check_end()
+
+    def check_end(self):
+        if self.end_ns is not None and self._now_ns >= self.end_ns:
+            raise Simulation_Done()
+
+class Touch_Script:
+    # presses is a list of (start time, hold seconds, target) where target is an (x, y) point or the
+    # label text of a button on the screen showing at that moment; times are virtual uptime seconds
+    def __init__(self, presses=()):
+        self._presses = sorted(presses, key=lambda p: p[0])
+        self.resolved = []                         # (time, target, point) actually pressed
+
+    def add(self, start, hold, target):
+        self._presses.append((start, hold, target))
+        self._presses.sort(key=lambda p: p[0])
+
+    def point_at(self, now):
+        for start, hold, target in self._presses:
+            if start <= now < start + hold:
+                return self._resolve(start, target)
+        return None
+
+    def _resolve(self, start, target):
+        if isinstance(target, tuple):
+            point = target
+        else:
+            point = find_button_center(target)
+            if point is None:
+                return None
+        key = (start, target)
+        if not self.resolved or self.resolved[-1][:2] != key:
+            self.resolved.append((start, target, point))
+        return point
+
+class Hardware:
+    def __init__(self):
+        self.reset()
+
+    def reset(self, clock=None, costs=None, touches=None, battery_volts=None, rtc_start=(2019, 10, 19, 9, 30, 0)):
+        self.clock = clock if clock is not None else Virtual_Clock()
+        self.costs = costs if costs is not None else Cost_Model()
+        self.touches = touches if touches is not None else Touch_Script()
+        # battery_volts(uptime seconds) -> volts seen at the a/d pin (after the divider/follower)
+        self.battery_volts = battery_volts if battery_volts is not None else (lambda t: 1.30)
+        self.rtc_start = rtc_start
+        self.display = None
+        self.pin_log = {}                         # pin name -> [(time_ns, value), ...] output transitions
+        self.pwm_log = {}                         # pin name -> [(time_ns, duty_cycle, frequency), ...]
+        self.i2c_transactions = 0
+        self.adc_reads = 0
+        self.flash_bytes_read = 0
+        self.flash_bytes_written = 0
+        self.first_touch_poll_ns = None           # when the firmware first looked at the touchscreen
+        self.touch_polls = 0
+        self.root = None                          # host directory that stands in for CIRCUITPY
+        self.firmware_globals = None              # code.py's globals (set by sim.run_firmware)
+        self.stalls = []                          # [uptime, seconds] busy spells still to inject (see stall_if_due)
+
+    def add_stall(self, at, seconds):
+        # at uptime "at" the firmware loop hangs for "seconds" (ie a slow font load or an I2C retry)
+        self.stalls.append([at, seconds])
+        self.stalls.sort()
+
+    def stall_if_due(self):
+        while self.stalls and self.stalls[0][0] * 1000000000 <= self.clock.monotonic_ns():
+            _, seconds = self.stalls.pop(0)
+            self.clock.charge(seconds)
+
+    def log_pin(self, pin, value):
+        log = self.pin_log.setdefault(str(pin), [])
+        if not log or log[-1][1] != value:
+            log.append((self.clock.monotonic_ns(), value))
+
+    def log_pwm(self, pin, duty_cycle, frequency):
+        log = self.pwm_log.setdefault(str(pin), [])
+        if not log or log[-1][1:] != (duty_cycle, frequency):
+            log.append((self.clock.monotonic_ns(), duty_cycle, frequency))
+
+    def charge_flash_read(self, nbytes):
+        self.flash_bytes_read += nbytes
+        self.clock.charge(self.costs.flash_read_per_kb * nbytes / 1024)
+
+    def charge_flash_write(self, nbytes):
+        self.flash_bytes_written += nbytes
+        self.clock.charge(self.costs.flash_write_per_kb * nbytes / 1024)
+
+HW = Hardware()
+
+def find_button_center(label_text):
+    # looks through whatever group is showing for a Button with this label
+    if HW.display is None or HW.display.root_group is None:
+        return None
+    for item in walk(HW.display.root_group):
+        button = getattr(item, "_sim_button", None)
+        if button is not None and button.label == label_text:
+            return (button.x + button.width // 2, button.y + button.height // 2)
+    return None
+
+def walk(group):
+    yield group
+    for item in getattr(group, "_items", ()):
+        for sub in walk(item):
+            yield sub
+
+def host_perf_counter():
+    return _host_time.perf_counter()
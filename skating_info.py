@@ -32,64 +32,200 @@ import time
 import board
 from digitalio import DigitalInOut, Direction, Pull
 import myconstants
+from time_format import format_mss, format_mss_tenths, tenths_suffix
+import event_log
+from duration_catalog import Duration_Catalog, DEFAULT_CATALOG
+from timing_rules import Rule_Table
+from timer_bank import Timer_Bank, Split_Buffer, NS_PER_SECOND, NS_PER_TENTH
+
+# tenths (m:ss.t) are only shown from 0:00.0 to 9:59.9;  outside that range the extra digits would not
+# fit to the left of the buttons, so the main timer falls back to m:ss
+_TENTHS_LIMIT = 6000
+
+# slots of Skating_Info._notes_shown
+_NOTES_CALL = 0
+_NOTES_SEPARATION = 1
+_NOTES_INTERRUPT_AT = 2
+_NOTES_INTERRUPT_DUR = 3
+
+# timers in Skating_Info._timers (added in this order)
+_TIMER_MAIN = 0
+_TIMER_CALL = 1
+_TIMER_SEPARATION = 2
+_TIMER_INTERRUPT = 3
+
+# tapping the notes panel pages through every timer in the bank and then the main timer's splits, this
+# many to a page, and back to the notes
+_TIMERS_PER_PAGE = 3
+_SPLITS_PER_PAGE = 3
+_MAX_SPLITS = 15
 
 class Skating_Info:
-    def __init__(self, display_main, beep_manager, rtc_manager):
+    def __init__(self, display_main, beep_manager, rtc_manager, events=None, catalog=None):
         self._display_main = display_main
         self._beep_manager = beep_manager
         self._rtc_manager = rtc_manager
+        self._events = events                   # event_log.Event_Log, or None to not record anything
+        self._skater_called = False             # True from a skater call until their start
         self._warmupduration_sec = 240
         self._mode = "program"                  # "program" or "warmup"
         self._alert_silent_or_beep = "B"        # "B" or "S"
         self._current_screen = "watch"          # "watch" or "setprog" or "settime"
 
-        self._current_main_num_of_seconds = 0
-        self._main_timer_running = "no"              # "no" or "yes"
-        self._main_timer_direction = "up"            # "up" or "down"
-        # note this timer needs to be CORRECT, and not lose time when processor gets busy
-        # so for this one (only) we calculate duration based on interrupt-driven system clock
-        self._main_timer_start_reference = 0         # will get value from time.monotonic() when timer starts
-        self._skater_call_timer_start_reference = 0         # will get value from time.monotonic() when timer starts
-        self._skater_separation_timer_start_reference = 0   # will get value from time.monotonic() when timer starts
-        self._interrupt_timer_start_reference = 0           # will get value from time.monotonic() when timer starts
-
-        self._seconds_since_skater_call = 0
-        self._skater_call_timer_running = "no"  # "no" or "yes"
-
-        self._seconds_since_last_skater_ended = 0
-        self._skater_separation_timer_running = "no"
-
-        
+        # all timers are kept in one bank (see timer_bank.py) and brought up to date together by
+        # update_times();  they run from the system clock, so they do not lose time when the processor
+        # gets busy.  the main timer counts down from the warmup length in warmup mode
+        self._timers = Timer_Bank()
+        self._timers.add("Main")
+        self._timers.add("Call")
+        self._timers.add("Separation")
+        self._timers.add("Interrupt")
+        self._main_paused = False                    # True while an interruption holds the main timer
+        self._splits = Split_Buffer(_MAX_SPLITS)     # main timer splits (tenths) of the current program
+        self._show_tenths = myconstants.SHOW_TENTHS  # True to show the main timer as m:ss.t
+        self._notes_shown = [None, None, None, None] # values now on the notes lines (see _NOTES_xxx)
+        self._notes_page = 0                         # 0 shows the notes, 1.. a page of the timer bank
+        self._interrupt_text = ""                    # "Interrupt @ m:ss   Dur: " of the interruption shown
+        # the timer page's line prefixes are built once here rather than on every redraw
+        self._timer_names = []
+        self._timer_running_names = []
+        for index in range(self._timers.get_count()):
+            self._timer_names.append(self._timers.get_name(index) + "  ")
+            self._timer_running_names.append(self._timers.get_name(index) + " (run)  ")
+
+        # program durations and their timing rules come from the catalog (see duration_catalog.py)
+        if catalog is None:
+            catalog = Duration_Catalog()
+            catalog.load_text(DEFAULT_CATALOG)
+        self._catalog = catalog
         self._cur_duration_index = 0
-        self._programdurations = [90, 120, 140, 150, 160, 180, 210, 240, 60, 70, 75, 90, 100, 110, 130, 150, 160, 190, 220]
-        self._maxorwindow_values = ["W", "W", "W", "W", "W", "W", "W", "W", "M", "M", "M", "M", "M", "M", "M", "M", "M", "M", "M"]
-        self._programduration_sec = self._programdurations[self._cur_duration_index]
-        self._max_or_window = self._maxorwindow_values[self._cur_duration_index]
+        self._programduration_sec = 0
+        self._max_or_window = "W"                # "M" (MAX) or "W" (+/- window)
+        self._near_sec = 5                       # the end is near this many seconds before the limit
+        self._window_sec = 10                    # +/- programs may end this far either side of the duration
+        self._short_sec = 30                     # +/- programs this much short of the duration are not scored
 
-        self._interrupt_timer_running = "no"
         self._interrupt_started_at_seconds = 0     # 0 means not interrupted, positive value is number of seconds into prog that int started
-        self._seconds_since_interrupt_started = 0  
         self._number_of_interruption_events = 0
 
+        # color / warning / beep rules of each timer (see timing_rules.py);  the main timer's depend on
+        # mode and duration and are compiled by _compile_main_rules()
+        self._main_rules = Rule_Table()
+        self._main_rule_shown = -1               # row of _main_rules now on the screen, -1 to redraw
+        self._call_rules = Rule_Table()
+        self._call_rules.add(0, myconstants.WHITE, "")
+        self._call_rules.add(30, myconstants.RED, "", self._show_call_color)
+        self._interrupt_rules = Rule_Table()
+        self._interrupt_rules.add(0, myconstants.WHITE, "")
+        self._interrupt_rules.add(11, myconstants.ORANGE, "", self._show_interrupt_color)   # shown Dur is over 10s
+        self._interrupt_rules.add(41, myconstants.RED, "", self._show_interrupt_color)      # shown Dur is over 40s
+
+        self._select_duration(0)
         self.set_mode_program()
 
         self.reset_main_time()
         self.display_dur_info()
+        self.show_category()
         self._display_main.set_text_wnb1("Since Skater Called: --")
         self._display_main.set_text_wnb2("Since Last Skater End: --")
         self._display_main.set_text_wnb3("No Interruptions")
 
-    def _format_timestring(self, full_seconds):
-        full_seconds_abs = abs(full_seconds)
-        num_minutes = int(full_seconds_abs / 60)
-        num_seconds = full_seconds_abs - (num_minutes * 60)
-        sign = ""
-        if full_seconds < 0:
-            sign = "-"
-        leading_zero = ""
-        if num_seconds < 10:
-            leading_zero = "0"
-        return sign + str(num_minutes) + ":" + leading_zero + str(num_seconds)
+    # shows the big main timer, m:ss or (in tenths mode) m:ss with its .t after it in the small font
+    def _show_main_time(self):
+        timers = self._timers
+        if self._show_tenths:
+            tenths = timers.get_tenths(_TIMER_MAIN)
+            if timers.is_down(_TIMER_MAIN):
+                tenths = (timers.get_limit(_TIMER_MAIN) * 10) - tenths
+            if tenths >= 0 and tenths < _TENTHS_LIMIT:
+                self._display_main.set_text_tdb(format_mss(tenths // 10), tenths_suffix(tenths))
+                return
+        self._display_main.set_text_tdb(format_mss(timers.get_shown_seconds(_TIMER_MAIN)))
+
+    def is_showing_tenths(self):
+        return self._show_tenths
+
+    def toggle_tenths(self):
+        self._show_tenths = not self._show_tenths
+
+    # ---------------- event log ----------------
+    def _log(self, event, value):
+        if self._events is not None:
+            mode = event_log.MODE_PROGRAM
+            if self._mode == "warmup":
+                mode = event_log.MODE_WARMUP
+            self._events.record(event, mode, value)
+
+    # a skater's run begins with their call, or with the start if they were not called
+    def _begin_skater(self):
+        if self._events is not None:
+            self._events.next_skater()
+
+    # ---------------- timing rules ----------------
+    # MAX programs: green;  yellow from dur-near;  beep at dur;  red after dur
+    # +/- programs: red (short-not scored) from 1s;  orange at dur-short (short-deduct);  green at dur-window;
+    #     yellow at dur+window-near;  beep at dur+window;  red after dur+window
+    # warmups (elapsed = warmup length - shown time): green;  yellow and beep at 60s left;  orange at 4s left;
+    #     warmup-over sound at 0;  red below 0
+    def _compile_main_rules(self):
+        rules = self._main_rules
+        rules.clear()
+        if self._mode == "program":
+            duration = self._programduration_sec
+            if self._max_or_window == "M":
+                rules.add(0, myconstants.GREEN, "")
+                rules.add(duration - self._near_sec, myconstants.YELLOW, "The end is near")
+                rules.add(duration, myconstants.YELLOW, "The end is near", self._sound_alert)
+                rules.add(duration + 1, myconstants.RED, "Too Long")
+            else:
+                limit = duration + self._window_sec
+                rules.add(0, None, "")
+                rules.add(1, myconstants.RED, "Too Short-No Score")
+                rules.add(duration - self._short_sec, myconstants.ORANGE, "Short-Deduct")
+                rules.add(duration - self._window_sec, myconstants.GREEN, "")
+                rules.add(limit - self._near_sec, myconstants.YELLOW, "The end is near")
+                rules.add(limit, myconstants.YELLOW, "The end is near", self._sound_alert)
+                rules.add(limit + 1, myconstants.RED, "Too Long")
+        else:
+            duration = self._warmupduration_sec
+            rules.add(0, myconstants.GREEN, "")
+            rules.add(duration - 60, myconstants.YELLOW, "", self._sound_alert)
+            rules.add(duration - 59, myconstants.YELLOW, "Final Minute")
+            rules.add(duration - 4, myconstants.ORANGE, "Final Minute")
+            rules.add(duration, myconstants.ORANGE, "", self._sound_warmup_over)
+            rules.add(duration + 1, myconstants.RED, "Warmup Over")
+        self._main_rule_shown = -1
+
+    def _sound_alert(self):
+        self._beep_manager.play("double-beep")
+
+    def _sound_warmup_over(self):
+        self._beep_manager.play("warmup-over")
+
+    def _show_call_color(self):
+        # the top notes line only shows the call timer in program mode (and not while paging timers)
+        if self._mode == "program" and self._notes_page == 0:
+            row = self._call_rules.find(self._timers.get_seconds(_TIMER_CALL))
+            self._display_main.set_color_wnb1(self._call_rules.get_color(row))
+
+    def _show_interrupt_color(self):
+        if self._notes_page == 0:
+            row = self._interrupt_rules.find(self._timers.get_seconds(_TIMER_INTERRUPT))
+            self._display_main.set_color_wnb3(self._interrupt_rules.get_color(row))
+
+    # absolute time.monotonic_ns() at which the next rule of a running timer starts (a color or warning
+    # changes, or a beep is due), or None if no running timer has any rule left
+    def get_next_rule_time(self):
+        next_time = None
+        for index, rules in ((_TIMER_MAIN, self._main_rules), (_TIMER_CALL, self._call_rules),
+                             (_TIMER_INTERRUPT, self._interrupt_rules)):
+            if self._timers.is_running(index):
+                start = rules.get_next_start(self._timers.get_seconds(index))
+                if start is not None:
+                    start = self._timers.get_reference(index) + (start * NS_PER_SECOND)
+                    if next_time is None or start < next_time:
+                        next_time = start
+        return next_time
 
     def set_mode_program(self):
         self._mode = "program"
@@ -103,6 +239,7 @@ class Skating_Info:
     def set_mode_warmup(self):
         self._mode = "warmup"
         self._display_main.set_text_mdb("Warming Up")
+        self._display_main.set_text_timewarn("")
 
     def is_mode_warmup(self):
         if self._mode == "warmup":
@@ -117,46 +254,64 @@ class Skating_Info:
             return False
     
     def reset_separation_timer(self):
-        self._skater_separation_timer_running = "no"
-        self._seconds_since_last_skater_ended = 0
+        self._timers.reset(_TIMER_SEPARATION)
 
     def start_separation_timer(self):
-        self._skater_separation_timer_running = "yes"
-        self._seconds_since_last_skater_ended = 0
-        self._skater_separation_timer_start_reference = time.monotonic()
+        self._timers.start(_TIMER_SEPARATION)
 
     def stop_separation_timer(self):
-        self._skater_separation_timer_running = "no"
+        self._timers.stop(_TIMER_SEPARATION)
 
     def reset_call_timer(self):
-        self._skater_call_timer_running = "no"
-        self._seconds_since_skater_call = 0
+        self._timers.reset(_TIMER_CALL)
+        self._call_rules.disarm()
+        self._show_call_color()
 
     def start_call_timer(self):
-        self._skater_call_timer_running = "yes"
-        self._seconds_since_skater_call = 0
-        self._skater_call_timer_start_reference = time.monotonic()
+        self._timers.start(_TIMER_CALL)
+        self._call_rules.arm()
+        self._show_call_color()
+        self._begin_skater()
+        self._skater_called = True
+        self._log(event_log.EVENT_CALL, 0)
 
     def stop_call_timer(self):
-        self._skater_call_timer_running = "no"
+        self._timers.stop(_TIMER_CALL)
+        self._call_rules.disarm()
 
 
     def reset_interrupt_timer(self):
-        self._interrupt_timer_running = "no"
+        self._timers.reset(_TIMER_INTERRUPT)
         self._interrupt_started_at_seconds = 0     
-        self._seconds_since_interrupt_started = 0 
         self._number_of_interruption_events = 0
-        self._display_main._watch_notes3_box.color = myconstants.WHITE
+        self._interrupt_rules.disarm()
+        self._show_interrupt_color()
 
+    # program time does not run during an interruption:  the main timer is paused until it is over
     def start_interrupt_timer(self):
-        self._interrupt_timer_running = "yes"
-        self._interrupt_started_at_seconds = self._current_main_num_of_seconds     
-        self._seconds_since_interrupt_started = 0 
-        self._interrupt_timer_start_reference = time.monotonic()
+        now = time.monotonic_ns()
+        self._timers.update(now)
+        self._fire_rules()
+        self._log(event_log.EVENT_INTERRUPT, self._timers.get_tenths(_TIMER_MAIN))
+        self._interrupt_started_at_seconds = self._timers.get_shown_seconds(_TIMER_MAIN)
+        if self._timers.is_running(_TIMER_MAIN):
+            self._timers.stop(_TIMER_MAIN, now)
+            self._main_paused = True
+        self._timers.start(_TIMER_INTERRUPT, now)
         self.advance_number_of_interruptions()
+        self._interrupt_rules.arm()
+        self._show_interrupt_color()
 
     def stop_interrupt_timer(self):
-        self._interrupt_timer_running = "no"
+        now = time.monotonic_ns()
+        if self._timers.is_running(_TIMER_INTERRUPT):
+            self._log(event_log.EVENT_CONTINUE, self._timers.get_elapsed_tenths(_TIMER_INTERRUPT, now))
+        self._timers.stop(_TIMER_INTERRUPT, now)
+        self._interrupt_rules.disarm()
+        if self._main_paused:
+            self._main_paused = False
+            self._timers.resume(_TIMER_MAIN, now)
+            self._main_rule_shown = -1
 
     def reset_number_of_interruptions(self): 
         self._number_of_interruption_events = 0
@@ -169,147 +324,235 @@ class Skating_Info:
 
 
     def reset_main_time(self):
+        self._timers.reset(_TIMER_MAIN)
+        self._main_paused = False
         if self._mode == "program":
-            self._current_main_num_of_seconds = 0
-            self._main_timer_direction = "up"
-            self._main_timer_running = "no"
+            self._timers.set_direction(_TIMER_MAIN, False)
         else:
-            self._current_main_num_of_seconds = self._warmupduration_sec
-            self._main_timer_direction = "down"
-            self._main_timer_running = "no"
-        self._display_main._watch_display_box.color = myconstants.BLUE
-        self._display_main.set_text_tdb(self._format_timestring(self._current_main_num_of_seconds))
+            self._timers.set_direction(_TIMER_MAIN, True, self._warmupduration_sec)
+        self._main_rules.disarm()
+        self._main_rule_shown = -1
+        self._display_main.set_color_tdb(myconstants.BLUE)
+        self._show_main_time()
         self._display_main._set_half2_textbox("")
-        self._display_main.set_text_timewarn("")
 
     def start_main_timer(self):
-        self._main_timer_running  = "yes"
-        self._main_timer_start_reference = time.monotonic()
+        now = time.monotonic_ns()
+        self._timers.start(_TIMER_MAIN, now)
+        self._display_main.set_text_timewarn("")
+        self._main_paused = False
+        self._splits.clear()
+        self._compile_main_rules()
+        self._main_rules.arm()
+
+        since_call = -1
+        if self._skater_called and self._timers.is_running(_TIMER_CALL):
+            since_call = self._timers.get_elapsed_tenths(_TIMER_CALL, now)
+        else:
+            self._begin_skater()
+        self._skater_called = False
+        self._log(event_log.EVENT_START, since_call)
+        if self._mode == "warmup":
+            self._log(event_log.EVENT_DURATION, self._warmupduration_sec)
+        elif self._max_or_window == "M":
+            self._log(event_log.EVENT_DURATION, -self._programduration_sec)
+        else:
+            self._log(event_log.EVENT_DURATION, self._programduration_sec)
 
     def stop_main_timer(self):
-        self._main_timer_running = "no"
+        # take the final reading at the moment of the press, not at the last redraw
+        now = time.monotonic_ns()
+        self._timers.update(now)
+        self._fire_rules()
+        self._timers.stop(_TIMER_MAIN, now)
+        self._main_paused = False
+        self._main_rules.disarm()
+        self._log(event_log.EVENT_STOP, self._timers.get_tenths(_TIMER_MAIN))
+
+    # True from start to stop, including while an interruption has the main timer paused
+    def is_main_timer_running(self):
+        return self._timers.is_running(_TIMER_MAIN) or self._main_paused
+
+    # records the main timer's elapsed time as the next split (program mode);  the mode display shows
+    # it until the program phase changes
+    def split_main_timer(self):
+        if not self._timers.is_running(_TIMER_MAIN):
+            return
+        tenths = self._timers.get_elapsed_tenths(_TIMER_MAIN)
+        if self._splits.add(tenths):
+            self._log(event_log.EVENT_SPLIT, tenths)
+            self._display_main.set_text_mdb("Split " + str(self._splits.get_count()) + " @ " + format_mss_tenths(tenths))
+        else:
+            self._display_main.set_text_mdb("Splits Full")
 
+    # brings every timer in the bank up to date (one clock reading) and fires the rules they crossed
     def update_times(self):
-        timenow = time.monotonic()
-        if self._main_timer_running == "yes":
-            if self._main_timer_direction == "up":
-                self._current_main_num_of_seconds = int(timenow - self._main_timer_start_reference)
-            else:
-                self._current_main_num_of_seconds = self._warmupduration_sec - int(timenow - self._main_timer_start_reference)
-
-        if self._skater_call_timer_running == "yes":
-            self._seconds_since_skater_call = int(timenow - self._skater_call_timer_start_reference)
-
-        if self._skater_separation_timer_running == "yes":
-            self._seconds_since_last_skater_ended = int(timenow - self._skater_separation_timer_start_reference)
-
-        if self._interrupt_timer_running == "yes":
-            self._seconds_since_interrupt_started = int(timenow - self._interrupt_timer_start_reference)
+        self._timers.update()
+        self._fire_rules()
+
+    def _fire_rules(self):
+        timers = self._timers
+        if timers.is_running(_TIMER_MAIN):
+            self._main_rules.update(timers.get_seconds(_TIMER_MAIN))
+        if timers.is_running(_TIMER_CALL):
+            self._call_rules.update(timers.get_seconds(_TIMER_CALL))
+        if timers.is_running(_TIMER_INTERRUPT):
+            self._interrupt_rules.update(timers.get_seconds(_TIMER_INTERRUPT))
+
+    # first time after timenow at which (time - reference) reaches a whole multiple of step (all in ns)
+    def _next_boundary(self, reference, timenow, step):
+        return reference + ((((timenow - reference) // step) + 1) * step)
+
+    # absolute time.monotonic_ns() at which the next shown digit of a running timer changes, so the
+    # watch redraw can be scheduled right on that boundary;  None if no timer on the screen is running
+    def get_next_redraw_time(self):
+        timenow = time.monotonic_ns()
+        timers = self._timers
+        next_time = None
+        if timers.is_running(_TIMER_MAIN):
+            step = NS_PER_SECOND
+            if self._show_tenths:
+                step = NS_PER_TENTH
+            next_time = self._next_boundary(timers.get_reference(_TIMER_MAIN), timenow, step)
+        # the other timers are on the notes lines in program mode, and any of them may be on a timer page
+        if self._mode == "program" or self._notes_page > 0:
+            for index in range(1, timers.get_count()):
+                if timers.is_running(index):
+                    boundary = self._next_boundary(timers.get_reference(index), timenow, NS_PER_SECOND)
+                    if next_time is None or boundary < next_time:
+                        next_time = boundary
+        return next_time
 
     def display_time(self):
         self.update_times()
-        self._display_main.set_text_tdb(self._format_timestring(self._current_main_num_of_seconds))  
-        if self._mode == "program" and self._main_timer_running == "yes":
-            if self._max_or_window == "M":
-                # for MAX programs - initially green; yellow at dur-5, red at dur
-                if self._current_main_num_of_seconds > self._programduration_sec:
-                    self._display_main._watch_display_box.color = myconstants.RED
-                    self._display_main.set_text_timewarn("Too Long")
-                elif self._current_main_num_of_seconds >= self._programduration_sec - 5:
-                    self._display_main._watch_display_box.color = myconstants.YELLOW
-                    self._display_main.set_text_timewarn("The end is near")
-                else:
-                    self._display_main._watch_display_box.color = myconstants.GREEN
-                    self._display_main.set_text_timewarn("")
-            else:
-                # for +/- programs - initially red (short-not scored); orange at progdur-30 (short-deduct);
-                # green at dur-10, yellow at dur+5, red at dur+10
-                if self._current_main_num_of_seconds > self._programduration_sec + 10:
-                    self._display_main._watch_display_box.color = myconstants.RED
-                    self._display_main.set_text_timewarn("Too Long")
-                elif self._current_main_num_of_seconds >= self._programduration_sec + 5:
-                    self._display_main._watch_display_box.color = myconstants.YELLOW
-                    self._display_main.set_text_timewarn("The end is near")
-                elif self._current_main_num_of_seconds >= self._programduration_sec - 10:
-                    self._display_main._watch_display_box.color = myconstants.GREEN
-                    self._display_main.set_text_timewarn("")
-                elif self._current_main_num_of_seconds >= self._programduration_sec - 30:
-                    self._display_main._watch_display_box.color = myconstants.ORANGE
-                    self._display_main.set_text_timewarn("Short-Deduct")
-                elif self._current_main_num_of_seconds >= 1:
-                    self._display_main._watch_display_box.color = myconstants.RED
-                    self._display_main.set_text_timewarn("Too Short-No Score")
-                else:
-                    self._display_main.set_text_timewarn("")
-
-            if self._current_main_num_of_seconds > (self._programduration_sec / 2):
+        self._show_main_time()
+        if self._timers.is_running(_TIMER_MAIN):
+            row = self._main_rules.find(self._timers.get_seconds(_TIMER_MAIN))
+            if row != self._main_rule_shown and row >= 0:
+                self._main_rule_shown = row
+                color = self._main_rules.get_color(row)
+                if color is not None:
+                    self._display_main.set_color_tdb(color)
+                self._display_main.set_text_timewarn(self._main_rules.get_text(row))
+
+            if self._mode == "program" and self._timers.get_seconds(_TIMER_MAIN) > (self._programduration_sec / 2):
                 self._display_main._set_half2_textbox("2nd Half")
+        else:
+            self._display_main.set_color_tdb(myconstants.BLUE)
+      
 
-        if self._mode == "warmup" and self._main_timer_running == "yes":
-            # for warmups - initially green; yellow at 60s, orange at 5, red at 0 and below
-            if self._current_main_num_of_seconds > 60:
-                self._display_main._watch_display_box.color = myconstants.GREEN
-            elif self._current_main_num_of_seconds >=  5:
-                self._display_main._watch_display_box.color = myconstants.YELLOW
-            elif self._current_main_num_of_seconds >= 0:
-                self._display_main._watch_display_box.color = myconstants.ORANGE
-            else:
-                self._display_main._watch_display_box.color = myconstants.RED
-
-            if (self._current_main_num_of_seconds < 60) and (self._current_main_num_of_seconds > 0):
-                self._display_main.set_text_timewarn("Final Minute")
-            elif (self._current_main_num_of_seconds < 0):
-                self._display_main.set_text_timewarn("Warmup Over")
-            else:
-                self._display_main.set_text_timewarn("")
+    # the notes lines are only rebuilt when a value in them changed, so a redraw that changes nothing
+    # there does not build (and throw away) any strings
+    def _forget_notes(self):
+        for i in range(len(self._notes_shown)):
+            self._notes_shown[i] = None
 
-        if self._main_timer_running == "no":
-            self._display_main._watch_display_box.color = myconstants.BLUE
-      
+    def _notes_changed(self, index, value):
+        if self._notes_shown[index] == value:
+            return False
+        self._notes_shown[index] = value
+        return True
+
+    def _count_timer_pages(self):
+        return (self._timers.get_count() + _TIMERS_PER_PAGE - 1) // _TIMERS_PER_PAGE
+
+    # tapping the notes panel shows the next page of the timer bank (then of the splits, if there are any),
+    # and after the last page the notes again
+    def show_next_timer_page(self):
+        pages = self._count_timer_pages() + ((self._splits.get_count() + _SPLITS_PER_PAGE - 1) // _SPLITS_PER_PAGE)
+        self._notes_page = (self._notes_page + 1) % (pages + 1)
+        if self._notes_page > 0:
+            self._display_main.set_color_wnb1(myconstants.WHITE)
+            self._display_main.set_color_wnb3(myconstants.WHITE)
+        self.display_notes_panel(True)
+        if self._notes_page == 0:
+            self._show_call_color()
+            self._show_interrupt_color()
+
+    # one line per timer:  "Call (run)  1:05";  count-down timers show the time left
+    def _display_timer_page(self):
+        timers = self._timers
+        first = (self._notes_page - 1) * _TIMERS_PER_PAGE
+        for slot in range(_TIMERS_PER_PAGE):
+            index = first + slot
+            if index >= timers.get_count():
+                if self._notes_changed(slot, -1):
+                    self._set_notes_line(slot, "")
+                continue
+            seconds = timers.get_shown_seconds(index)
+            running = timers.is_running(index)
+            # one int for both, so checking for a change does not build a tuple every redraw
+            if self._notes_changed(slot, (seconds * 2) + (1 if running else 0)):
+                if running:
+                    self._set_notes_line(slot, self._timer_running_names[index], format_mss(seconds))
+                else:
+                    self._set_notes_line(slot, self._timer_names[index], format_mss(seconds))
+
+    # one line per split:  "Split 2  1:05.3  +0:31.0" (elapsed, and the lap since the split before)
+    def _display_split_page(self):
+        splits = self._splits
+        first = (self._notes_page - 1 - self._count_timer_pages()) * _SPLITS_PER_PAGE
+        for slot in range(_SPLITS_PER_PAGE):
+            index = first + slot
+            if index >= splits.get_count():
+                if self._notes_changed(slot, -1):
+                    self._set_notes_line(slot, "")
+                continue
+            if self._notes_changed(slot, splits.get_split(index)):
+                message = "Split " + str(index + 1) + "  " + format_mss_tenths(splits.get_split(index))
+                message = message + "  +" + format_mss_tenths(splits.get_lap(index))
+                self._set_notes_line(slot, message)
+
+    def _set_notes_line(self, slot, text, value=""):
+        if slot == 0:
+            self._display_main.set_text_wnb1(text, value)
+        elif slot == 1:
+            self._display_main.set_text_wnb2(text, value)
+        else:
+            self._display_main.set_text_wnb3(text, value)
 
     # note if called when changing from warmup to program modes must write text even tho timers not running
     def display_notes_panel(self, modeChange=False):
         self.update_times()
+        if modeChange:
+            self._forget_notes()
+        if self._notes_page > self._count_timer_pages():
+            self._display_split_page()
+            return
+        if self._notes_page > 0:
+            self._display_timer_page()
+            return
+        timers = self._timers
         if self._mode == "program":
-            if self._skater_call_timer_running == "yes" or modeChange:
-                if (self._seconds_since_skater_call >= 0):
-                    self._display_main.set_text_wnb1("Since Skater Called: " + self._format_timestring(self._seconds_since_skater_call))
+            seconds = timers.get_seconds(_TIMER_CALL)
+            if (timers.is_running(_TIMER_CALL) or modeChange) and self._notes_changed(_NOTES_CALL, seconds):
+                if (seconds >= 0):
+                    self._display_main.set_text_wnb1("Since Skater Called: ", format_mss(seconds))
                 else:
                     self._display_main.set_text_wnb1("Since Skater Called: --")
 
-                if self._seconds_since_skater_call >= 30:
-                    self._display_main._watch_notes1_box.color = myconstants.RED
-                else:
-                    self._display_main._watch_notes1_box.color = myconstants.WHITE
-
-            if self._skater_separation_timer_running == "yes" or modeChange:
-                if self._seconds_since_last_skater_ended >= 0:
-                    self._display_main.set_text_wnb2("Since Last Skater End: " + self._format_timestring(self._seconds_since_last_skater_ended))
+            seconds = timers.get_seconds(_TIMER_SEPARATION)
+            if (timers.is_running(_TIMER_SEPARATION) or modeChange) and self._notes_changed(_NOTES_SEPARATION, seconds):
+                if seconds >= 0:
+                    self._display_main.set_text_wnb2("Since Last Skater End: ", format_mss(seconds))
                 else:
                     self._display_main.set_text_wnb2("Since Last Skater End: --")
 
-            beep_at_seconds = self._programduration_sec
-            if self._max_or_window == "W": 
-                beep_at_seconds = self._programduration_sec + 10
-            if self._current_main_num_of_seconds == beep_at_seconds:
-                self._beep_manager.set_beep_counter(2)
-
             if self.get_number_of_interruptions() == 0:
                 self._display_main.set_text_wnb3("No Interruptions")
-                pass
+                self._notes_shown[_NOTES_INTERRUPT_AT] = None
+                self._notes_shown[_NOTES_INTERRUPT_DUR] = None
             else:
-                message = "Interrupt @ " + self._format_timestring(self._interrupt_started_at_seconds)
-                message = message + "   Dur: " + str(self._seconds_since_interrupt_started) + "s"
-                self._display_main.set_text_wnb3(message)
-
-                if self._seconds_since_interrupt_started > 40:
-                    self._display_main._watch_notes3_box.color = myconstants.RED
-                elif self._seconds_since_interrupt_started > 10:
-                    self._display_main._watch_notes3_box.color = myconstants.ORANGE
-                else:
-                    self._display_main._watch_notes3_box.color = myconstants.WHITE
+                # the "Interrupt @ m:ss   Dur: " part is only built once per interruption
+                if self._notes_changed(_NOTES_INTERRUPT_AT, self._interrupt_started_at_seconds):
+                    self._interrupt_text = "Interrupt @ " + format_mss(self._interrupt_started_at_seconds) + "   Dur: "
+                    self._notes_shown[_NOTES_INTERRUPT_DUR] = None
+                seconds = timers.get_seconds(_TIMER_INTERRUPT)
+                if self._notes_changed(_NOTES_INTERRUPT_DUR, seconds):
+                    self._display_main.set_text_wnb3(self._interrupt_text, format_mss(seconds))
 
         if self._mode == "warmup":
+            self._forget_notes()      # these lines are showing other text now
             if self._beep_manager.is_noisy_mode():
                 self._display_main.set_text_wnb1("(makes beeps on button-press)")
                 self._display_main.set_text_wnb2("Click SILENT to eliminate")
@@ -318,37 +561,54 @@ class Skating_Info:
                 self._display_main.set_text_wnb2("Click NOISY to restore")
             self._display_main.set_text_wnb3("")
 
-            if self._current_main_num_of_seconds == 0 or self._current_main_num_of_seconds == 60:
-                self._beep_manager.set_beep_counter(2)
-
     def display_dur_info(self):
         if self._mode == "program":
             self._display_main.set_text_dur1("DUR")
-            self._display_main.set_text_dur2(self._format_timestring(self._programduration_sec))
+            self._display_main.set_text_dur2(format_mss(self._programduration_sec))
             if self._max_or_window == "M":
                 self._display_main.set_text_dur3("MAX")
             else:
                 self._display_main.set_text_dur3("+ / -")
         else:
             self._display_main.set_text_dur1("DUR")
-            self._display_main.set_text_dur2(self._format_timestring(self._warmupduration_sec))
+            self._display_main.set_text_dur2(format_mss(self._warmupduration_sec))
             self._display_main.set_text_dur3("")
 
+    # the time warning line shows the selected category while the main timer is idle in program mode;
+    # once a program has been timed it holds the verdict instead, until Start or a new selection
+    def show_category(self):
+        if self._mode == "program" and not self.is_main_timer_running():
+            self._display_main.set_text_timewarn(self._catalog.get_category_name(self._cur_duration_index))
+
     def cycle_to_next_available_duration(self):        
         if self.is_mode_warmup():
-            oldDur = self._warmupduration_sec
-            oldCount = self._current_main_num_of_seconds
-            if oldDur == 180:
+            # the count-down keeps its elapsed time, so the time left moves with the new length
+            if self._warmupduration_sec <= 180:
                 self._warmupduration_sec = 360
-                self._current_main_num_of_seconds = self._warmupduration_sec - (oldDur - oldCount)
             else:
-                self._warmupduration_sec = oldDur - 60
-                self._current_main_num_of_seconds = oldCount - 60
+                self._warmupduration_sec = self._warmupduration_sec - 60
+            self._timers.set_direction(_TIMER_MAIN, True, self._warmupduration_sec)
+        else:
+            self._select_duration(self._catalog.next_index(self._cur_duration_index))
+        # a duration change while the timer runs moves its rules along with it
+        self._compile_main_rules()
+
+    # program mode only: skip to the first duration of the next category
+    def jump_to_next_category(self):
+        if self.is_mode_program():
+            self._select_duration(self._catalog.next_category_index(self._cur_duration_index))
+            self._compile_main_rules()
+
+    def _select_duration(self, index):
+        self._cur_duration_index = index
+        self._programduration_sec = self._catalog.get_seconds(index)
+        if self._catalog.is_max(index):
+            self._max_or_window = "M"
         else:
-            oldIndex = self._cur_duration_index
-            newIndex = oldIndex + 1
-            if newIndex >= len(self._programdurations):
-                newIndex = 0
-            self._cur_duration_index = newIndex
-            self._programduration_sec = self._programdurations[self._cur_duration_index]
-            self._max_or_window = self._maxorwindow_values[self._cur_duration_index]
\ No newline at end of file
+            self._max_or_window = "W"
+        self._near_sec = self._catalog.get_near(index)
+        self._window_sec = self._catalog.get_window(index)
+        self._short_sec = self._catalog.get_short(index)
+        # the event's warmup length (if it has one) is used for the next warmup
+        if self._catalog.get_warmup(index) > 0 and not (self._mode == "warmup" and self._timers.is_running(_TIMER_MAIN)):
+            self._warmupduration_sec = self._catalog.get_warmup(index)
\ No newline at end of file
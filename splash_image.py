@@ -0,0 +1,144 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  splash_image.py shows the boot splash from a palette-indexed, run-length compressed file
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the 24 bit .bmp splash is 230KB, all of which OnDiskBitmap pulls off flash (a pixel at a time) for the
+# first frame.  tools/make_splash.py reduces it to a few colors and run-length codes it, and load() reads
+# it a chunk of rows at a time into a displayio.Bitmap that is already on the screen, refreshing after each
+# chunk so the picture builds up from the top while the rest is still being read.
+#
+# file layout (all little endian):
+#   header:  b"SPL1", width, height, color count, rows per chunk, largest chunk in bytes (5 x H)
+#   palette: color count x 3 bytes (r, g, b);  color 0 is the most common one (the background)
+#   chunks:  length (H), then the rows' packets:  a byte n < 128 is a run of n + 1 pixels of the color in
+#            the next byte;  n >= 128 is followed by n - 127 single pixels.  packets never cross a row end.
+#
+# the rows of each chunk are decoded into a buffer with slice copies (a run is copied from a row of its
+# color), so python never touches single pixels;  with bitmaptools (CircuitPython 7 and later) the buffer
+# then goes into the Bitmap in one arrayblit call, otherwise a pixel at a time (color 0 pixels are
+# skipped, as a new Bitmap is all color 0).
+#
+# a file that is cut short or does not decode to exactly width x height pixels raises ValueError, with
+# the part shown so far taken back off the screen.
+#
+"""
+import struct
+
+try:
+    import bitmaptools
+except ImportError:
+    bitmaptools = None
+
+SPLASH_MAGIC = b"SPL1"
+HEADER_FORMAT = "<4sHHHHH"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+LITERAL_BASE = 128
+
+# decodes one chunk's packets into rows;  runs[value] is a row of that color.  returns the pixel count
+def _decode_chunk(data, length, rows, runs):
+    out = 0
+    pos = 0
+    while pos < length:
+        n = data[pos]
+        pos += 1
+        if n < LITERAL_BASE:
+            count = n + 1
+            if out + count > len(rows) or data[pos] >= len(runs):
+                raise ValueError("bad splash chunk")
+            rows[out:out + count] = runs[data[pos]][0:count]
+            pos += 1
+        else:
+            count = n - LITERAL_BASE + 1
+            if out + count > len(rows) or pos + count > length:
+                raise ValueError("bad splash chunk")
+            rows[out:out + count] = data[pos:pos + count]
+            pos += count
+        out += count
+    return out
+
+def _show_rows(bitmap, rows, count, width, y):
+    if bitmaptools is not None:
+        bitmaptools.arrayblit(bitmap, memoryview(rows)[0:count], 0, y, width, y + (count // width))
+        return
+    x = 0
+    for i in range(count):
+        value = rows[i]
+        if value != 0:
+            bitmap[x, y] = value
+        x += 1
+        if x >= width:
+            x = 0
+            y += 1
+
+# shows the splash in group (which should already be on the display) and returns its TileGrid;  refresh
+# (ie Refresh_Manager.refresh_now) is called after each chunk of rows to put them on the screen
+def load(filename, group, refresh=None):
+    import displayio
+    with open(filename, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError("not a splash file")
+        magic, width, height, colors, chunk_rows, max_chunk = struct.unpack(HEADER_FORMAT, header)
+        if magic != SPLASH_MAGIC or width == 0 or colors == 0 or chunk_rows == 0:
+            raise ValueError("not a splash file")
+        rgb = f.read(colors * 3)
+        if len(rgb) != colors * 3:
+            raise ValueError("splash file cut short")
+        palette = displayio.Palette(colors)
+        for i in range(colors):
+            palette[i] = (rgb[i * 3] << 16) | (rgb[i * 3 + 1] << 8) | rgb[i * 3 + 2]
+        bitmap = displayio.Bitmap(width, height, colors)
+        tile_grid = displayio.TileGrid(bitmap, pixel_shader=palette)
+        group.append(tile_grid)
+        try:
+            if refresh is not None:
+                refresh()               # the background color right away
+            runs = [bytes((value,)) * width for value in range(colors)]
+            rows = bytearray(chunk_rows * width)
+            buffer = bytearray(max_chunk)
+            data = memoryview(buffer)
+            length_bytes = bytearray(2)
+            y = 0
+            while y < height:
+                if f.readinto(length_bytes) != 2:
+                    raise ValueError("splash file cut short")
+                length = length_bytes[0] | (length_bytes[1] << 8)
+                if length > max_chunk or f.readinto(data[0:length]) != length:
+                    raise ValueError("splash file cut short")
+                count = _decode_chunk(data, length, rows, runs)
+                if count == 0 or count % width != 0 or y + (count // width) > height:
+                    raise ValueError("bad splash chunk")
+                _show_rows(bitmap, rows, count, width, y)
+                y += count // width
+                if refresh is not None:
+                    refresh()
+        except (OSError, ValueError, IndexError):
+            group.remove(tile_grid)
+            raise
+    return tile_grid
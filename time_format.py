@@ -0,0 +1,90 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  time_format.py formats m:ss and two digit fields from lookup tables instead of building strings
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the main timer, the notes panel and the duration box show the same few hundred m:ss values over and
+# over, so each one is built the first time it is needed and then handed back from a table (strings
+# are immutable, so every caller can share it).  the table only covers what the app can show,
+# -10:00 to +15:00, so it never holds more than 1501 strings;  anything outside is built each time
+#
+"""
+
+MIN_SECONDS = -600      # -10:00 (well past the end of a warmup)
+MAX_SECONDS = 900       # 15:00 (well past the longest program window)
+
+# "00" .. "59" for seconds, minutes of the hour and the clock setting screen
+_TWO_DIGITS = tuple([str(n // 10) + str(n % 10) for n in range(60)])
+
+_TENTHS_SUFFIX = (".0", ".1", ".2", ".3", ".4", ".5", ".6", ".7", ".8", ".9")
+
+_mss_table = [None] * (MAX_SECONDS - MIN_SECONDS + 1)
+
+def two_digits(value):
+    if 0 <= value < 60:
+        return _TWO_DIGITS[value]
+    return str(value)
+
+def _build_mss(full_seconds):
+    full_seconds_abs = abs(full_seconds)
+    sign = ""
+    if full_seconds < 0:
+        sign = "-"
+    return sign + str(full_seconds_abs // 60) + ":" + two_digits(full_seconds_abs % 60)
+
+# whole seconds (an int) -> "m:ss", "-m:ss" when negative
+def format_mss(full_seconds):
+    if MIN_SECONDS <= full_seconds <= MAX_SECONDS:
+        index = full_seconds - MIN_SECONDS
+        text = _mss_table[index]
+        if text is None:
+            text = _build_mss(full_seconds)
+            _mss_table[index] = text
+        return text
+    return _build_mss(full_seconds)
+
+# tenths of a second (an int, not negative) -> "m:ss.t";  one concatenation, the parts come from tables
+def format_mss_tenths(tenths):
+    return format_mss(tenths // 10) + _TENTHS_SUFFIX[tenths % 10]
+
+# tenths of a second (an int, not negative) -> just its ".t", for showing after format_mss(tenths // 10)
+def tenths_suffix(tenths):
+    return _TENTHS_SUFFIX[tenths % 10]
+
+# builds every m:ss string of the table now (at boot), so showing a time never allocates one later;
+# costs the heap of all 1501 strings up front (see myconstants.ALLOCATION_FREE)
+def prefill():
+    for full_seconds in range(MIN_SECONDS, MAX_SECONDS + 1):
+        format_mss(full_seconds)
+
+# how many m:ss strings have been built into the table so far
+def get_table_fill():
+    count = 0
+    for text in _mss_table:
+        if text is not None:
+            count += 1
+    return count
@@ -0,0 +1,202 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  timer_bank.py keeps any number of stopwatch timers in a few flat arrays
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# each timer is an index into parallel arrays:  when its current run started (time.monotonic_ns()), how
+# long it ran before that (so it can be paused and resumed), its direction (a count-down timer shows its
+# limit minus the elapsed time) and its state flags.  update() works out the elapsed tenths of every
+# running timer in one pass from a single clock reading, so all timers on the screen agree with each other.
+#
+# elapsed time always comes from the clock, never from adding up redraw intervals, so a timer does not
+# lose time when the processor gets busy.  all times are integer nanoseconds:  a float (30 bits on
+# CircuitPython) would drop the sub-second part of a pause after the board has been up a while, but an int
+# keeps every nanosecond however often the timer is paused and resumed.  integer arithmetic is also exact,
+# so a redraw scheduled for a boundary (see get_reference) sees exactly that boundary's digits.
+#
+# Split_Buffer keeps a timer's lap splits in a preallocated array, so taking a split allocates nothing.
+#
+"""
+import time
+import array
+
+NS_PER_TENTH = 100000000
+NS_PER_SECOND = 1000000000
+
+# flag bits
+RUNNING = 0x01
+DOWN = 0x02            # counts down from its limit
+
+class Timer_Bank:
+    def __init__(self):
+        self._names = []
+        self._start = []                    # time.monotonic_ns() when the current run started
+        self._accumulated = []              # nanoseconds run before the current run
+        self._limit = array.array("l")      # seconds a count-down timer starts from
+        self._tenths = array.array("l")     # elapsed tenths as of the last update() (frozen while stopped)
+        self._flags = bytearray()
+
+    # returns the new timer's index
+    def add(self, name, down=False, limit=0):
+        self._names.append(name)
+        self._start.append(0)
+        self._accumulated.append(0)
+        self._limit.append(limit)
+        self._tenths.append(0)
+        self._flags.append(DOWN if down else 0)
+        return len(self._names) - 1
+
+    def get_count(self):
+        return len(self._names)
+
+    def get_name(self, index):
+        return self._names[index]
+
+    def find(self, name):
+        return self._names.index(name)
+
+    # ---------------- running ----------------
+    def start(self, index, now_ns=None):
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self._start[index] = now_ns
+        self._accumulated[index] = 0
+        self._tenths[index] = 0
+        self._flags[index] |= RUNNING
+
+    # carries on from where the timer was stopped (paused)
+    def resume(self, index, now_ns=None):
+        if self._flags[index] & RUNNING:
+            return
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self._start[index] = now_ns
+        self._flags[index] |= RUNNING
+
+    # freezes (pauses) the timer at the moment of the call
+    def stop(self, index, now_ns=None):
+        if not (self._flags[index] & RUNNING):
+            return
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self._accumulated[index] += now_ns - self._start[index]
+        self._tenths[index] = self._accumulated[index] // NS_PER_TENTH
+        self._flags[index] &= ~RUNNING
+
+    def reset(self, index):
+        self._accumulated[index] = 0
+        self._tenths[index] = 0
+        self._flags[index] &= ~RUNNING
+
+    def is_running(self, index):
+        return (self._flags[index] & RUNNING) != 0
+
+    def set_direction(self, index, down, limit=0):
+        if down:
+            self._flags[index] |= DOWN
+        else:
+            self._flags[index] &= ~DOWN
+        self._limit[index] = limit
+
+    def is_down(self, index):
+        return (self._flags[index] & DOWN) != 0
+
+    def get_limit(self, index):
+        return self._limit[index]
+
+    # ---------------- reading ----------------
+    # one clock reading for all running timers
+    def update(self, now_ns=None):
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        flags = self._flags
+        for i in range(len(flags)):
+            if flags[i] & RUNNING:
+                self._tenths[i] = (self._accumulated[i] + now_ns - self._start[i]) // NS_PER_TENTH
+
+    # as of the last update()
+    def get_tenths(self, index):
+        return self._tenths[index]
+
+    def get_seconds(self, index):
+        return self._tenths[index] // 10
+
+    # seconds as shown:  elapsed for a count-up timer, limit - elapsed (may go negative) counting down
+    def get_shown_seconds(self, index):
+        if self._flags[index] & DOWN:
+            return self._limit[index] - (self._tenths[index] // 10)
+        return self._tenths[index] // 10
+
+    # elapsed tenths right now (not as of the last update)
+    def get_elapsed_tenths(self, index, now_ns=None):
+        elapsed = self._accumulated[index]
+        if self._flags[index] & RUNNING:
+            if now_ns is None:
+                now_ns = time.monotonic_ns()
+            elapsed += now_ns - self._start[index]
+        return elapsed // NS_PER_TENTH
+
+    # the time.monotonic_ns() at which a running timer's elapsed time was (or would have been) zero;  its
+    # shown digits change on whole seconds (and tenths) after this
+    def get_reference(self, index):
+        return self._start[index] - self._accumulated[index]
+
+class Split_Buffer:
+    def __init__(self, capacity):
+        self._splits = array.array("l", [0] * capacity)    # elapsed tenths at each split
+        self._count = 0
+
+    def clear(self):
+        self._count = 0
+
+    # returns False (and keeps nothing) once the buffer is full
+    def add(self, tenths):
+        if self._count >= len(self._splits):
+            return False
+        self._splits[self._count] = tenths
+        self._count += 1
+        return True
+
+    def get_count(self):
+        return self._count
+
+    def get_capacity(self):
+        return len(self._splits)
+
+    def is_full(self):
+        return self._count >= len(self._splits)
+
+    # elapsed tenths at split index
+    def get_split(self, index):
+        return self._splits[index]
+
+    # tenths since the split before (or since the start for the first one)
+    def get_lap(self, index):
+        if index == 0:
+            return self._splits[0]
+        return self._splits[index] - self._splits[index - 1]
@@ -0,0 +1,118 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  timing_rules.py keeps the color / warning / alert breakpoints of a timer as a sorted table
+#
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# the rules for a timer (for the main timer: the selected duration's MAX or +/- window rules, or the
+# warmup rules) are compiled once, when the duration or mode is chosen, into rows sorted by the elapsed
+# second they start at.  each row says what color and warning text the timer shows from that second on,
+# and may carry an action (ie a beep) to run when the timer reaches it.  a redraw is then one binary
+# search for the row the current second falls in, and the start of the following row is the next time
+# anything changes, which the scheduler can wait for.
+#
+# rows with equal starts keep the order they were added in, so when two rows start on the same second
+# the one added last is the one shown.  a color of None leaves the color as it was.
+#
+"""
+
+class Rule_Table:
+    def __init__(self):
+        self._starts = []       # elapsed second each row starts at, ascending
+        self._colors = []
+        self._texts = []
+        self._actions = []      # called with no arguments when the timer reaches the row, or None
+        self._last_elapsed = None   # elapsed seconds at the last update(), None when not armed
+
+    # empties the table;  whether it is armed (and how far it got) is kept, so the rules of a running
+    # timer can be recompiled without firing or losing its actions
+    def clear(self):
+        self._starts = []
+        self._colors = []
+        self._texts = []
+        self._actions = []
+
+    def add(self, start, color, text, action=None):
+        index = self._after(start)
+        self._starts.insert(index, start)
+        self._colors.insert(index, color)
+        self._texts.insert(index, text)
+        self._actions.insert(index, action)
+
+    # index of the first row that starts after elapsed (len when there is none)
+    def _after(self, elapsed):
+        low = 0
+        high = len(self._starts)
+        while low < high:
+            middle = (low + high) // 2
+            if self._starts[middle] <= elapsed:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # row that applies at elapsed seconds, or -1 if elapsed is before the first row
+    def find(self, elapsed):
+        return self._after(elapsed) - 1
+
+    def get_color(self, row):
+        return self._colors[row]
+
+    def get_text(self, row):
+        return self._texts[row]
+
+    # elapsed second at which the row shown changes next, or None if it never does
+    def get_next_start(self, elapsed):
+        index = self._after(elapsed)
+        if index < len(self._starts):
+            return self._starts[index]
+        return None
+
+    # call when the timer (re)starts;  actions of rows starting at or before elapsed count as done
+    def arm(self, elapsed=0):
+        self._last_elapsed = elapsed
+
+    def disarm(self):
+        self._last_elapsed = None
+
+    def is_armed(self):
+        return self._last_elapsed is not None
+
+    # runs the action of every row reached since the last update, once each and in order, so two updates
+    # in the same second do not run one twice and an update that jumps over rows (the loop stalled) still
+    # runs all of them
+    def update(self, elapsed):
+        last = self._last_elapsed
+        if last is None or elapsed <= last:
+            return
+        self._last_elapsed = elapsed
+        index = self._after(last)
+        while index < len(self._starts) and self._starts[index] <= elapsed:
+            action = self._actions[index]
+            if action is not None:
+                action()
+            index += 1
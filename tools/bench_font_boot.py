@@ -0,0 +1,120 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/bench_font_boot.py (runs on the desktop) compares font load cost of .bdf vs glyph pack
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:  python tools/bench_font_boot.py
+#
+# runs the font-loading part of boot both ways (the .bdf path code.py used to take, and the
+# glyph packs) with an in-memory bitmap, checks that both give the same glyphs, and prints the
+# bytes read and time taken.  desktop times are much shorter than on the PyPortal, but the
+# ratio between the two paths is what matters.
+#
+"""
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+import font_pack
+from make_font_pack import read_bdf
+
+# same glyph set code.py preloads
+GLYPHS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-,.: "
+REPEAT = 5
+
+class Host_Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self._pixels = bytearray(width * height)
+
+    def __setitem__(self, index, value):
+        x, y = index
+        self._pixels[y * self.width + x] = value
+
+    def __getitem__(self, index):
+        x, y = index
+        return self._pixels[y * self.width + x]
+
+# rasterize like adafruit_bitmap_font's bdf loader does after it finds each glyph
+def load_bdf(filename, wanted):
+    _, glyphs = read_bdf(filename, wanted)
+    loaded = {}
+    for codepoint, (width, height, dx, dy, shift_x, shift_y, rows) in glyphs.items():
+        bitmap = Host_Bitmap(width, height, 2)
+        for y, row in enumerate(rows):
+            value = int.from_bytes(row, "big")
+            bits = len(row) * 8
+            for x in range(width):
+                if value & (1 << (bits - 1 - x)):
+                    bitmap[x, y] = 1
+        loaded[codepoint] = (bitmap, width, height, dx, dy, shift_x, shift_y)
+    return loaded
+
+def same_glyphs(bdf_glyphs, pack):
+    for codepoint, (bitmap, width, height, dx, dy, shift_x, shift_y) in bdf_glyphs.items():
+        glyph = pack.get_glyph(codepoint)
+        if glyph is None:
+            return False
+        if (glyph.width, glyph.height, glyph.dx, glyph.dy, glyph.shift_x, glyph.shift_y) != (width, height, dx, dy, shift_x, shift_y):
+            return False
+        if glyph.bitmap._pixels != bitmap._pixels:
+            return False
+    return True
+
+def time_it(function):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def main():
+    total_bdf = 0.0
+    total_pack = 0.0
+    for name, glyph_text in (("Arial-12", GLYPHS), ("Roboto-Bold-75", "0123456789-:. ")):
+        bdf_file = os.path.join(ROOT, "fonts", name + ".bdf")
+        pack_file = os.path.join(ROOT, "fonts", name + ".fpk")
+        wanted = set(ord(c) for c in glyph_text)
+        bdf_time, bdf_glyphs = time_it(lambda: load_bdf(bdf_file, wanted))
+        pack_time, pack = time_it(lambda: font_pack.load_font(pack_file, Host_Bitmap))
+        total_bdf += bdf_time
+        total_pack += pack_time
+        print("%-16s bdf: %8d bytes %8.2f ms    pack: %6d bytes %8.2f ms    identical: %s" % (
+            name, os.path.getsize(bdf_file), bdf_time * 1000, os.path.getsize(pack_file), pack_time * 1000,
+            same_glyphs(bdf_glyphs, pack)))
+    print("font load total   bdf: %.2f ms   pack: %.2f ms   (%.1fx faster)" % (total_bdf * 1000, total_pack * 1000, total_bdf / total_pack))
+
+if __name__ == "__main__":
+    main()
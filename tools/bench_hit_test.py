@@ -0,0 +1,115 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/bench_hit_test.py (runs on the desktop) compares per-touch cost of button lookup
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:  python tools/bench_hit_test.py
+#
+# lays out the watch and todset screen buttons the same way display_main.py and display_todset.py do,
+# then resolves a synthetic stream of touches (random points, about half of them on a button) with the
+# old scan-every-button loop and with hit_grid.Hit_Grid, checks they agree, and prints the cost per touch.
+#
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from hit_grid import Hit_Grid
+
+BUTTON_WIDTH = 72
+BUTTON_HEIGHT = 52
+BUTTON_MARGIN = 8
+TOUCHES = 200000
+
+class Fake_Button:
+    # same hit rule as adafruit_button.Button.contains
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def contains(self, point):
+        return (self.x <= point[0] <= self.x + self.width) and (self.y <= point[1] <= self.y + self.height)
+
+def grid_pos(row, col):
+    return (BUTTON_MARGIN * (row + 1) + BUTTON_WIDTH * row - 4, BUTTON_MARGIN * (col + 1) + BUTTON_HEIGHT * col - 4)
+
+def make_button(x, y, width=1, height=1):
+    return Fake_Button(x, y, BUTTON_WIDTH * width + BUTTON_MARGIN * (width - 1), BUTTON_HEIGHT * height + BUTTON_MARGIN * (height - 1))
+
+def watch_buttons():
+    layout = ((3, 0, 1, 1), (3, 1, 1, 2), (0, 3, 1, 1), (1, 3, 1, 1), (2, 3, 1, 1), (3, 3, 1, 1))
+    return [make_button(*grid_pos(row, col), width=w, height=h) for row, col, w, h in layout]
+
+def todset_buttons():
+    buttons = [make_button(*grid_pos(3, col)) for col in (1, 2, 3)]
+    buttons += [make_button(x, y) for x, y in ((28, 124), (28, 184), (142, 124), (142, 184))]
+    return buttons
+
+def scan_lookup(buttons, point):
+    btn_clicked = None
+    for _, b in enumerate(buttons):
+        if b.contains(point):
+            btn_clicked = b
+    return btn_clicked
+
+def main():
+    random.seed(1)
+    touches = [(random.randrange(320), random.randrange(240), 30000) for _ in range(TOUCHES)]
+    for name, buttons in (("watch", watch_buttons()), ("todset", todset_buttons())):
+        grid = Hit_Grid()
+        for b in buttons:
+            grid.add(b, b.x, b.y, b.width, b.height)
+
+        hits = 0
+        for point in touches:
+            expected = scan_lookup(buttons, point)
+            if grid.find(point) is not expected:
+                print("MISMATCH at " + str(point))
+                return 1
+            if expected is not None:
+                hits += 1
+
+        start = time.perf_counter()
+        for point in touches:
+            scan_lookup(buttons, point)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for point in touches:
+            grid.find(point)
+        grid_time = time.perf_counter() - start
+
+        print("%-7s %d buttons, %d touches (%d on a button):  scan %.2f us/touch   grid %.2f us/touch" % (
+            name, len(buttons), TOUCHES, hits, scan_time / TOUCHES * 1e6, grid_time / TOUCHES * 1e6))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/bench_lazy_screens.py (runs on the desktop) compares boot with the rarely used screens built up front or later
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/bench_lazy_screens.py
+#
+# boots the firmware in the simulator with myconstants.LAZY_SCREENS off (clock setting and diagnostics
+# screens built before the master loop) and on (built when first shown, or in idle time after boot), and
+# prints the boot-to-interactive time and the free heap once the loop is running, and again after the
+# deferred screens have been built.  the heap figures come from the simulator's tracemalloc-backed
+# gc.mem_free() and are CPython sizes, so only the differences mean anything.
+#
+"""
+import gc
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+LOOP_SECONDS = 2          # the master loop is running, the deferred screens are not built yet
+BUILT_SECONDS = 30        # ... and now they are
+
+# sets LAZY_SCREENS for the run, and has the simulated clock collect and read gc.mem_free() (into free,
+# as (uptime, bytes)) the first time it passes each of the given uptimes
+def prepare(lazy, uptimes, free):
+    def before_start(hw):
+        import myconstants
+        myconstants.LAZY_SCREENS = lazy
+        pending = list(uptimes)
+        def tick():
+            if pending and hw.clock.monotonic() >= pending[0]:
+                uptime = pending.pop(0)
+                gc.collect()
+                free.append((uptime, gc.mem_free()))
+        hw.clock.on_advance.append(tick)
+    return before_start
+
+def main():
+    print("(simulated PyPortal times;  heap in CPython bytes)")
+    for name, lazy in (("built at boot", False), ("lazy", True)):
+        free = []
+        result = sim.run_firmware(seconds=BUILT_SECONDS + 1, trace_heap=True,
+                                  before_start=prepare(lazy, (1.0 + LOOP_SECONDS, 1.0 + BUILT_SECONDS), free))
+        if result.error is not None:
+            raise result.error
+        print("%-14s boot to interactive %6.3f s   free heap at %2d s %9d   at %2d s %9d"
+              % (name, result.boot_to_interactive() - 1.0, LOOP_SECONDS, free[0][1], BUILT_SECONDS, free[1][1]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
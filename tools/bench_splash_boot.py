@@ -0,0 +1,88 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/bench_splash_boot.py (runs on the desktop) compares booting with the .bmp and the compressed splash
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:  python tools/bench_splash_boot.py
+#
+# boots the firmware in the simulator three times:  with the .spl file hidden so code.py falls back to
+# the 24 bit .bmp through OnDiskBitmap, with boot_splash_stopwatch.spl (see splash_image.py) decoded
+# a pixel at a time in python (CircuitPython before 7.0, no bitmaptools), and with it blitted by
+# bitmaptools.  it prints when the splash first showed, when it was complete, when the master loop
+# started, and how much flash was read.
+#
+# these are the simulator's estimated costs, not measurements:  it charges OnDiskBitmap for reading the
+# file but not for its slow pixel-at-a-time decode during the refresh (so the .bmp figures flatter the
+# old path), and it charges nothing for the python bytecode of the .spl decode loop itself.
+#
+"""
+import builtins
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+SECONDS = 3
+
+def without_bitmaptools(hw):
+    sys.modules["bitmaptools"] = None        # makes "import bitmaptools" raise ImportError
+
+def hide_compressed_splash(hw):
+    sim_open = builtins.open
+    def open_without_splash(file, mode="r", *args, **kwargs):
+        if isinstance(file, str) and file.endswith(".spl"):
+            raise OSError(2, "No such file/directory")
+        return sim_open(file, mode, *args, **kwargs)
+    builtins.open = open_without_splash
+
+def measure(name, before_start):
+    result = sim.run_firmware(seconds=SECONDS, before_start=before_start)
+    sys.modules.pop("bitmaptools", None)
+    if result.error is not None:
+        raise result.error
+    # splash frames have no labels on them;  the first frame with text is the watch screen
+    splash_frames = []
+    for frame in result.display.frames:
+        if frame[2]:
+            break
+        splash_frames.append(frame[0])
+    first = splash_frames[0] / 1e9 if splash_frames else None
+    complete = splash_frames[-1] / 1e9 if splash_frames else None
+    print("%-12s splash first %6.3f s  complete %6.3f s  interactive %6.3f s  refreshes %3d  flash read %7d bytes"
+          % (name, first - 1.0, complete - 1.0, result.boot_to_interactive() - 1.0, len(splash_frames), result.hw.flash_bytes_read))
+
+def main():
+    print("(times from power-up, simulated PyPortal costs)")
+    measure(".bmp", hide_compressed_splash)
+    measure(".spl python", without_bitmaptools)
+    measure(".spl blit", None)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/bench_time_format.py compares building m:ss strings every redraw with the time_format tables
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:  python tools/bench_time_format.py
+#
+# replays the m:ss strings a competition session asks for (every second of SKATERS programs, each
+# redraw formatting the main timer and the "since skater called" line) through the old
+# Skating_Info._format_timestring and through time_format.format_mss, and reads gc.mem_free() (the
+# simulator's tracemalloc-backed shim) before and after each.  CircuitPython does not free a string
+# until the next collection, so every result is kept in a list to hold on to it the same way;  the
+# temporaries the old code builds on the way are not counted, so its figure is a lower bound.
+#
+"""
+import gc
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator", "stubs"))
+import sim_hardware
+import time_format
+
+SKATERS = 24
+PROGRAM_SECONDS = 250
+
+# Skating_Info._format_timestring as it was before time_format.py
+def old_format_timestring(full_seconds):
+    full_seconds_abs = abs(full_seconds)
+    num_minutes = int(full_seconds_abs / 60)
+    num_seconds = full_seconds_abs - (num_minutes * 60)
+    sign = ""
+    if full_seconds < 0:
+        sign = "-"
+    leading_zero = ""
+    if num_seconds < 10:
+        leading_zero = "0"
+    return sign + str(num_minutes) + ":" + leading_zero + str(num_seconds)
+
+def session_values():
+    values = []
+    for skater in range(SKATERS):
+        for second in range(PROGRAM_SECONDS):
+            values.append(second)            # main timer
+            values.append(second + 45)       # since skater called
+    return values
+
+def measure(name, formatter, values):
+    kept = [None] * len(values)
+    gc.collect()
+    before = gc.mem_free()
+    start = time.perf_counter()
+    for i in range(len(values)):
+        kept[i] = formatter(values[i])
+    elapsed = time.perf_counter() - start
+    after = gc.mem_free()
+    distinct = len(set([id(text) for text in kept]))
+    print("%-8s %6d strings asked for:  %6d new string objects  %8d bytes taken from the heap  %.2f us/call" % (
+        name, len(values), distinct, before - after, elapsed / len(values) * 1e6))
+    return kept
+
+def main():
+    values = session_values()
+    for value in range(time_format.MIN_SECONDS, time_format.MAX_SECONDS + 1):
+        if time_format.format_mss(value) != old_format_timestring(value):
+            print("MISMATCH at " + str(value))
+            return 1
+    # the check above filled the whole table;  start the table over so its (one-off) fill is counted
+    time_format._mss_table = [None] * len(time_format._mss_table)
+
+    saved = sim_hardware.install_gc_shim()
+    try:
+        measure("old", old_format_timestring, values)
+        measure("table", time_format.format_mss, values)
+        print("table now holds %d of %d strings" % (time_format.get_table_fill(), len(time_format._mss_table)))
+    finally:
+        sim_hardware.remove_gc_shim(saved)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/check_catalog.py (runs on the desktop) checks that a bad line in durations.txt only loses that line
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/check_catalog.py
+#
+# boots the firmware in the simulator with a durations.txt on its flash that has a few bad lines
+# (a duration written as m:ss, a word for a number, too few columns, a value out of range) among good
+# ones, and checks that every good line is in the catalog in order and only the bad ones were skipped.
+# a file of nothing but bad lines must leave the built-in catalog in use.  exits non-zero on a failure.
+#
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+GOOD_AND_BAD = """# category seconds rule [warmup near window short]
+Juv.Short    90  W
+B          1:30  M
+Juv.Short   100  M  240
+Juv.Free    ten  W
+Juv.Free    180  W  360  5  10  30
+Juv.Free
+Nov.Free    200  M  0  5  10  300
+Nov.Free    210  M
+"""
+GOOD_SECONDS = [90, 100, 180, 210]
+BAD_LINES = 4
+
+ONLY_BAD = """B  1:30  M
+C  2:00  W
+"""
+
+# boots with text as /durations.txt and returns the firmware's catalog
+def boot_with(text):
+    flash_dir = tempfile.mkdtemp(prefix="circuitpy_")
+    try:
+        with open(os.path.join(flash_dir, "durations.txt"), "w") as f:
+            f.write(text)
+        result = sim.run_firmware(seconds=2, flash_dir=flash_dir)
+    finally:
+        shutil.rmtree(flash_dir)
+    if result.error is not None:
+        raise result.error
+    return result.globals["catalog"]
+
+def main():
+    failures = 0
+    catalog = boot_with(GOOD_AND_BAD)
+    seconds = [catalog.get_seconds(index) for index in range(catalog.get_count())]
+    print("good and bad lines:  loaded " + str(seconds) + ", skipped " + str(catalog.get_skipped()))
+    if seconds != GOOD_SECONDS or catalog.get_skipped() != BAD_LINES:
+        print("  expected " + str(GOOD_SECONDS) + ", skipped " + str(BAD_LINES))
+        failures += 1
+    elif catalog.get_warmup(1) != 240 or catalog.get_category_name(3) != "Nov.Free":
+        print("  the good lines' other columns were not kept")
+        failures += 1
+
+    catalog = boot_with(ONLY_BAD)
+    builtin = sys.modules["duration_catalog"].Duration_Catalog()
+    builtin.load_text(sys.modules["duration_catalog"].DEFAULT_CATALOG)
+    print("only bad lines:  loaded " + str(catalog.get_count()) + " (the built-in catalog has " + str(builtin.get_count()) + ")")
+    if catalog.get_count() != builtin.get_count():
+        failures += 1
+
+    if failures:
+        print("FAILED")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/check_long_uptime.py (runs on the desktop) checks the timers still tick on their boundaries after a long uptime
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/check_long_uptime.py [hours of uptime, default 12.5]
+#
+# a competition day keeps the PyPortal up for many hours, and CircuitPython's time.monotonic() float
+# gets coarser the longer it has been up (1/64 s after 9 hours).  this boots the firmware in the
+# simulator with the virtual clock already that far along, times a program in m:ss.t, and checks:
+#
+#   * every tenth from 0:00.0 to the end of the run is shown, none early and none more than LATE_LIMIT late
+#   * the time of day changes minute 60 s apart, give or take TOD_LIMIT
+#
+# and exits non-zero if either check fails.
+#
+"""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+DEFAULT_HOURS = 12.5
+OFFSET = 0.3337            # start the run at an untidy fraction of a second
+START_AT = 10              # seconds into the run the program starts (and runs to the end of the run)
+RUN_SECONDS = 200
+LATE_LIMIT = 0.05          # a redraw (including the refresh itself) may land this long after its boundary
+TOD_LIMIT = 0.005          # minute changes may be this far from 60 s apart (the loop pass they land in)
+NS_PER_TENTH = 100000000
+
+def show_tenths(hw):
+    import myconstants
+    myconstants.SHOW_TENTHS = True
+
+def parse_tenths(texts, index):
+    # "m:ss" followed by its ".t" (the big timer and the small tenth after it) -> tenths, or None
+    if index + 1 >= len(texts):
+        return None
+    minutes, _, seconds = texts[index].partition(":")
+    tenth = texts[index + 1]
+    if not minutes.isdigit() or len(seconds) != 2 or not seconds.isdigit():
+        return None
+    if len(tenth) != 2 or tenth[0] != "." or not tenth[1].isdigit():
+        return None
+    return (int(minutes) * 600) + (int(seconds) * 10) + int(tenth[1])
+
+def is_tod(text):
+    return text.endswith(" am") or text.endswith(" pm")
+
+def main(argv):
+    hours = float(argv[0]) if argv else DEFAULT_HOURS
+    uptime = (hours * 3600) + OFFSET
+    result = sim.run_firmware(seconds=RUN_SECONDS, start_uptime=uptime, before_start=show_tenths,
+                              presses=[(uptime + 5, "Call.Sk"), (uptime + START_AT, "Start")])
+    if result.error is not None:
+        raise result.error
+    # the main timer is still running, so its reference is when it started
+    start_ns = result.globals["skating_info"]._timers.get_reference(0)
+    failures = 0
+
+    # first frame showing each tenth, and how long after its boundary that was
+    first_shown = {}
+    for when_ns, changed, texts in result.display.frames:
+        if when_ns < start_ns:
+            continue
+        for index in range(len(texts)):
+            tenths = parse_tenths(texts, index)
+            if tenths is not None and tenths not in first_shown:
+                first_shown[tenths] = when_ns - (start_ns + tenths * NS_PER_TENTH)
+    last = max(first_shown)
+    missing = [t for t in range(last + 1) if t not in first_shown]
+    early = [t for t in first_shown if first_shown[t] < 0]
+    worst = max(first_shown.values()) / 1e9
+    print("uptime %.1f h:  tenths shown %d of %d, missing %d, early %d, worst lateness %.3f s"
+          % (hours, len(first_shown), last + 1, len(missing), len(early), worst))
+    if missing:
+        print("    missing: %s" % " ".join(str(t) for t in missing[:20]))
+    if missing or early or worst > LATE_LIMIT:
+        failures += 1
+
+    # times of day minute changes
+    changes = []
+    shown = None
+    for when_ns, changed, texts in result.display.frames:
+        for text in texts:
+            if is_tod(text) and text != shown:
+                if shown is not None:
+                    changes.append(when_ns)
+                shown = text
+    gaps = [(changes[i] - changes[i - 1]) / 1e9 for i in range(1, len(changes))]
+    print("time of day changed %d times, gaps %s s" % (len(changes), " ".join("%.3f" % g for g in gaps)))
+    for gap in gaps:
+        if abs(gap - 60) > TOD_LIMIT:
+            failures += 1
+
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
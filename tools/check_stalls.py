@@ -0,0 +1,152 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/check_stalls.py (runs on the desktop) checks that slow jobs are reported and stalls do not lose alerts
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/check_stalls.py
+#
+# two scenarios on the simulator's virtual clock, exiting non-zero if either fails:
+#
+#   * slow job:  a "slow" job is added to the firmware's scheduler that takes SLOW_TAKES seconds every
+#     SLOW_PERIOD (longer than its own period) from SLOW_FROM on, with the diagnostics screen showing.
+#     each run then starts later than the one before, and every time it has fallen a whole period behind
+#     the scheduler must count an overrun (so about one run in (period / (takes - period)) overruns), and
+#     the screen's overrun line must list the slow job.  the same job within its budget (FAST_TAKES) must
+#     have no overruns at all
+#   * stall:  the master loop hangs STALL_SECONDS over the end of a 1:30 +/- program's window.  the
+#     window end double beep must still sound, once, right after the stall
+#
+"""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+DIAG_TAPS = ((5, (30, 10)), (5.4, (30, 10)), (5.8, (30, 10)))    # three taps on the top left corner
+SLOW_FROM = 8
+SLOW_PERIOD = 0.5
+SLOW_TAKES = 0.6
+FAST_TAKES = 0.3
+SLOW_RUN = 20
+
+START_AT = 5
+WINDOW_END = 100           # a 1:30 +/- program's window ends 10 s after its duration
+STALL_AT = START_AT + WINDOW_END - 0.5
+STALL_SECONDS = 2.5
+STALL_RUN = START_AT + WINDOW_END + 20
+NS_PER_SECOND = 1000000000
+
+# has the firmware's scheduler come with the slow job (code.py imports the scheduler module after this)
+def add_slow_job(takes):
+    def before_start(hw):
+        import scheduler
+        make_scheduler = scheduler.Scheduler.__init__
+        def slow_job():
+            if hw.clock.monotonic() >= SLOW_FROM:
+                hw.clock.charge(takes)
+        def init(self):
+            make_scheduler(self)
+            self.add_job("slow", SLOW_PERIOD, slow_job)
+        scheduler.Scheduler.__init__ = init
+    return before_start
+
+# returns (overruns of the slow job, worst lateness, the diagnostics screen's overrun line at the end)
+def run_slow_job(takes):
+    result = sim.run_firmware(seconds=SLOW_RUN, presses=DIAG_TAPS, before_start=add_slow_job(takes))
+    if result.error is not None:
+        raise result.error
+    scheduler = result.globals["scheduler"]
+    line = None
+    for text in result.display.frames[-1][-1]:
+        if text.startswith("overruns:"):
+            line = text
+    return scheduler.get_overruns("slow"), scheduler.get_worst_lateness("slow"), line
+
+def check_slow_job():
+    ok = True
+    overruns, lateness, line = run_slow_job(SLOW_TAKES)
+    print("slow job:  %d overruns, worst lateness %.3f s;  diagnostics shows %r" % (overruns, lateness, line))
+    slow_runs = (SLOW_RUN - SLOW_FROM) / SLOW_TAKES
+    expected = int(slow_runs * (SLOW_TAKES - SLOW_PERIOD) / SLOW_PERIOD)
+    if overruns < expected - 1 or overruns > expected + 1:
+        print("  expected about " + str(expected) + " overruns")
+        ok = False
+    if lateness < SLOW_PERIOD:
+        print("  its worst lateness is less than a period")
+        ok = False
+    if line is None or " slow=" not in line:
+        print("  the overrun line does not list the slow job")
+        ok = False
+    else:
+        shown = int(line.split(" slow=")[1].split()[0])
+        if shown < 1 or shown > overruns:
+            print("  the overrun line shows " + str(shown) + " for the slow job")
+            ok = False
+
+    overruns, lateness, line = run_slow_job(FAST_TAKES)
+    print("job within its budget:  %d overruns;  diagnostics shows %r" % (overruns, line))
+    if overruns != 0 or line is None or " slow=" in line:
+        print("  it should not have overrun")
+        ok = False
+    return ok
+
+def check_stall():
+    result = sim.run_firmware(seconds=STALL_RUN, presses=((START_AT, "Start"),), stalls=((STALL_AT, STALL_SECONDS),))
+    if result.error is not None:
+        raise result.error
+    stall_end = int((STALL_AT + STALL_SECONDS) * NS_PER_SECOND)
+    beeps = []
+    for at, value in result.pin_events("D3"):
+        if value and at >= int(STALL_AT * NS_PER_SECOND):
+            beeps.append(at)
+    print("stall over the window end:  beeper on at " + ", ".join(["%.3f s" % (at / NS_PER_SECOND) for at in beeps]))
+    # a double beep is two "on"s 0.2 s apart, starting on the first pass after the stall
+    if len(beeps) != 2:
+        print("  expected one double beep")
+        return False
+    if beeps[0] < stall_end or beeps[0] - stall_end > NS_PER_SECOND // 10:
+        print("  the double beep did not start right after the stall")
+        return False
+    return True
+
+def main():
+    failures = 0
+    if not check_slow_job():
+        failures += 1
+    if not check_stall():
+        failures += 1
+    if failures:
+        print("FAILED")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
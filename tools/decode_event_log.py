@@ -0,0 +1,134 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/decode_event_log.py turns the /events.bin competition log into a CSV, one row per skater
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:
+#   python tools/decode_event_log.py /media/CIRCUITPY/events.bin > events.csv
+#   python tools/decode_event_log.py events.bin events.csv
+#
+# each power-up starts a new session (skater numbers start over);  times of day are from the RTC and
+# durations are in seconds.  warmups get rows too (mode "warmup"), so a whole session reads in order.
+#
+"""
+import csv
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import event_log
+
+COLUMNS = ["session", "skater", "mode", "called_at", "started_at", "call_to_start_s", "duration_s", "duration_type",
+           "stopped_at", "length_s", "interruptions", "interrupted_s", "interrupted_at", "splits"]
+
+def time_of_day(seconds):
+    if seconds is None:
+        return ""
+    return "%02d:%02d:%02d" % (seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+def tenths(value):
+    if value is None or value < 0:
+        return ""
+    return "%.1f" % (value / 10)
+
+def read_records(data):
+    usable = len(data) - (len(data) % event_log.RECORD_SIZE)
+    for offset in range(0, usable, event_log.RECORD_SIZE):
+        yield struct.unpack_from(event_log.RECORD_FORMAT, data, offset)
+
+def new_row(session, skater, mode):
+    row = dict((name, "") for name in COLUMNS)
+    row["session"] = session
+    row["skater"] = skater
+    row["mode"] = "warmup" if mode == event_log.MODE_WARMUP else "program"
+    row["interruptions"] = 0
+    row["interrupted_s"] = 0.0
+    row["interrupted_at"] = []
+    row["splits"] = []
+    return row
+
+def decode(data):
+    rows = []
+    session = 0
+    row = None
+    for event, mode, skater, tod, value in read_records(data):
+        if event == event_log.EVENT_BOOT:
+            session += 1
+            row = None
+            continue
+        if row is None or row["skater"] != skater or row["session"] != session:
+            row = new_row(session, skater, mode)
+            rows.append(row)
+        if event == event_log.EVENT_CALL:
+            row["called_at"] = time_of_day(tod)
+        elif event == event_log.EVENT_START:
+            row["mode"] = "warmup" if mode == event_log.MODE_WARMUP else "program"
+            row["started_at"] = time_of_day(tod)
+            row["call_to_start_s"] = tenths(value)
+        elif event == event_log.EVENT_DURATION:
+            row["duration_s"] = abs(value)
+            if mode == event_log.MODE_WARMUP:
+                row["duration_type"] = "warmup"
+            elif value < 0:
+                row["duration_type"] = "max"
+            else:
+                row["duration_type"] = "+/-"
+        elif event == event_log.EVENT_INTERRUPT:
+            row["interruptions"] += 1
+            row["interrupted_at"].append(tenths(value))
+        elif event == event_log.EVENT_CONTINUE:
+            row["interrupted_s"] = round(row["interrupted_s"] + value / 10, 1)
+        elif event == event_log.EVENT_STOP:
+            row["stopped_at"] = time_of_day(tod)
+            row["length_s"] = tenths(value)
+        elif event == event_log.EVENT_SPLIT:
+            row["splits"].append(tenths(value))
+    for row in rows:
+        row["interrupted_at"] = " ".join(row["interrupted_at"])
+        row["splits"] = " ".join(row["splits"])
+    return rows
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: decode_event_log.py events.bin [output.csv]")
+        return 1
+    with open(argv[1], "rb") as f:
+        rows = decode(f.read())
+    if len(argv) > 2:
+        out = open(argv[2], "w", newline="")
+    else:
+        out = sys.stdout
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    if out is not sys.stdout:
+        out.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
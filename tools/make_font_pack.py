@@ -0,0 +1,118 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/make_font_pack.py (runs on the desktop) converts .bdf fonts into glyph packs for font_pack.py
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# usage:
+#   python tools/make_font_pack.py fonts/Arial-12.bdf fonts/Arial-12.fpk
+#   python tools/make_font_pack.py fonts/Roboto-Bold-75.bdf fonts/Roboto-Bold-75.fpk --glyphs "0123456789-:. "
+#
+# copy the .fpk files to /fonts on CIRCUITPY; code.py uses them instead of the .bdf files when present
+#
+"""
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from font_pack import PACK_MAGIC, HEADER_FORMAT, RECORD_FORMAT
+
+# the glyphs code.py preloads, plus the punctuation used on buttons, in the notes panel and on the
+# diagnostics screen ("overruns: watch=3");  anything else is looked up in the .bdf on the board
+DEFAULT_GLYPHS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-,.: @()/+="
+
+# Label measures "M" to place every line vertically, so each pack has it whatever --glyphs asks for
+REQUIRED_GLYPHS = "M"
+
+# returns (font bounding box, {codepoint: (width, height, dx, dy, shift_x, shift_y, [row bytes, ...])})
+# for just the wanted codepoints, the same fields adafruit_bitmap_font takes from the .bdf file
+def read_bdf(filename, wanted):
+    bounding_box = None
+    glyphs = {}
+    codepoint = None
+    shift_x = shift_y = 0
+    bbx = None
+    rows = None
+    with open(filename, "r", encoding="latin-1") as f:
+        for line in f:
+            if line.startswith("FONTBOUNDINGBOX "):
+                _, w, h, dx, dy = line.split()
+                bounding_box = (int(w), int(h), int(dx), int(dy))
+            elif line.startswith("ENCODING "):
+                codepoint = int(line.split()[1])
+            elif line.startswith("DWIDTH "):
+                _, sx, sy = line.split()
+                shift_x, shift_y = int(sx), int(sy)
+            elif line.startswith("BBX "):
+                _, w, h, dx, dy = line.split()
+                bbx = (int(w), int(h), int(dx), int(dy))
+            elif line.startswith("BITMAP"):
+                rows = [] if codepoint in wanted else None
+            elif line.startswith("ENDCHAR"):
+                if rows is not None:
+                    width, height, dx, dy = bbx
+                    glyphs[codepoint] = (width, height, dx, dy, shift_x, shift_y, rows)
+                rows = None
+                codepoint = None
+            elif rows is not None:
+                rows.append(bytes.fromhex(line.strip()))
+    return bounding_box, glyphs
+
+def build_pack(bounding_box, glyphs):
+    records = b""
+    data = b""
+    codepoints = sorted(glyphs)
+    for codepoint in codepoints:
+        width, height, dx, dy, shift_x, shift_y, rows = glyphs[codepoint]
+        row_bytes = (width + 7) // 8
+        records += struct.pack(RECORD_FORMAT, codepoint, width, height, dx, dy, shift_x, shift_y, len(data))
+        for row in rows:
+            # bdf rows may be padded wider than the glyph needs; keep just the bytes the loader reads
+            data += row[:row_bytes].ljust(row_bytes, b"\x00")
+    header = struct.pack(HEADER_FORMAT, PACK_MAGIC, len(codepoints), *bounding_box)
+    return header + records + data
+
+def main(argv):
+    if len(argv) < 3:
+        print("usage: make_font_pack.py input.bdf output.fpk [--glyphs CHARS]")
+        return 1
+    glyph_text = DEFAULT_GLYPHS
+    if "--glyphs" in argv:
+        glyph_text = argv[argv.index("--glyphs") + 1]
+    wanted = set(ord(c) for c in glyph_text + REQUIRED_GLYPHS)
+    bounding_box, glyphs = read_bdf(argv[1], wanted)
+    missing = "".join(chr(c) for c in sorted(wanted - set(glyphs)))
+    if missing:
+        print("warning: not in font: " + repr(missing))
+    pack = build_pack(bounding_box, glyphs)
+    with open(argv[2], "wb") as f:
+        f.write(pack)
+    print("%s: %d glyphs, %d bytes (from %d byte bdf)" % (argv[2], len(glyphs), len(pack), os.path.getsize(argv[1])))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,192 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/make_splash.py (runs on the desktop) converts a 24 bit .bmp into a compressed splash for splash_image.py
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:
+#   python tools/make_splash.py boot_splash_stopwatch.bmp boot_splash_stopwatch.spl
+#   python tools/make_splash.py boot_splash_stopwatch.bmp boot_splash_stopwatch.spl --colors 8 --chunk-rows 24
+#
+# the picture is reduced to --colors colors (default 16, so the Bitmap on the board takes 4 bits per
+# pixel) by median cut, without dithering so the runs stay long.  copy the .spl file next to code.py;
+# code.py shows it instead of the .bmp when it is there.
+#
+"""
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from splash_image import SPLASH_MAGIC, HEADER_FORMAT, LITERAL_BASE
+
+DEFAULT_COLORS = 16
+DEFAULT_CHUNK_ROWS = 16
+MAX_RUN = LITERAL_BASE                  # a run packet covers 1..128 pixels
+MAX_LITERAL = 255 - LITERAL_BASE + 1    # a literal packet covers 1..128 pixels
+
+# returns (width, height, rows) where rows is a list (top to bottom) of lists of (r, g, b)
+def read_bmp(filename):
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data[0:2] != b"BM":
+        raise ValueError(filename + " is not a .bmp file")
+    offset = struct.unpack_from("<I", data, 10)[0]
+    width, height, planes, bits, compression = struct.unpack_from("<iiHHI", data, 18)
+    if bits != 24 or compression != 0:
+        raise ValueError(filename + ": only uncompressed 24 bit .bmp files are supported")
+    bottom_up = height > 0
+    height = abs(height)
+    stride = (width * 3 + 3) & ~3
+    rows = []
+    for y in range(height):
+        if bottom_up:
+            start = offset + (height - 1 - y) * stride
+        else:
+            start = offset + y * stride
+        row = []
+        for x in range(width):
+            b, g, r = data[start + x * 3], data[start + x * 3 + 1], data[start + x * 3 + 2]
+            row.append((r, g, b))
+        rows.append(row)
+    return width, height, rows
+
+# median cut over the distinct colors (weighted by how many pixels use them);  returns the palette,
+# most used color first, and a dict mapping every color of the picture to its palette index
+def quantize(rows, colors):
+    counts = {}
+    for row in rows:
+        for pixel in row:
+            counts[pixel] = counts.get(pixel, 0) + 1
+    boxes = [list(counts)]
+    while len(boxes) < colors:
+        # split the box that spans the widest channel range (weighted by its pixel count)
+        best = None
+        best_score = 0
+        for index, box in enumerate(boxes):
+            if len(box) < 2:
+                continue
+            for channel in range(3):
+                values = [c[channel] for c in box]
+                score = (max(values) - min(values)) * sum(counts[c] for c in box)
+                if score > best_score:
+                    best, best_score, best_channel = index, score, channel
+        if best is None:
+            break
+        box = sorted(boxes.pop(best), key=lambda c: c[best_channel])
+        total = sum(counts[c] for c in box)
+        running = 0
+        split = 1
+        for i, c in enumerate(box):
+            running += counts[c]
+            if running * 2 >= total:
+                split = max(1, min(len(box) - 1, i + 1))
+                break
+        boxes.append(box[:split])
+        boxes.append(box[split:])
+
+    entries = []
+    for box in boxes:
+        weight = sum(counts[c] for c in box)
+        average = tuple((sum(c[ch] * counts[c] for c in box) + weight // 2) // weight for ch in range(3))
+        entries.append((weight, average, box))
+    entries.sort(key=lambda e: -e[0])
+    palette = []
+    mapping = {}
+    for index, (weight, average, box) in enumerate(entries):
+        palette.append(average)
+        for c in box:
+            mapping[c] = index
+    return palette, mapping
+
+# packets for one row of palette indices (see the file layout in splash_image.py)
+def encode_row(indices):
+    out = bytearray()
+    literal = []
+    x = 0
+    while x < len(indices):
+        run = 1
+        while x + run < len(indices) and run < MAX_RUN and indices[x + run] == indices[x]:
+            run += 1
+        if run >= 3:
+            if literal:
+                out.append(LITERAL_BASE + len(literal) - 1)
+                out.extend(literal)
+                literal = []
+            out.append(run - 1)
+            out.append(indices[x])
+            x += run
+        else:
+            literal.append(indices[x])
+            x += 1
+            if len(literal) == MAX_LITERAL:
+                out.append(LITERAL_BASE + len(literal) - 1)
+                out.extend(literal)
+                literal = []
+    if literal:
+        out.append(LITERAL_BASE + len(literal) - 1)
+        out.extend(literal)
+    return bytes(out)
+
+def build_splash(width, height, palette, index_rows, chunk_rows):
+    chunks = []
+    for y in range(0, height, chunk_rows):
+        chunk = b"".join(encode_row(row) for row in index_rows[y:y + chunk_rows])
+        chunks.append(chunk)
+    max_chunk = max(len(c) for c in chunks)
+    if max_chunk > 0xFFFF:
+        raise ValueError("chunks too big, use fewer --chunk-rows")
+    data = struct.pack(HEADER_FORMAT, SPLASH_MAGIC, width, height, len(palette), chunk_rows, max_chunk)
+    data += b"".join(bytes(color) for color in palette)
+    for chunk in chunks:
+        data += struct.pack("<H", len(chunk)) + chunk
+    return data
+
+def main(argv):
+    if len(argv) < 3:
+        print("usage: make_splash.py input.bmp output.spl [--colors N] [--chunk-rows N]")
+        return 1
+    colors = DEFAULT_COLORS
+    chunk_rows = DEFAULT_CHUNK_ROWS
+    if "--colors" in argv:
+        colors = int(argv[argv.index("--colors") + 1])
+    if "--chunk-rows" in argv:
+        chunk_rows = int(argv[argv.index("--chunk-rows") + 1])
+    if colors < 2 or colors > 256:
+        print("--colors must be 2..256")
+        return 1
+    width, height, rows = read_bmp(argv[1])
+    palette, mapping = quantize(rows, colors)
+    index_rows = [[mapping[pixel] for pixel in row] for row in rows]
+    data = build_splash(width, height, palette, index_rows, chunk_rows)
+    with open(argv[2], "wb") as f:
+        f.write(data)
+    print("%s: %dx%d, %d colors, %d bytes (from %d byte bmp)" % (argv[2], width, height, len(palette), len(data), os.path.getsize(argv[1])))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,167 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/measure_heap.py (runs on the desktop) counts the strings the screens build, and the collections, while timing
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/measure_heap.py
+#
+# runs a scripted program (skater called, start, interruption, continue, stop) in the simulator with
+# myconstants.ALLOCATION_FREE off and on, and for each stretch of steady timing between presses prints
+#   strings  - string objects built during the stretch and handed to a Label (not constants in the source,
+#              not from the m:ss table, not shown before), and their size in CPython bytes
+#   gc       - collections heap_monitor made, and automatic ones it noticed
+#   pause    - the time heap_monitor's collections held the master loop, in all and the longest one
+#   free     - gc.mem_free() at the end less at the start, and the lowest it went below the start
+# along with the heap in use once the master loop is running (what the m:ss table costs up front).
+# the heap is the simulator's tracemalloc-backed gc.mem_free() (trace_heap=True), which also sees the
+# simulator's own allocations, so the collection counts and free figures are a rough guide and the
+# string counts are the figure to compare.  a pause is the simulator's nominal cost of a gc.collect()
+# (Cost_Model.gc_collect), so it is how often the loop stops that differs between the modes, not how
+# long for;  the automatic collections the board makes when an allocation fails cannot happen here, so
+# they show as 0.  a stretch with no new strings still allocates a little on the board:  every
+# time.monotonic_ns() value is a long int there
+#
+"""
+import gc
+import os
+import sys
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+
+LOOP_SECONDS = 3          # the master loop is running, nothing pressed yet
+PRESSES = ((5, "Call.Sk"), (40, "Start"), (60, "Interrupt"), (80, "Continue"), (130, "Stop"))
+# (name, from, to) uptimes of the stretches measured, each well clear of the presses around it
+STRETCHES = (("skater called", 25, 38), ("program", 45, 58), ("interrupted", 62, 78),
+             ("program again", 85, 125), ("between skaters", 135, 160))
+
+# ids of the string constants in the code of the firmware's functions (on the board these are interned
+# when the module is compiled, so showing one never allocates)
+def constant_ids():
+    ids = {}
+    pending = []
+    for item in gc.get_objects():
+        if isinstance(item, types.FunctionType) and item.__code__.co_filename.startswith(sim.ROOT):
+            pending.append(item.__code__)
+    while pending:
+        for constant in pending.pop().co_consts:
+            if isinstance(constant, str):
+                ids[id(constant)] = True
+            elif isinstance(constant, types.CodeType):
+                pending.append(constant)
+    return ids
+
+# sets ALLOCATION_FREE for the run, watches every string given to a Label and every pause of
+# heap_monitor's collections, and at each stretch's start and end notes (strings, bytes, collections,
+# automatic collections, pause ns, free) into marks, and the stretch's (longest pause ns, lowest free)
+# into marks[name]
+def prepare(allocation_free, marks):
+    counts = {"strings": 0, "bytes": 0, "pause": 0, "longest": 0, "lowest": None}
+    seen = {}         # id -> string, kept alive so an id is never reused for a different string
+    known = {}        # ids of strings that already existed when the current stretch started
+    def before_start(hw):
+        import myconstants
+        from adafruit_display_text import label
+        myconstants.ALLOCATION_FREE = allocation_free
+        update_text = label.Label._update_text
+        def counting_update_text(self, text):
+            if id(text) not in seen:
+                seen[id(text)] = text
+                if id(text) not in known:
+                    counts["strings"] += 1
+                    counts["bytes"] += sys.getsizeof(text)
+            return update_text(self, text)
+        label.Label._update_text = counting_update_text
+        import heap_monitor
+        collect = heap_monitor.Heap_Monitor.collect
+        def timed_collect(self):
+            collect(self)
+            counts["pause"] += self.get_last_pause_ns()
+            counts["longest"] = max(counts["longest"], self.get_last_pause_ns())
+        heap_monitor.Heap_Monitor.collect = timed_collect
+        edges = [(LOOP_SECONDS, "loop", 0)]
+        for name, start, end in STRETCHES:
+            edges.append((start, name, 0))
+            edges.append((end, name, 1))
+        def tick():
+            if counts["lowest"] is not None:
+                counts["lowest"] = min(counts["lowest"], gc.mem_free())
+            if not edges or hw.clock.monotonic() < edges[0][0]:
+                return
+            uptime, name, which = edges.pop(0)
+            if name == "loop":
+                gc.collect()
+                marks[name] = gc.mem_alloc()
+                return
+            heap_monitor = hw.firmware_globals["heap_monitor"]
+            if which == 0:
+                # constants, and anything already in the m:ss table, are not built during the stretch
+                known.clear()
+                known.update(constant_ids())
+                for text in sys.modules["time_format"]._mss_table:
+                    if text is not None:
+                        known[id(text)] = True
+            free = gc.mem_free()
+            marks[(name, which)] = (counts["strings"], counts["bytes"], heap_monitor.get_collections(),
+                                    heap_monitor.get_auto_collections(), counts["pause"], free)
+            if which == 0:
+                counts["longest"] = 0
+                counts["lowest"] = free
+            else:
+                marks[name] = (counts["longest"], counts["lowest"])
+                counts["lowest"] = None
+        hw.clock.on_advance.append(tick)
+    return before_start
+
+def main():
+    seconds = STRETCHES[-1][2] + 1
+    print("(simulated PyPortal;  heap and string bytes are CPython sizes)")
+    # the first boot in a process also allocates the host's own one-off caches, so it is not counted
+    sim.run_firmware(seconds=LOOP_SECONDS + 1, trace_heap=True)
+    for mode, allocation_free in (("ALLOCATION_FREE off", False), ("ALLOCATION_FREE on", True)):
+        marks = {}
+        result = sim.run_firmware(seconds=seconds, presses=PRESSES, trace_heap=True,
+                                  before_start=prepare(allocation_free, marks))
+        if result.error is not None:
+            raise result.error
+        print("%s   heap in use once the loop runs %d bytes" % (mode, marks["loop"]))
+        for name, start, end in STRETCHES:
+            before = marks[(name, 0)]
+            after = marks[(name, 1)]
+            longest, lowest = marks[name]
+            print("  %-16s %3d s   strings %4d (%6d bytes)   gc %2d (automatic %d)   pause %3.0f ms"
+                  " (longest %2.0f)   free %+7d (lowest %+7d)"
+                  % (name, end - start, after[0] - before[0], after[1] - before[1],
+                     after[2] - before[2], after[3] - before[3], (after[4] - before[4]) / 1e6,
+                     longest / 1e6, after[5] - before[5], lowest - before[5]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+# PyPortal referee stopwatch for figure skating competitions
+# Author(s): Don Korte
+# Module:  tools/replay_buttons.py (runs on the desktop) replays a button sequence against the old label-text dispatch
+#
+# github: https://github.com/dnkorte/skating_stopwatch.git
+#
+# MIT License
+#
+# Copyright (c) 2019 Don Korte
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#
+# usage:  python tools/replay_buttons.py [--baseline REV]
+#
+# runs the same scripted presses through this tree and through REV (by default the commit the series
+# started from, whose Controller dispatched on the label text with if/elif chains;  taken out of git into
+# a temporary directory) in the simulator, and after each press compares
+#   - the mode (program / warmup) and the screen showing
+#   - which timers are running, and the seconds on each of them
+#   - the program duration, its rule and the warmup length, and the interruption count and start
+#   - each watch screen button's label and the command it carries (for REV, the command its label
+#     text ran in the old chains)
+# both trees are booted first and the first press waits until both have their main screen up, since
+# the older firmware takes much longer to boot.  the older firmware only works out its seconds when it
+# redraws (and polls the screen every 0.1 s), so seconds may be up to SECONDS_TOLERANCE apart.
+# differences that later changes made on purpose are listed in INTENDED (buttons) and intended_values()
+# and reported separately.  exits with 1 if anything else differs, or if a press found no button with
+# its label in one tree.
+#
+"""
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "simulator"))
+import sim
+import commands
+
+BOOT_LIMIT = 60           # seconds a tree may take to get its main screen up
+AFTER_BOOT = 2            # seconds from the later of the two boots to the first press
+PRESS_EVERY = 3           # seconds between presses
+SETTLE = 1.5              # seconds after a press at which the state is compared
+SECONDS_TOLERANCE = 1
+
+SCRIPT = ("Call.Sk", "Start", "Interrupt", "Continue", "Interrupt", "Continue", "Stop", "Start\nNew",
+          "Stop", "Call.Sk", "Chg.Dur", "Chg.Dur", "Whistle", "Warmup", "Silent", "Start", "Noisy",
+          "Stop", "Clk.Set", "+ H", "- M", "Cancel", "Compete", "Call.Sk", "Start", "Interrupt", "Stop",
+          "Call.Sk", "Start", "Stop")
+
+BUTTONS = ("_btnA", "_btnB", "_btnC", "_btnD", "_btnSS")
+TIMERS = ("Main", "Call", "Separation", "Interrupt")
+# the old Skating_Info's "yes"/"no" running flag, start reference and last worked out seconds of each timer
+OLD_TIMER_FIELDS = {"Main": ("_main_timer_running", "_main_timer_start_reference", "_current_main_num_of_seconds"),
+                    "Call": ("_skater_call_timer_running", "_skater_call_timer_start_reference",
+                             "_seconds_since_skater_call"),
+                    "Separation": ("_skater_separation_timer_running", "_skater_separation_timer_start_reference",
+                                   "_seconds_since_last_skater_ended"),
+                    "Interrupt": ("_interrupt_timer_running", "_interrupt_timer_start_reference",
+                                  "_seconds_since_interrupt_started")}
+# other Skating_Info fields compared as they are (both versions have them)
+FIELDS = (("duration", "_programduration_sec"), ("rule", "_max_or_window"), ("duration index", "_cur_duration_index"),
+          ("warmup", "_warmupduration_sec"), ("interruptions", "_number_of_interruption_events"),
+          ("interrupt at", "_interrupt_started_at_seconds"))
+
+# the command each label text ran in the old if/elif chains (a label not listed did nothing)
+OLD_LABEL_COMMANDS = {"Start": commands.CMD_START, "Start\nNew": commands.CMD_START, "Stop": commands.CMD_STOP,
+                      "Reset": commands.CMD_RESET, "Interrupt": commands.CMD_INTERRUPT, "Continue": commands.CMD_CONTINUE,
+                      "Whistle": commands.CMD_WHISTLE, "Warmup": commands.CMD_WARMUP, "Compete": commands.CMD_COMPETE,
+                      "Call.Sk": commands.CMD_CALL_SKATER, "Chg.Dur": commands.CMD_CHANGE_DURATION,
+                      "Silent": commands.CMD_SILENT, "Noisy": commands.CMD_NOISY, "Clk.Set": commands.CMD_CLOCK_SET}
+
+# (old labels, new labels) of a button that has since changed on purpose:  the third watch button
+# ("..", did nothing) became Next.Cat between skaters and Split while timing, and it no longer keeps
+# the "Talk" of an interruption that was ended with Stop rather than Continue
+INTENDED = ((("..", "Talk"), ("Next.Cat", "Split")),)
+
+# the main timer now holds still during an interruption, so once a program has been interrupted its
+# main seconds (and where a later interruption started) may be behind the old ones, never ahead
+def intended_values(name, old, new, old_value, new_value):
+    if name in ("Main", "interrupt at") and new["mode"] == "program" and new["interruptions"] > 0:
+        return new_value <= old_value + SECONDS_TOLERANCE
+    return False
+
+# the first commit, which the backlog of changes was made on top of
+def default_baseline():
+    output = subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=sim.ROOT,
+                            stdout=subprocess.PIPE, check=True).stdout
+    return output.decode().split()[-1][:7]
+
+def press_times(first_press):
+    return [first_press + (PRESS_EVERY * index) for index in range(len(SCRIPT))]
+
+# has the simulated clock note the state SETTLE seconds after each press
+def prepare(first_press, snapshots):
+    def before_start(hw):
+        pending = [at + SETTLE for at in press_times(first_press)]
+        def tick():
+            if pending and hw.clock.monotonic() >= pending[0]:
+                pending.pop(0)
+                snapshots.append(snapshot(hw.firmware_globals))
+        hw.clock.on_advance.append(tick)
+    return before_start
+
+# seconds on each timer right now, the way each version works them out (without changing its state)
+def timer_seconds(skating_info):
+    seconds = {}
+    if hasattr(skating_info, "_timers"):
+        timers = skating_info._timers
+        for name in TIMERS:
+            index = timers.find(name)
+            value = timers.get_elapsed_tenths(index) // 10
+            if timers.is_down(index):
+                value = timers.get_limit(index) - value
+            seconds[name] = value
+    else:
+        for name in TIMERS:
+            flag, reference, value = OLD_TIMER_FIELDS[name]
+            value = getattr(skating_info, value)
+            if getattr(skating_info, flag) == "yes":
+                value = int(time.monotonic() - getattr(skating_info, reference))
+                if name == "Main" and skating_info._main_timer_direction == "down":
+                    value = skating_info._warmupduration_sec - value
+            seconds[name] = value
+    return seconds
+
+def snapshot(firmware):
+    skating_info = firmware["skating_info"]
+    display_main = firmware["display_main"]
+    running = []
+    buttons = []
+    if hasattr(skating_info, "_timers"):
+        timers = skating_info._timers
+        for name in TIMERS:
+            if name == "Main":
+                # a main timer held by an interruption counts as running, as the old one never stopped
+                on = skating_info.is_main_timer_running()
+            else:
+                on = timers.is_running(timers.find(name))
+            if on:
+                running.append(name)
+        for name in BUTTONS:
+            button = getattr(display_main, name)
+            buttons.append((button.label, display_main.get_button_command(button)))
+    else:
+        for name in TIMERS:
+            if getattr(skating_info, OLD_TIMER_FIELDS[name][0]) == "yes":
+                running.append(name)
+        for name in BUTTONS:
+            label = getattr(display_main, name).label
+            buttons.append((label, OLD_LABEL_COMMANDS.get(label, commands.CMD_NONE)))
+    state = {"mode": skating_info._mode, "screen": firmware["controller"].get_current_screen(),
+             "running": tuple(running), "buttons": tuple(buttons)}
+    state.update(timer_seconds(skating_info))
+    for name, field in FIELDS:
+        state[name] = getattr(skating_info, field)
+    return state
+
+# seconds from power-up until root's master loop first polled the touchscreen
+def boot_time(root):
+    result = sim.run_firmware(seconds=BOOT_LIMIT, root=root)
+    if result.error is not None:
+        raise result.error
+    if result.boot_to_interactive() is None:
+        raise RuntimeError(root + " did not get its main screen up in " + str(BOOT_LIMIT) + " s")
+    return result.boot_to_interactive()
+
+def run(root, first_press):
+    snapshots = []
+    times = press_times(first_press)
+    result = sim.run_firmware(seconds=times[-1] + SETTLE + 1, root=root,
+                              presses=list(zip(times, SCRIPT)), before_start=prepare(first_press, snapshots))
+    if result.error is not None:
+        raise result.error
+    pressed = [start for start, target, point in result.hw.touches.resolved]
+    return snapshots, pressed
+
+# checks out rev into a temporary directory.  CircuitPython accepted the mixed tabs and spaces of some
+# older files, so their indentation is expanded for the desktop Python
+def checkout(rev, directory):
+    archive = subprocess.run(["git", "archive", rev], cwd=sim.ROOT, stdout=subprocess.PIPE, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+    for name in os.listdir(directory):
+        if name.endswith(".py"):
+            path = os.path.join(directory, name)
+            with open(path) as f:
+                lines = f.readlines()
+            expanded = []
+            for line in lines:
+                body = line.lstrip(" \t")
+                expanded.append(line[:len(line) - len(body)].expandtabs(8) + body)
+            with open(path, "w") as f:
+                f.writelines(expanded)
+
+def is_intended(old_button, new_button):
+    for old_labels, new_labels in INTENDED:
+        if old_button[0] in old_labels and new_button[0] in new_labels:
+            return True
+    return False
+
+def compare(old, new):
+    differences = []
+    intended = []
+    for name in ("mode", "screen"):
+        if old[name] != new[name]:
+            differences.append(name + " " + old[name] + " / " + new[name])
+    if old["running"] != new["running"]:
+        differences.append("running " + ",".join(old["running"]) + " / " + ",".join(new["running"]))
+    for name in TIMERS + tuple([field[0] for field in FIELDS]):
+        old_value = old[name]
+        new_value = new[name]
+        if name in TIMERS or name == "interrupt at":
+            same = abs(old_value - new_value) <= SECONDS_TOLERANCE
+        else:
+            same = old_value == new_value
+        if same:
+            continue
+        text = name + " " + repr(old_value) + " / " + repr(new_value)
+        if intended_values(name, old, new, old_value, new_value):
+            intended.append(text)
+        else:
+            differences.append(text)
+    for name, old_button, new_button in zip(BUTTONS, old["buttons"], new["buttons"]):
+        if old_button == new_button:
+            continue
+        text = name[1:] + " " + repr(old_button) + " / " + repr(new_button)
+        if is_intended(old_button, new_button):
+            intended.append(text)
+        else:
+            differences.append(text)
+    return differences, intended
+
+def main():
+    baseline = default_baseline()
+    if len(sys.argv) > 2 and sys.argv[1] == "--baseline":
+        baseline = sys.argv[2]
+    directory = tempfile.mkdtemp(prefix="replay_")
+    try:
+        checkout(baseline, directory)
+        old_boot = boot_time(directory)
+        new_boot = boot_time(sim.ROOT)
+        first_press = math.ceil(max(old_boot, new_boot)) + AFTER_BOOT
+        old_snapshots, old_pressed = run(directory, first_press)
+    finally:
+        shutil.rmtree(directory)
+    new_snapshots, new_pressed = run(sim.ROOT, first_press)
+
+    failures = 0
+    print("(old = " + baseline + ", new = this tree;  buttons are (label, command))")
+    print("main screen up at %.1f s (old), %.1f s (new);  first press at %d s" % (old_boot, new_boot, first_press))
+    for index, at in enumerate(press_times(first_press)):
+        name = SCRIPT[index].replace("\n", " ")
+        if at not in old_pressed or at not in new_pressed:
+            print("%5.1f s  %-10s  no button with this label (old %s, new %s)"
+                  % (at, name, at in old_pressed, at in new_pressed))
+            failures += 1
+            continue
+        differences, intended = compare(old_snapshots[index], new_snapshots[index])
+        if differences:
+            failures += 1
+            print("%5.1f s  %-10s  DIFFERS  %s" % (at, name, ";  ".join(differences)))
+        else:
+            print("%5.1f s  %-10s  same" % (at, name))
+        for text in intended:
+            print("                            intended:  " + text)
+    print("%d of %d presses differ" % (failures, len(SCRIPT)))
+    if failures:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())